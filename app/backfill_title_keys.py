@@ -0,0 +1,67 @@
+"""
+Fill ``title_lower`` on courses written before it existed.
+
+Title prefix searches match ``title_lower`` (see app.utils.search), which
+CourseModel sets on every create and title update. Courses stored earlier,
+or inserted by other tools, don't match until this has run:
+
+    python -m app.backfill_title_keys --dry-run
+    python -m app.backfill_title_keys
+"""
+
+import argparse
+import asyncio
+import sys
+
+from pymongo import UpdateOne
+
+from app.core.database import db
+from app.models.course import CourseModel
+from app.utils.search import title_key
+
+BATCH_SIZE = 1000
+
+
+async def backfill_title_keys(database=db, dry_run: bool = False) -> int:
+    """Set ``title_lower`` where it is missing or out of date; returns how
+    many courses needed it."""
+    collection = database[CourseModel.collection.name]
+    updates = []
+    outdated = 0
+    async for course in collection.find({}, {"title": 1, "title_lower": 1}):
+        key = title_key(course.get("title") or "")
+        if course.get("title_lower") == key:
+            continue
+        outdated += 1
+        if dry_run:
+            continue
+        updates.append(
+            UpdateOne({"_id": course["_id"]}, {"$set": {"title_lower": key}})
+        )
+        if len(updates) == BATCH_SIZE:
+            await collection.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+    return outdated
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.backfill_title_keys",
+        description="Fill the lower-cased title used by prefix searches.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only count the courses to update (exit 1 if there are any)",
+    )
+    args = parser.parse_args(argv)
+    outdated = asyncio.run(backfill_title_keys(dry_run=args.dry_run))
+    action = "to update" if args.dry_run else "updated"
+    print(f"[title-keys] {outdated} course(s) {action}")
+    return 1 if args.dry_run and outdated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
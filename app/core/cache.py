@@ -0,0 +1,193 @@
+"""In-process caches used to keep hot lookups off the database."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    The cache is meant to be used from the event loop only, so it does no
+    locking. Hit/miss/eviction counters are kept so callers can size it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` on a miss."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop ``key`` from the cache if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class PrincipalCache(TTLCache):
+    """Cache of authenticated user documents keyed by the token subject.
+
+    User writes only know the user id, so an id -> subject index is kept
+    alongside the entries to allow invalidation by id.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize, ttl)
+        self._subjects: dict[str, Hashable] = {}
+
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, value)
+        if value and "_id" in value:
+            self._subjects[str(value["_id"])] = key
+        if len(self._subjects) > 2 * max(self.maxsize, 1):
+            # drop index entries whose principal was evicted or expired
+            self._subjects = {
+                user_id: subject
+                for user_id, subject in self._subjects.items()
+                if subject in self._data
+            }
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the cached principal for ``user_id``, if any."""
+        subject = self._subjects.pop(str(user_id), None)
+        if subject is not None:
+            self.invalidate(subject)
+
+    def clear(self) -> None:
+        super().clear()
+        self._subjects.clear()
+
+
+class ReadThroughCache(TTLCache):
+    """TTL/LRU cache that loads missing entries itself.
+
+    Concurrent misses for the same key share a single load (single-flight),
+    so a hot key that expires triggers one database query, not one per
+    waiting request. Values are dicts; callers get a shallow copy. ``sizeof``
+    estimates the size of a value in bytes for the memory figure in stats().
+    """
+
+    def __init__(self, maxsize: int, ttl: float, sizeof=None):
+        super().__init__(maxsize, ttl)
+        self.sizeof = sizeof
+        self.loads = 0
+        self.coalesced = 0
+        self._sizes: dict[Hashable, int] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._stale: set[Hashable] = set()
+
+    async def get_or_load(self, key: Hashable, loader) -> dict | None:
+        """Return the value for ``key``, awaiting ``loader()`` on a miss.
+        None results are not cached."""
+        value = self.get(key)
+        if value is not None:
+            return dict(value)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this waiter itself was cancelled
+                # the request that was loading went away, load again
+                return await self.get_or_load(key, loader)
+            return dict(value) if value is not None else None
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.loads += 1
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # the exception is re-raised here, don't warn about the future
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            # a write during the load may have made the value stale
+            stale = key in self._stale
+            self._stale.discard(key)
+        if value is not None and not stale:
+            self.set(key, value)
+        future.set_result(value)
+        return dict(value) if value is not None else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        super().set(key, value)
+        if self.sizeof is not None:
+            self._sizes[key] = self.sizeof(value)
+
+    def invalidate(self, key: Hashable) -> None:
+        super().invalidate(key)
+        self._sizes.pop(key, None)
+        if key in self._inflight:
+            self._stale.add(key)
+
+    def clear(self) -> None:
+        super().clear()
+        self._sizes.clear()
+
+    def stats(self) -> dict:
+        """Counters plus estimated memory held by the live entries."""
+        stats = super().stats()
+        self._sizes = {
+            key: size for key, size in self._sizes.items() if key in self._data
+        }
+        stats.update(
+            loads=self.loads,
+            coalesced=self.coalesced,
+            memory_bytes=sum(self._sizes.values()),
+        )
+        return stats
@@ -11,15 +11,95 @@ class Settings(BaseSettings):
     Project_Name: str = "MindForge"
     MONGO_URL: str
     DB_NAME: str = "mindforge_db"
+
+    # production server (python -m app.serve); WEB_WORKERS=0 means one
+    # worker per available CPU. Keep-alive should outlast the load
+    # balancer's idle timeout so it never reuses a closed connection.
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 0
+    WEB_BACKLOG: int = 2048
+    WEB_KEEPALIVE_SECONDS: int = 75
+    WEB_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    WEB_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Motor connection pool, per worker (see app.core.database). None means
+    # no limit; MONGO_COMPRESSORS is a comma separated preference list, e.g.
+    # "zstd,snappy,zlib" (zstd and snappy need the zstandard/python-snappy
+    # packages, unavailable ones are skipped)
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MAX_IDLE_TIME_MS: int | None = None
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int | None = None
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGO_COMPRESSORS: str = ""
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # renewed through /auth/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
     # Add these lines:
     ADMIN_EMAIL: str | None = None
     ADMIN_PASSWORD: str | None = None
     USER_PASSWORD: str | None = None
 
+    # In-process cache of authenticated users (see get_current_user)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # how often each worker pulls token revocations made by other workers
+    TOKEN_REVOCATION_SYNC_SECONDS: float = 5
+
+    # course searches up to this length match title prefixes instead of $text
+    SEARCH_PREFIX_MAX_LENGTH: int = 3
+
+    # read-through cache of course documents (CourseModel.get_course_by_id)
+    COURSE_CACHE_TTL_SECONDS: float = 30
+    COURSE_CACHE_MAX_SIZE: int = 5000
+
+    # instructor dashboard pages (CourseModel.get_instructor_dashboard)
+    DASHBOARD_CACHE_TTL_SECONDS: float = 15
+    DASHBOARD_CACHE_MAX_SIZE: int = 1000
+
+    # listings with total_mode=cached (see app.utils.counting)
+    COUNT_CACHE_TTL_SECONDS: float = 30
+    COUNT_CACHE_MAX_SIZE: int = 1000
+
+    # reconcile the indexes declared by the models on startup, in the
+    # background (see app.init_indexes)
+    ENSURE_INDEXES_ON_STARTUP: bool = True
+
+    # count Mongo round trips and bytes per request and report them in the
+    # X-DB-Round-Trips / X-DB-Bytes-Sent / X-DB-Bytes-Received headers
+    DB_COMMAND_STATS: bool = False
+
+    # Mongo commands slower than this are logged and grouped by query shape
+    # over a rolling window (see app.core.slow_queries)
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+    SLOW_QUERY_WINDOW_SECONDS: float = 300
+    SLOW_QUERY_MAX_SHAPES: int = 500
+
+    # serve Prometheus metrics at /metrics (see app.core.metrics)
+    METRICS_ENABLED: bool = True
+    # break request time down into auth/db/serialization in a Server-Timing
+    # response header
+    SERVER_TIMING: bool = False
+
+    # buffer progress updates in memory and write the latest one per
+    # (user, course) in bulk (see app.utils.progress_buffer)
+    PROGRESS_WRITE_BEHIND: bool = False
+    PROGRESS_FLUSH_SECONDS: float = 5
+    PROGRESS_FLUSH_MAX_ENTRIES: int = 1000
+
+    # encode list endpoints through app.utils.responses.fast_response
+    FAST_JSON_RESPONSES: bool = False
+
+    # bcrypt worker pool (see app.utils.hashing)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 16
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+
     class Config:
         """Pydantic settings configuration"""
 
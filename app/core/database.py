@@ -1,11 +1,117 @@
-"""Database connection setup for MongoDB using Motor"""
+"""Database connection setup for MongoDB using Motor
+
+Models bind their collections at import time, but the client is owned by
+the app lifespan: connect() creates it on startup (warm_up() then selects a
+server and opens the minimum pool, so the first requests don't pay for
+connection setup) and close() closes it on shutdown. ``db`` and the
+collections taken from it resolve to the current client when used, so the
+app can be started again after a shutdown (tests, benchmarks), and scripts
+that never run the lifespan get a client on first use.
+"""
+
+import asyncio
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
 
 from app.core.config import settings
+from app.core.monitoring import command_counter, command_metrics, pool_metrics
+from app.core.slow_queries import slow_query_log
+
+
+def client_options() -> dict:
+    """Pool, timeout and compression options from the settings."""
+    options = {
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+
+client: AsyncIOMotorClient | None = None
+
+
+def connect() -> AsyncIOMotorClient:
+    """Return the current client, creating it if there is none. Motor does
+    not connect until the first operation."""
+    global client
+    if client is None:
+        client = AsyncIOMotorClient(
+            settings.MONGO_URL,
+            event_listeners=[
+                command_counter,
+                command_metrics,
+                slow_query_log,
+                pool_metrics,
+            ],
+            **client_options(),
+        )
+    return client
+
+
+class BoundCollection:
+    """A collection of the current client (see connect); attribute access
+    is forwarded to the Motor collection, rebound when the client changes."""
+
+    def __init__(self, database_name: str, name: str):
+        self.database_name = database_name
+        self.name = name
+        self._client: AsyncIOMotorClient | None = None
+        self._collection = None
 
-client = AsyncIOMotorClient(settings.MONGO_URL)
+    def __getattr__(self, attribute: str):
+        current = connect()
+        if self._client is not current:
+            self._collection = current[self.database_name][self.name]
+            self._client = current
+        return getattr(self._collection, attribute)
 
-db = client[settings.DB_NAME]
+
+class BoundDatabase:
+    """The ``name`` database of the current client; collections taken
+    from it with ``db[name]`` stay valid across clients."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getitem__(self, name: str) -> BoundCollection:
+        return BoundCollection(self.name, name)
+
+    def __getattr__(self, attribute: str):
+        return getattr(connect()[self.name], attribute)
+
+
+db = BoundDatabase(settings.DB_NAME)
 
 courses_collection = db["courses"]
+
+
+async def warm_up() -> None:
+    """Select a server and open MONGO_MIN_POOL_SIZE connections.
+
+    Failures are only logged: the driver keeps trying on the next request."""
+    admin = connect().admin
+    try:
+        await admin.command("ping")
+        # concurrent pings each check out their own connection
+        await asyncio.gather(
+            *(admin.command("ping") for _ in range(settings.MONGO_MIN_POOL_SIZE - 1))
+        )
+    except PyMongoError as exc:
+        print(f"[db] warm-up failed: {exc}")
+        return
+    print(f"[db] connection pool warmed ({settings.MONGO_MIN_POOL_SIZE} min)")
+
+
+def close() -> None:
+    """Close the pool's connections and stop the monitor threads; the next
+    connect() creates a new client."""
+    global client
+    if client is not None:
+        client.close()
+        client = None
@@ -0,0 +1,210 @@
+"""Process-local metrics rendered in the Prometheus text format.
+
+Only the three metric types the app needs are implemented: counters, gauges
+and histograms, each with a fixed list of label names. Mongo command
+listeners update them from Motor's executor threads, so every update takes
+the metric's lock. With several workers, each exposes its own values.
+"""
+
+import math
+import threading
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._values: dict[tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] += amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    """Observations counted in cumulative ``le`` buckets, plus sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts: dict[tuple, list[int]] = {}
+        self._sums: dict[tuple, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[labels] += value
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (labels, list(counts)) for labels, counts in self._counts.items()
+            )
+            sums = dict(self._sums)
+        lines = []
+        for labels, counts in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label_names, labels, le)} "
+                    f"{cumulative}"
+                )
+            label_text = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(sums[labels])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics exposed together at /metrics."""
+
+    def __init__(self):
+        self._metrics: list = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# ------- HTTP -------
+http_request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Request latency by route template.",
+        ("method", "route"),
+    )
+)
+http_requests = registry.register(
+    Counter(
+        "http_requests_total",
+        "Requests by route template and status code.",
+        ("method", "route", "status"),
+    )
+)
+http_requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "Requests being handled.")
+)
+
+# ------- MongoDB -------
+mongo_command_duration = registry.register(
+    Histogram(
+        "mongodb_command_duration_seconds",
+        "Mongo command latency by collection and command.",
+        ("collection", "command"),
+        DB_LATENCY_BUCKETS,
+    )
+)
+mongo_command_documents = registry.register(
+    Counter(
+        "mongodb_command_documents_total",
+        "Documents returned or written by Mongo commands.",
+        ("collection", "command"),
+    )
+)
+mongo_command_failures = registry.register(
+    Counter(
+        "mongodb_command_failures_total",
+        "Failed Mongo commands by collection and command.",
+        ("collection", "command"),
+    )
+)
+
+# ------- MongoDB connection pool -------
+mongo_pool_checkout_wait = registry.register(
+    Histogram(
+        "mongodb_pool_checkout_wait_seconds",
+        "Time spent waiting to check a connection out of the pool.",
+        buckets=POOL_WAIT_BUCKETS,
+    )
+)
+mongo_pool_checkout_failures = registry.register(
+    Counter(
+        "mongodb_pool_checkout_failures_total",
+        "Failed connection checkouts by reason.",
+        ("reason",),
+    )
+)
+mongo_pool_connections = registry.register(
+    Gauge("mongodb_pool_connections", "Open connections in the pools.")
+)
+mongo_pool_checked_out = registry.register(
+    Gauge("mongodb_pool_checked_out", "Connections checked out of the pools.")
+)
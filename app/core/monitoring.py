@@ -0,0 +1,312 @@
+"""Request and MongoDB command monitoring.
+
+Two command listeners are registered on the Motor client
+(app.core.database):
+
+- CommandCounter adds every command sent for a tracked request
+  (track_commands) to that request's CommandStats. Each command is one
+  round trip, getMore included. Its duration is recorded, and with
+  ``count_bytes`` the BSON sizes of the command and the reply too (without
+  wire headers or compression).
+- CommandMetrics records the duration and document count of every command
+  by collection and command name (app.core.metrics).
+
+Motor runs driver calls in a thread pool with a copy of the caller's
+context, so the listeners find the request's stats in a ContextVar.
+Commands sent by background tasks are not attributed to any request.
+
+Handlers mark phases of a request with timed() ("auth", "serialization");
+the request middleware (instrument_requests) reports them with the
+database time in a Server-Timing header when SERVER_TIMING is on.
+"""
+
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+import bson
+from fastapi import Request
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.core.metrics import (
+    http_request_duration,
+    http_requests,
+    http_requests_in_flight,
+    mongo_command_documents,
+    mongo_command_duration,
+    mongo_command_failures,
+    mongo_pool_checked_out,
+    mongo_pool_checkout_failures,
+    mongo_pool_checkout_wait,
+    mongo_pool_connections,
+)
+
+
+@dataclass
+class CommandStats:
+    """Commands and bytes exchanged with MongoDB for one unit of work."""
+
+    count_bytes: bool = True
+    commands: int = 0
+    duration: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    names: list[str] = field(default_factory=list)
+    # listener callbacks run on Motor's executor threads
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_command(self, name: str, size: int) -> None:
+        with self._lock:
+            self.commands += 1
+            self.bytes_sent += size
+            self.names.append(name)
+
+    def add_reply(self, size: int, duration: float) -> None:
+        with self._lock:
+            self.bytes_received += size
+            self.duration += duration
+
+
+_current_stats: ContextVar[CommandStats | None] = ContextVar(
+    "mongo_command_stats", default=None
+)
+
+
+@contextmanager
+def track_commands(count_bytes: bool = True):
+    """Count the Mongo commands issued inside the block (and the tasks and
+    driver calls it starts)."""
+    stats = CommandStats(count_bytes=count_bytes)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Adds every command to the stats of the request that issued it."""
+
+    def started(self, event) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            size = len(bson.encode(event.command)) if stats.count_bytes else 0
+            stats.add_command(event.command_name, size)
+
+    def succeeded(self, event) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            size = len(bson.encode(event.reply)) if stats.count_bytes else 0
+            stats.add_reply(size, event.duration_micros / 1e6)
+
+    def failed(self, event) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add_reply(0, event.duration_micros / 1e6)
+
+
+def _collection_name(command_name: str, command) -> str:
+    if command_name == "getMore":
+        return command.get("collection", "-")
+    target = command.get(command_name)
+    return target if isinstance(target, str) else "-"
+
+
+def _document_count(command_name: str, reply) -> int:
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return reply.get("n", 0)
+
+
+class CommandMetrics(monitoring.CommandListener):
+    """Records latency and documents per collection and command."""
+
+    def __init__(self):
+        # started and succeeded/failed events are matched by request id
+        self._collections: dict[tuple, str] = {}
+
+    def started(self, event) -> None:
+        key = (event.connection_id, event.request_id)
+        self._collections[key] = _collection_name(event.command_name, event.command)
+
+    def succeeded(self, event) -> None:
+        key = (event.connection_id, event.request_id)
+        labels = (self._collections.pop(key, "-"), event.command_name)
+        mongo_command_duration.observe(event.duration_micros / 1e6, *labels)
+        documents = _document_count(event.command_name, event.reply)
+        if documents:
+            mongo_command_documents.inc(*labels, amount=documents)
+
+    def failed(self, event) -> None:
+        key = (event.connection_id, event.request_id)
+        labels = (self._collections.pop(key, "-"), event.command_name)
+        mongo_command_duration.observe(event.duration_micros / 1e6, *labels)
+        mongo_command_failures.inc(*labels)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Records connection checkout waits and pool occupancy."""
+
+    def connection_checked_out(self, event) -> None:
+        mongo_pool_checkout_wait.observe(event.duration or 0.0)
+        mongo_pool_checked_out.inc()
+
+    def connection_check_out_failed(self, event) -> None:
+        mongo_pool_checkout_wait.observe(event.duration or 0.0)
+        mongo_pool_checkout_failures.inc(str(event.reason))
+
+    def connection_checked_in(self, event) -> None:
+        mongo_pool_checked_out.dec()
+
+    def connection_created(self, event) -> None:
+        mongo_pool_connections.inc()
+
+    def connection_closed(self, event) -> None:
+        mongo_pool_connections.dec()
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+
+command_counter = CommandCounter()
+command_metrics = CommandMetrics()
+pool_metrics = PoolMetrics()
+
+
+@dataclass
+class RequestTimings:
+    """Wall time spent in named phases of one request."""
+
+    phases: dict[str, float] = field(default_factory=dict)
+    active: set[str] = field(default_factory=set)
+    endpoint_done: float | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+_current_timings: ContextVar[RequestTimings | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to ``phase`` of the current request.
+    Nested blocks of the same phase are counted once."""
+    timings = _current_timings.get()
+    if timings is None or phase in timings.active:
+        yield
+        return
+    timings.active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(phase)
+        timings.add(phase, time.perf_counter() - start)
+
+
+def _mark_endpoint_done(call):
+    def mark():
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.endpoint_done = time.perf_counter()
+
+    if inspect.iscoroutinefunction(call):
+
+        async def async_endpoint(**values):
+            try:
+                return await call(**values)
+            finally:
+                mark()
+
+        return async_endpoint
+
+    def endpoint(**values):
+        try:
+            return call(**values)
+        finally:
+            mark()
+
+    return endpoint
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that records the time FastAPI spends validating and
+    encoding the endpoint's return value as the "serialization" phase."""
+
+    def get_route_handler(self):
+        self.dependant.call = _mark_endpoint_done(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request):
+            response = await handler(request)
+            timings = _current_timings.get()
+            if timings is not None and timings.endpoint_done is not None:
+                timings.add(
+                    "serialization", time.perf_counter() - timings.endpoint_done
+                )
+            return response
+
+        return timed_handler
+
+
+def server_timing(phases: dict[str, float]) -> str:
+    """Server-Timing header value for phase durations in seconds."""
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items()
+    )
+
+
+async def instrument_requests(request: Request, call_next):
+    """HTTP middleware: route metrics, X-DB-* and Server-Timing headers."""
+    with track_commands(settings.DB_COMMAND_STATS) as stats:
+        timings = RequestTimings()
+        token = _current_timings.set(timings)
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            _current_timings.reset(token)
+            # the route template keeps the label set bounded
+            route = request.scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            http_request_duration.observe(elapsed, request.method, path)
+            http_requests.inc(request.method, path, str(status_code))
+    if settings.DB_COMMAND_STATS:
+        response.headers["X-DB-Round-Trips"] = str(stats.commands)
+        response.headers["X-DB-Bytes-Sent"] = str(stats.bytes_sent)
+        response.headers["X-DB-Bytes-Received"] = str(stats.bytes_received)
+    if settings.SERVER_TIMING:
+        phases = {**timings.phases, "db": stats.duration, "total": elapsed}
+        response.headers["Server-Timing"] = server_timing(phases)
+    return response
@@ -0,0 +1,160 @@
+"""Slow Mongo command log.
+
+SlowQueryLog is a command listener (registered in app.core.database) that
+keeps every command slower than SLOW_QUERY_THRESHOLD_MS. Commands are
+grouped by query shape: the collection, the command and its filter, sort
+and pipeline with every value replaced by "?", so
+``{"title": {"$regex": "^py"}}`` and ``{"title": {"$regex": "^ja"}}`` count
+as the same query. Per shape, the durations seen in the last
+SLOW_QUERY_WINDOW_SECONDS are kept to report counts and p50/p99.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+# parts of a command that define its shape (values are stripped)
+_SHAPE_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort"),
+}
+# keys whose values are part of the shape (sort directions, projections)
+_KEEP_VALUES = {"sort", "$sort", "projection", "$project", "key"}
+# per shape, at most this many durations are kept for the percentiles
+_MAX_SAMPLES = 1000
+
+
+def normalize(value, keep_values: bool = False):
+    """Replace the literal values of a filter or pipeline with "?"."""
+    if isinstance(value, dict):
+        return {
+            key: normalize(item, keep_values or key in _KEEP_VALUES)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, dict) for item in value):
+            return [normalize(item, keep_values) for item in value]
+        return "?"
+    if keep_values and isinstance(value, (int, float, str, bool)):
+        return value
+    return "?"
+
+
+def query_shape(command_name: str, command) -> str:
+    """Stable, value-free description of what a command asks for."""
+    if command_name in ("update", "delete"):
+        statements = command.get(command_name + "s") or [{}]
+        parts = {"q": statements[0].get("q", {})}
+    else:
+        fields = _SHAPE_FIELDS.get(command_name, ())
+        parts = {name: command[name] for name in fields if name in command}
+    return json.dumps(normalize(parts), sort_keys=False, default=str)
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = max(
+        0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+class SlowQueryLog(monitoring.CommandListener):
+    """Groups slow commands by shape over a rolling window."""
+
+    def __init__(self, threshold_ms: float, window_seconds: float, max_shapes: int):
+        self.threshold = threshold_ms / 1000
+        self.window = window_seconds
+        self.max_shapes = max_shapes
+        self._commands: dict[tuple, tuple[str, str, object]] = {}
+        # (collection, command, shape) -> deque of (monotonic time, seconds)
+        self._samples: OrderedDict[tuple, deque] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def started(self, event) -> None:
+        command = event.command
+        target = command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = command.get("collection")
+        collection = target if isinstance(target, str) else "-"
+        # the shape is only computed for commands that turn out slow
+        key = (event.connection_id, event.request_id)
+        self._commands[key] = (collection, event.command_name, command)
+
+    def succeeded(self, event) -> None:
+        self._finished(event)
+
+    def failed(self, event) -> None:
+        self._finished(event)
+
+    def _finished(self, event) -> None:
+        started = self._commands.pop((event.connection_id, event.request_id), None)
+        seconds = event.duration_micros / 1e6
+        if started is None or seconds < self.threshold:
+            return
+        collection, command_name, command = started
+        shape = query_shape(command_name, command)
+        print(
+            f"[slow-query] {collection}.{command_name} {seconds * 1000:.1f} ms {shape}"
+        )
+        self.record(collection, command_name, shape, seconds)
+
+    def record(self, collection: str, command: str, shape: str, seconds: float):
+        key = (collection, command, shape)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=_MAX_SAMPLES)
+            self._samples.move_to_end(key)
+            samples.append((time.monotonic(), seconds))
+            while len(self._samples) > self.max_shapes:
+                self._samples.popitem(last=False)
+
+    def top(self, limit: int = 20) -> list[dict]:
+        """Shapes seen in the window, by total time spent, slowest first."""
+        cutoff = time.monotonic() - self.window
+        rows = []
+        with self._lock:
+            for key, samples in list(self._samples.items()):
+                while samples and samples[0][0] < cutoff:
+                    samples.popleft()
+                if not samples:
+                    del self._samples[key]
+                    continue
+                durations = sorted(seconds for _, seconds in samples)
+                collection, command, shape = key
+                rows.append(
+                    {
+                        "collection": collection,
+                        "command": command,
+                        "shape": shape,
+                        "count": len(durations),
+                        "total_ms": round(sum(durations) * 1000, 2),
+                        "p50_ms": round(_percentile(durations, 0.5) * 1000, 2),
+                        "p99_ms": round(_percentile(durations, 0.99) * 1000, 2),
+                        "max_ms": round(durations[-1] * 1000, 2),
+                    }
+                )
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows[:limit]
+
+    def stats(self, limit: int = 20) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "window_seconds": self.window,
+            "shapes": self.top(limit),
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    window_seconds=settings.SLOW_QUERY_WINDOW_SECONDS,
+    max_shapes=settings.SLOW_QUERY_MAX_SHAPES,
+)
@@ -10,36 +10,65 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
 from app.core.config import settings
+from app.core.monitoring import timed
+from app.models.token_revocation import TokenRevocationModel
 from app.models.user import UserModel
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Get the current user from the JWT token."""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:
+    """Decode the bearer token and make sure it has a subject."""
     try:
         if token.startswith("bearer "):
             token = token.split("bearer ")[-1]
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError as exc:
-        raise credentials_exception from exc
-    user = await UserModel.get_by_email(email)
+        raise _credentials_exception() from exc
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Get the current user from the JWT token."""
+    with timed("auth"):
+        email: str = _decode_token(token)["sub"]
+        user = await UserModel.get_principal(email)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
 
-def admin_required(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_current_principal(token: str = Depends(oauth2_scheme)):
+    """Get the caller's id, email and role from the token's signed claims.
+
+    No user lookup is made: the claims are trusted unless the token's
+    version has been revoked. Tokens issued without these claims fall back
+    to loading the user. Handlers that need the full profile should depend
+    on get_current_user instead."""
+    with timed("auth"):
+        payload = _decode_token(token)
+        user_id, role = payload.get("uid"), payload.get("role")
+        if user_id is None or role is None:
+            return await get_current_user(token)
+        revoked = TokenRevocationModel.is_revoked(user_id, payload.get("ver", 0))
+    if revoked:
+        raise _credentials_exception()
+    return {"_id": user_id, "email": payload["sub"], "role": role}
+
+
+def admin_required(current_user: Dict[str, Any] = Depends(get_current_principal)):
     """Ensure the current user is an admin."""
     if current_user["role"] != "admin":
         raise HTTPException(
@@ -1,13 +1,20 @@
 from fastapi import Depends, HTTPException, status
 
-from app.dependencies.auth import get_current_user
+from app.dependencies.auth import get_current_principal
 
 
-def require_role(*roles: list[str]):
-    """Decorator to require a specific role for the current user."""
+def require_role(*roles: str | list[str]):
+    """Decorator to require a specific role for the current user.
+    Roles may be given as arguments or as a single list. The role is read
+    from the token claims, so no user lookup is made."""
+    allowed = {
+        role
+        for entry in roles
+        for role in (entry if isinstance(entry, (list, tuple)) else [entry])
+    }
 
-    async def role_checker(user=Depends(get_current_user)):
-        if user["role"] not in roles:
+    async def role_checker(user=Depends(get_current_principal)):
+        if user["role"] not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Operation not permitted for the current user role",
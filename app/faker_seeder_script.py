@@ -101,9 +101,12 @@ async def seed():
 
     for _ in range(NUM_COURSES):
         instructor_email = random.choice(instructors) if instructors else None
+        title = fake.sentence(nb_words=5)
         course_docs.append(
             {
-                "title": fake.sentence(nb_words=5),
+                "title": title,
+                # matched by title prefix searches
+                "title_lower": title.lower(),
                 "description": fake.paragraph(),
                 "category": random.choice(course_categories),
                 "instructor": instructor_email,
@@ -1,50 +1,180 @@
 """
-It creates necessary indexes on the users collection,
-to ensure efficient querying.
+Declarative index management.
+
+Each model declares the indexes its queries need in an ``indexes`` class
+attribute (a list of pymongo IndexModel). reconcile_indexes compares them
+with the indexes that exist in the database and creates the missing ones.
+Indexes found in the database but not declared are only reported, never
+dropped, and neither are declared indexes whose options differ from the
+existing ones.
+
+Each missing index is built by its own command: one that cannot be built,
+e.g. a unique index over existing duplicates, is reported as failed and the
+others are still created. Enrollment and progress writes rely on their
+unique indexes, so a failure is printed as an error (and the command exits
+1); conditional progress writes check for theirs themselves
+(ProgressModel.require_unique_index).
+
+The app reconciles on startup when ENSURE_INDEXES_ON_STARTUP is set. To see
+the drift without changing anything:
+
+    python -m app.init_indexes --dry-run
 """
 
+import argparse
 import asyncio
+import sys
 
-from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
 
-MONGO_URL = "mongodb://mongo:27017"
-DB_NAME = "mindforge_db"
+from app.core.database import db
+from app.models.course import CourseModel
+from app.models.enrollment import EnrollmentModel
+from app.models.progress import ProgressModel
+from app.models.refresh_token import RefreshTokenModel
+from app.models.token_revocation import TokenRevocationModel
+from app.models.user import UserModel
 
+MODELS = (
+    UserModel,
+    CourseModel,
+    EnrollmentModel,
+    ProgressModel,
+    TokenRevocationModel,
+    RefreshTokenModel,
+)
 
-async def create_indexes():
-    """
-    Create necessary indexes for the MongoDB collections.
-    This function is called during the application startup.
-    """
-    client = AsyncIOMotorClient(MONGO_URL)
-    db = client[DB_NAME]
+# index options that make two indexes with the same keys different
+_COMPARED_OPTIONS = (
+    "unique",
+    "sparse",
+    "expireAfterSeconds",
+    "partialFilterExpression",
+)
 
-    print("Creating indexes...")
 
-    # ------- Indexes for users collection -------
+def index_registry(models=MODELS) -> dict[str, list[IndexModel]]:
+    """Declared indexes by collection name."""
+    registry: dict[str, list[IndexModel]] = {}
+    for model in models:
+        registry.setdefault(model.collection.name, []).extend(model.indexes)
+    return registry
 
-    # Create unique index on email field in users collection
-    await db["users"].create_index([("email", ASCENDING)], unique=True)
-    # Create single field index on role field in users collection
-    await db["users"].create_index([("role", ASCENDING)])
-    # Create compound index on first_name and last_name fields in users collection
-    await db["users"].create_index([("first_name", 1), ("last_name", 1)])
-    # Create text index on address field in users collection for full-text search
-    await db["users"].create_index([("address", "text")])
 
-    # ------- Indexes for courses collection -------
-    await db["courses"].create_index(
-        [("title", "text"), ("description", "text"), ("category", "text")]
-    )
-    await db["courses"].create_index([("instructor", ASCENDING)])
-    await db["courses"].create_index([("created_at", ASCENDING)])
-    await db["courses"].create_index([("category", ASCENDING)])
+def _options(spec: dict) -> dict:
+    return {
+        option: spec[option]
+        for option in _COMPARED_OPTIONS
+        if option in spec and spec[option] is not False
+    }
+
+
+def index_drift(declared: list[IndexModel], existing: dict) -> dict:
+    """Compare declared indexes with ``collection.index_information()``.
+
+    Returns the declared indexes that are ``missing``, the names of those
+    whose options ``changed`` and the names of ``extra`` undeclared ones."""
+    missing, changed = [], []
+    for index in declared:
+        name = index.document["name"]
+        if name not in existing:
+            missing.append(index)
+        elif _options(index.document) != _options(existing[name]):
+            changed.append(name)
+    declared_names = {index.document["name"] for index in declared}
+    extra = [name for name in existing if name != "_id_" and name not in declared_names]
+    return {"missing": missing, "changed": changed, "extra": extra}
+
+
+async def reconcile_indexes(database=db, dry_run: bool = False) -> dict:
+    """Create missing declared indexes and report drift per collection.
 
-    print("Indexes created successfully.")
+    ``missing`` lists the indexes that were missing (created, unless they
+    are in ``failed``, which maps an index name to the build error)."""
+    report = {}
+    for collection_name, declared in index_registry().items():
+        collection = database[collection_name]
+        drift = index_drift(declared, await collection.index_information())
+        failed = {}
+        for index in drift["missing"] if not dry_run else []:
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as exc:
+                failed[index.document["name"]] = str(exc)
+        report[collection_name] = {
+            "missing": [index.document["name"] for index in drift["missing"]],
+            "failed": failed,
+            "changed": drift["changed"],
+            "extra": drift["extra"],
+        }
+    return report
 
-    client.close()
+
+def print_report(report: dict, dry_run: bool = False) -> bool:
+    """Print the drift report; returns whether there was any drift."""
+    drifted = False
+    for collection_name, drift in report.items():
+        for name in drift["missing"]:
+            if name in drift["failed"]:
+                print(
+                    f"[indexes] ERROR {collection_name}.{name}: not built: "
+                    f"{drift['failed'][name]}"
+                )
+                continue
+            action = "missing" if dry_run else "created"
+            print(f"[indexes] {collection_name}.{name}: {action}")
+        for name in drift["changed"]:
+            print(f"[indexes] {collection_name}.{name}: options differ, not changed")
+        for name in drift["extra"]:
+            print(f"[indexes] {collection_name}.{name}: not declared, not dropped")
+        drifted = drifted or any(drift.values())
+    if not drifted:
+        print("[indexes] all declared indexes are in place")
+    return drifted
+
+
+async def ensure_indexes() -> None:
+    """Startup hook: reconcile without ever failing the app."""
+    try:
+        report = await reconcile_indexes()
+    except PyMongoError as exc:
+        print(f"[indexes] ERROR reconciliation failed: {exc}")
+        return
+    print_report(report)
+    failed = failed_indexes(report)
+    if failed:
+        print(
+            f"[indexes] ERROR {len(failed)} index(es) could not be built: "
+            f"{', '.join(failed)}; see above, then run python -m app.init_indexes"
+        )
+
+
+def failed_indexes(report: dict) -> list[str]:
+    """``collection.index`` names that could not be built."""
+    return [
+        f"{collection_name}.{name}"
+        for collection_name, drift in report.items()
+        for name in drift["failed"]
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.init_indexes",
+        description="Create the indexes declared by the models.",
+        epilog="Exits 1 when a missing index could not be built.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report missing, changed and extra indexes (exit 1 on drift)",
+    )
+    args = parser.parse_args(argv)
+    report = asyncio.run(reconcile_indexes(dry_run=args.dry_run))
+    drifted = print_report(report, dry_run=args.dry_run)
+    return 1 if failed_indexes(report) or (args.dry_run and drifted) else 0
 
 
 if __name__ == "__main__":
-    asyncio.run(create_indexes())
+    sys.exit(main())
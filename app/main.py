@@ -3,13 +3,23 @@ MindForge FastAPI Application
 this is the main entry point for the FastAPI application.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.openapi.utils import get_openapi
-
+from fastapi.responses import PlainTextResponse
+
+from app.core import database
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.monitoring import instrument_requests
+from app.init_indexes import ensure_indexes
+from app.models.token_revocation import TokenRevocationModel
 from app.routers import auth, course, enrollment, progress, user
+from app.utils.hashing import password_hasher
 from app.utils.initialize_admin import create_initial_admin
+from app.utils.progress_buffer import progress_buffer
 
 
 # ---------------------------
@@ -17,10 +27,38 @@ from app.utils.initialize_admin import create_initial_admin
 # ---------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: a new client and pool every time, as shutdown closes them
+    database.connect()
+    await database.warm_up()
+    index_build = None
+    if settings.ENSURE_INDEXES_ON_STARTUP:
+        # requests are served while the indexes build
+        index_build = asyncio.create_task(ensure_indexes())
     await create_initial_admin()
+    await TokenRevocationModel.sync()
+    revocation_sync = asyncio.create_task(
+        TokenRevocationModel.run_sync_loop(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+    )
+    progress_flush = None
+    if settings.PROGRESS_WRITE_BEHIND:
+        progress_flush = asyncio.create_task(progress_buffer.run_flush_loop())
     yield
-    # Shutdown (if needed, add cleanup here later)
+    # Shutdown
+    if progress_flush is not None:
+        progress_flush.cancel()
+        with suppress(asyncio.CancelledError):
+            await progress_flush
+    # write what is still buffered before the client closes
+    await progress_buffer.flush()
+    revocation_sync.cancel()
+    with suppress(asyncio.CancelledError):
+        await revocation_sync
+    if index_build is not None:
+        index_build.cancel()
+        with suppress(asyncio.CancelledError):
+            await index_build
+    password_hasher.shutdown()
+    database.close()
 
 
 app = FastAPI(
@@ -30,6 +68,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+
+# ---------------------------
+# Request metrics, X-DB-* and Server-Timing headers
+# ---------------------------
+app.middleware("http")(instrument_requests)
+
+
 # ---------------------------
 # Include routers
 # ---------------------------
@@ -64,6 +109,16 @@ async def health():
     return {"status": "ok"}
 
 
+# ---------------------------
+# Prometheus metrics
+# ---------------------------
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 # ---------------------------
 # Custom OpenAPI
 # ---------------------------
@@ -3,41 +3,94 @@ defines the CourseModel class for performing CRUD operations on courses
 in a MongoDB database.
 """
 
+import asyncio
 from datetime import datetime, timezone
 from typing import Optional
 
+import bson
 from bson import ObjectId, errors
 from bson.errors import InvalidId
 from fastapi import HTTPException
+from pymongo import ASCENDING, TEXT, IndexModel, ReturnDocument
 
+from app.core.cache import ReadThroughCache
+from app.core.config import settings
 from app.core.database import courses_collection, db
+from app.models.course_stats import CourseStatsModel, summarize
+from app.schemas.course import COURSE_OUT_PROJECTION
+from app.utils.counting import TotalMode, invalidate_counts
+from app.utils.pagination import cursor_filter, fetch_page, next_cursor, sort_spec
+from app.utils.search import (
+    TEXT_SCORE,
+    is_prefix_query,
+    prefix_filter,
+    relevance_sort,
+    text_filter,
+    title_key,
+)
+from app.utils.serialization import serialize_document
 
 collection = db["courses"]
 
+# course documents by id, see get_course_by_id
+course_cache = ReadThroughCache(
+    maxsize=settings.COURSE_CACHE_MAX_SIZE,
+    ttl=settings.COURSE_CACHE_TTL_SECONDS,
+    sizeof=lambda course: len(bson.encode(course)),
+)
+
+# instructor dashboard pages by (instructor, skip, limit, cursor)
+dashboard_cache = ReadThroughCache(
+    maxsize=settings.DASHBOARD_CACHE_MAX_SIZE,
+    ttl=settings.DASHBOARD_CACHE_TTL_SECONDS,
+)
+
 
 class CourseModel:
     """Model for course operations."""
 
     collection = courses_collection
+    # applied by app.init_indexes; listings sort by (<sort field>, _id)
+    indexes = [
+        IndexModel([("title", TEXT), ("description", TEXT), ("category", TEXT)]),
+        IndexModel(
+            [("instructor", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]
+        ),
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("title", ASCENDING), ("_id", ASCENDING)]),
+        # title prefix searches, see app.utils.search
+        IndexModel([("title_lower", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel(
+            [("category", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]
+        ),
+    ]
 
     @classmethod
     async def create_course(cls, course_data: dict):
         """Create a new course in the database."""
+        course_data["title_lower"] = title_key(course_data["title"])
         result = await cls.collection.insert_one(course_data)
+        invalidate_counts(cls.collection.name)
         course_data["_id"] = str(result.inserted_id)
         return course_data
 
     @classmethod
     async def get_course_by_id(cls, course_id: str):
-        """Retrieve a course by its ID."""
+        """Retrieve a course by its ID.
+        Served from course_cache; concurrent misses share one query."""
         try:
             obj_id = ObjectId(course_id)  # Convert string to ObjectId
-        except InvalidId:
+        except (InvalidId, TypeError):
             return None  # Invalid ObjectId format
-        course = await cls.collection.find_one({"_id": obj_id})
-        if course:
-            course["id"] = str(course["_id"])
-        return course
+
+        async def load():
+            course = await cls.collection.find_one(
+                {"_id": obj_id}, COURSE_OUT_PROJECTION
+            )
+            return serialize_document(course)
+
+        return await course_cache.get_or_load(str(obj_id), load)
 
     @classmethod
     async def get_all_courses(
@@ -49,8 +102,14 @@ class CourseModel:
         search: Optional[str] = None,
         sort_by: Optional[str] = "created_at",
         sort_order: Optional[int] = -1,
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = TotalMode.EXACT,
     ):
-        """Retrieve all courses with pagination, filtering, searching, and sorting."""
+        """Retrieve all courses with pagination, filtering, searching, and sorting.
+        Pages are addressed either by ``skip`` or, cheaper for deep pages,
+        by the ``cursor`` returned as ``next_cursor`` with the previous page.
+        Full-text searches are ranked by relevance and paged with ``skip``.
+        ``total_mode`` selects how the total is counted (app.utils.counting)."""
         query: dict = {}
         # ----------filtering-----------
         if category:
@@ -58,11 +117,12 @@ class CourseModel:
         if instructor:
             query["instructor"] = instructor
         # ----------searching-----------
-        if search:
-            query["$or"] = [
-                {"title": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}},
-            ]
+        search = search.strip() if search else None
+        ranked = bool(search) and not is_prefix_query(search)
+        if ranked:
+            query.update(text_filter(search))
+        elif search:
+            query.update(prefix_filter(search))
         # ----------sorting-----------
         valid_sort_fields = ["title", "created_at", "updated_at"]
         if sort_by not in valid_sort_fields:
@@ -72,101 +132,227 @@ class CourseModel:
                 detail=f"Invalid sort field. Valid fields are: {valid_fields}",
             )
 
-        courses = []
-        cursor = (
-            cls.collection.find(query).sort(sort_by, sort_order).skip(skip).limit(limit)
+        if ranked:
+            if cursor:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cursor pagination is not supported for text search",
+                )
+            page = await fetch_page(
+                cls.collection,
+                query,
+                sort=relevance_sort(),
+                skip=skip,
+                limit=limit,
+                projection={**COURSE_OUT_PROJECTION, "score": TEXT_SCORE},
+                total_mode=total_mode,
+            )
+        else:
+            page = await fetch_page(
+                cls.collection,
+                query,
+                sort=sort_spec(sort_by, sort_order),
+                skip=skip,
+                limit=limit,
+                after=cursor_filter(cursor, sort_by, sort_order),
+                projection=COURSE_OUT_PROJECTION,
+                total_mode=total_mode,
+            )
+        courses = [serialize_document(course) for course in page["docs"]]
+        if ranked:
+            # keep documents in the exact CourseOut shape
+            for course in courses:
+                course.pop("score", None)
+        has_more = page["has_more"]
+        return {
+            "total": page["total"],
+            "data": courses,
+            "has_more": has_more,
+            "next_cursor": (
+                next_cursor(courses, limit, sort_by, sort_order)
+                if has_more and not ranked
+                else None
+            ),
+        }
+
+    @classmethod
+    async def get_instructor_dashboard(
+        cls,
+        instructor: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> dict:
+        """An instructor's courses, newest first, each with its enrollment
+        and progress stats from the course_stats rollup. Pages are cached
+        for DASHBOARD_CACHE_TTL_SECONDS."""
+
+        async def load():
+            return await cls._load_dashboard(instructor, skip, limit, cursor)
+
+        return await dashboard_cache.get_or_load(
+            (instructor, skip, limit, cursor), load
+        )
+
+    @classmethod
+    async def _load_dashboard(
+        cls, instructor: str, skip: int, limit: int, cursor: Optional[str]
+    ) -> dict:
+        """Page with its stats, and the instructor's course count, run
+        concurrently."""
+        sort_by, sort_order = "created_at", -1
+        pipeline = cls.dashboard_pipeline(
+            instructor, skip, limit, cursor_filter(cursor, sort_by, sort_order)
+        )
+        page, total = await asyncio.gather(
+            cls.collection.aggregate(pipeline).to_list(length=limit + 1),
+            cls.collection.count_documents({"instructor": instructor}),
         )
-        async for course in cursor:
-            course["_id"] = str(course["_id"])
-            # courses.append(course)
+        courses = []
+        for course in page[:limit]:
+            stats = summarize(course["course_id"], (course["stats"] or [{}])[0])
             courses.append(
                 {
-                    "id": course["_id"],
+                    "id": course["course_id"],
                     "title": course["title"],
-                    "description": course["description"],
                     "category": course.get("category"),
-                    "instructor": course["instructor"],
-                    "duration": course.get("duration"),
                     "created_at": course.get("created_at"),
-                    "updated_at": course.get("updated_at"),
+                    "enrolled": stats["enrolled"],
+                    "started": stats["started"],
+                    "completed": stats["completed"],
+                    "average_progress": stats["average_progress"],
+                    "completion_rate": stats["completion_rate"],
                 }
             )
-        total = await cls.collection.count_documents(query)
-        return {"total": total, "data": courses}
+        has_more = len(page) > limit
+        return {
+            "total": total,
+            "data": courses,
+            "has_more": has_more,
+            "next_cursor": (
+                next_cursor(courses, limit, sort_by, sort_order) if has_more else None
+            ),
+        }
+
+    @staticmethod
+    def dashboard_pipeline(
+        instructor: str, skip: int, limit: int, after: dict | None
+    ) -> list[dict]:
+        """Aggregation behind get_instructor_dashboard (also explained by
+        app.query_audit); ``after`` is its keyset filter. The page is
+        matched, sorted and limited before the stats join, so the
+        (instructor, created_at, _id) index bounds what is read."""
+        query = {"instructor": instructor}
+        pipeline: list[dict] = [
+            {"$match": {"$and": [query, after]} if after is not None else query},
+            {"$sort": dict(sort_spec("created_at", -1))},
+        ]
+        if after is None and skip:
+            pipeline.append({"$skip": skip})
+        return pipeline + [
+            # one extra document tells whether another page follows
+            {"$limit": limit + 1},
+            {
+                "$project": {
+                    "title": 1,
+                    "category": 1,
+                    "created_at": 1,
+                    "course_id": {"$toString": "$_id"},
+                }
+            },
+            {
+                "$lookup": {
+                    "from": CourseStatsModel.collection.name,
+                    "localField": "course_id",
+                    "foreignField": "_id",
+                    "as": "stats",
+                }
+            },
+        ]
 
     @classmethod
-    async def update_course(cls, course_id: str, course_data: dict):
-        """Update an existing course."""
+    async def update_course(
+        cls, course_id: str, course_data: dict, owner: Optional[str] = None
+    ):
+        """Update an existing course and return the updated document.
+
+        With ``owner`` the update only applies to a course whose instructor
+        is ``owner``: the check is part of the write filter, so no read is
+        needed first. Returns None if the course does not exist and raises
+        PermissionError if it belongs to someone else."""
         try:
             obj_id = ObjectId(course_id)
         except errors.InvalidId:
             return None  # Invalid ObjectId format
-        # course_data["_id"] = obj_id
         course_data["updated_at"] = course_data.get(
             "updated_at", datetime.now(timezone.utc).isoformat()
         )
-        # result = await cls.collection.replace_one({"_id": obj_id}, course_data)
-        result = await cls.collection.update_one(
-            {"_id": obj_id}, {"$set": course_data}  # Use $set to update fields
+        if course_data.get("title") is not None:
+            course_data["title_lower"] = title_key(course_data["title"])
+        updated_course = await cls.collection.find_one_and_update(
+            cls._write_filter(obj_id, owner),
+            {"$set": course_data},  # Use $set to update fields
+            projection=COURSE_OUT_PROJECTION,
+            return_document=ReturnDocument.AFTER,
         )
-        if result.modified_count == 0:
+        course_cache.invalidate(str(obj_id))
+        if updated_course is None:
+            await cls._raise_if_not_owner(obj_id, owner)
             return None
-        updated_course = await cls.collection.find_one({"_id": obj_id})
-        if updated_course:
-            updated_course["_id"] = str(updated_course["_id"])
-            # Convert ObjectId to string for JSON serialization
-            return updated_course
-        # course_data["id"] = str(obj_id)
-        # return course_data
+        invalidate_counts(cls.collection.name)
+        return serialize_document(updated_course)
 
     @classmethod
     async def get_courses_by_instructor(cls, instructor_email: str):
         """Retrieve courses by instructor's email."""
         courses = []
-        async for course in cls.collection.find({"instructor": instructor_email}):
-            course["_id"] = str(course["_id"])
-            courses.append(
-                {
-                    "id": course["_id"],
-                    "title": course["title"],
-                    "description": course["description"],
-                    "category": course.get("category"),
-                    "instructor": course["instructor"],
-                    "duration": course.get("duration"),
-                    "created_at": course.get("created_at"),
-                    "updated_at": course.get("updated_at"),
-                }
-            )
+        async for course in cls.collection.find(
+            {"instructor": instructor_email}, COURSE_OUT_PROJECTION
+        ):
+            courses.append(serialize_document(course))
         return courses
 
     @classmethod
     async def get_courses_by_category(cls, category: str):
         """Retrieve courses by category."""
         courses = []
-        async for course in cls.collection.find({"category": category}):
-            course["_id"] = str(course["_id"])
-            courses.append(
-                {
-                    "id": course["_id"],
-                    "title": course["title"],
-                    "description": course["description"],
-                    "category": course.get("category"),
-                    "instructor": course["instructor"],
-                    "duration": course.get("duration"),
-                    "created_at": course.get("created_at"),
-                    "updated_at": course.get("updated_at"),
-                }
-            )
+        async for course in cls.collection.find(
+            {"category": category}, COURSE_OUT_PROJECTION
+        ):
+            courses.append(serialize_document(course))
         return courses
 
     @classmethod
-    async def delete_course(cls, course_id: str):
-        """Delete a course by its ID."""
+    async def delete_course(cls, course_id: str, owner: Optional[str] = None):
+        """Delete a course by its ID.
+        ``owner`` restricts the delete like in update_course."""
         try:
             obj_id = ObjectId(course_id)
         except errors.InvalidId:
             return None
-        result = await cls.collection.delete_one({"_id": obj_id})
-        if result.deleted_count == 0:
+        deleted = await cls.collection.find_one_and_delete(
+            cls._write_filter(obj_id, owner), projection={"_id": 1}
+        )
+        course_cache.invalidate(str(obj_id))
+        if deleted is None:
+            await cls._raise_if_not_owner(obj_id, owner)
             return None
+        invalidate_counts(cls.collection.name)
         return {"detail": "Course deleted successfully"}
+
+    @staticmethod
+    def _write_filter(obj_id: ObjectId, owner: Optional[str]) -> dict:
+        query: dict = {"_id": obj_id}
+        if owner is not None:
+            query["instructor"] = owner
+        return query
+
+    @classmethod
+    async def _raise_if_not_owner(cls, obj_id: ObjectId, owner: Optional[str]):
+        """After a filtered write matched nothing, tell a missing course
+        (return normally) from one owned by someone else (PermissionError).
+        Only runs on the failure path."""
+        if owner is None:
+            return
+        if await cls.collection.find_one({"_id": obj_id}, {"_id": 1}):
+            raise PermissionError("course belongs to another instructor")
@@ -0,0 +1,187 @@
+"""Per-course enrollment and progress rollup.
+
+One document per course (``_id`` is the course id) holding running
+counters, so course stats are read with a single lookup instead of scanning
+``enrollments`` and ``progress``:
+
+- ``enrolled``: enrollments
+- ``started``: progress entries above 0
+- ``completed``: progress entries at 100
+- ``progress_sum``: sum of all progress, for the average
+- ``histogram``: progress entries per bucket of 10 ("0" holds 0-9, ...,
+  "90" holds 90-99, "100" holds completed entries)
+
+Writers apply ``$inc`` deltas: EnrollmentModel.enroll_user for new
+enrollments and ProgressModel for every progress change, including batch
+syncs and write-behind flushes. The bulk paths read the previous progress
+just before writing, so a concurrent update of the same entry can leave a
+small drift; ``python -m app.rebuild_course_stats`` recomputes the rollup
+and reports or repairs it.
+"""
+
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+
+from app.core.database import db
+
+collection = db["course_stats"]
+
+COUNTERS = ("enrolled", "started", "completed", "progress_sum")
+BUCKETS = tuple(str(bucket) for bucket in range(0, 101, 10))
+
+
+def progress_bucket(progress: int) -> str:
+    return str(progress // 10 * 10)
+
+
+def progress_change(old: int | None, new: int) -> dict[str, int]:
+    """``$inc`` fields for a progress entry going from ``old`` (None when
+    it is created) to ``new``."""
+    delta = {
+        "started": (new > 0) - (old is not None and old > 0),
+        "completed": (new == 100) - (old == 100),
+        "progress_sum": new - (old or 0),
+    }
+    if old is None:
+        delta[f"histogram.{progress_bucket(new)}"] = 1
+    elif progress_bucket(old) != progress_bucket(new):
+        delta[f"histogram.{progress_bucket(old)}"] = -1
+        delta[f"histogram.{progress_bucket(new)}"] = 1
+    return {field: value for field, value in delta.items() if value}
+
+
+class CourseStatsModel:
+    """Model for the course stats rollup."""
+
+    collection = collection
+    # looked up by _id only
+    indexes: list = []
+
+    @classmethod
+    async def record_enrollment(cls, course_id: str):
+        await cls._increment([(course_id, {"enrolled": 1})])
+
+    @classmethod
+    async def record_progress(cls, course_id: str, old: int | None, new: int):
+        await cls._increment([(course_id, progress_change(old, new))])
+
+    @classmethod
+    async def record_progress_changes(cls, changes: list[tuple[str, int | None, int]]):
+        """Apply many (course_id, old, new) progress changes, one write per
+        course."""
+        totals: dict[str, dict[str, int]] = {}
+        for course_id, old, new in changes:
+            course_total = totals.setdefault(course_id, {})
+            for field, value in progress_change(old, new).items():
+                course_total[field] = course_total.get(field, 0) + value
+        await cls._increment(
+            [
+                (course_id, {field: value for field, value in delta.items() if value})
+                for course_id, delta in totals.items()
+            ]
+        )
+
+    @classmethod
+    async def _increment(cls, deltas: list[tuple[str, dict[str, int]]]):
+        now = datetime.now(timezone.utc).isoformat()
+        updates = [
+            ({"_id": course_id}, {"$inc": delta, "$set": {"updated_at": now}})
+            for course_id, delta in deltas
+            if delta
+        ]
+        if len(updates) == 1:
+            await cls.collection.update_one(*updates[0], upsert=True)
+        elif updates:
+            await cls.collection.bulk_write(
+                [UpdateOne(query, update, upsert=True) for query, update in updates],
+                ordered=False,
+            )
+
+    @classmethod
+    async def get_stats(cls, course_id: str) -> dict:
+        """The course's counters (zero for a course without activity)."""
+        stats = await cls.collection.find_one({"_id": course_id}) or {}
+        return summarize(course_id, stats)
+
+    @classmethod
+    async def compute(cls, database=db) -> dict[str, dict]:
+        """Recompute every course's counters from enrollments and progress."""
+        computed: dict[str, dict] = {}
+
+        def course(course_id: str) -> dict:
+            return computed.setdefault(course_id, empty_stats())
+
+        enrolled = database["enrollments"].aggregate(
+            [{"$group": {"_id": "$course_id", "enrolled": {"$sum": 1}}}]
+        )
+        async for row in enrolled:
+            course(row["_id"])["enrolled"] = row["enrolled"]
+
+        buckets = database["progress"].aggregate(
+            [
+                {
+                    "$group": {
+                        "_id": {
+                            "course_id": "$course_id",
+                            "bucket": {
+                                "$multiply": [
+                                    {"$floor": {"$divide": ["$progress", 10]}},
+                                    10,
+                                ]
+                            },
+                            "started": {"$gt": ["$progress", 0]},
+                        },
+                        "entries": {"$sum": 1},
+                        "progress_sum": {"$sum": "$progress"},
+                    }
+                }
+            ]
+        )
+        async for row in buckets:
+            stats = course(row["_id"]["course_id"])
+            bucket = str(int(row["_id"]["bucket"]))
+            stats["histogram"][bucket] += row["entries"]
+            stats["progress_sum"] += row["progress_sum"]
+            if row["_id"]["started"]:
+                stats["started"] += row["entries"]
+            if bucket == "100":
+                stats["completed"] += row["entries"]
+        return computed
+
+
+def empty_stats() -> dict:
+    return {
+        **{counter: 0 for counter in COUNTERS},
+        "histogram": {bucket: 0 for bucket in BUCKETS},
+    }
+
+
+def counters(stats: dict) -> dict:
+    """The counters of a stats document, missing ones as 0."""
+    histogram = stats.get("histogram", {})
+    return {
+        **{counter: stats.get(counter, 0) for counter in COUNTERS},
+        "histogram": {bucket: histogram.get(bucket, 0) for bucket in BUCKETS},
+    }
+
+
+def summarize(course_id: str, stats: dict) -> dict:
+    """CourseStatsResponse fields for a stats document."""
+    values = counters(stats)
+    enrolled = values["enrolled"]
+    return {
+        "course_id": course_id,
+        "enrolled": enrolled,
+        "started": values["started"],
+        "completed": values["completed"],
+        # students without progress count as 0%
+        "average_progress": (
+            round(values["progress_sum"] / enrolled, 2) if enrolled else 0.0
+        ),
+        "completion_rate": (
+            round(values["completed"] / enrolled, 4) if enrolled else 0.0
+        ),
+        "histogram": values["histogram"],
+        "updated_at": stats.get("updated_at"),
+    }
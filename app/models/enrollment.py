@@ -3,8 +3,12 @@
 from datetime import datetime, timezone
 
 from fastapi import HTTPException
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
 
 from app.core.database import db
+from app.models.course_stats import CourseStatsModel
+from app.utils.pagination import apply_cursor, cursor_filter, next_cursor, sort_spec
 
 collection = db["enrollments"]
 
@@ -13,27 +17,40 @@ class EnrollmentModel:
     """Model for enrollment operations."""
 
     collection = collection
+    # applied by app.init_indexes
+    indexes = [
+        # one row per (user, course); makes the enroll upsert race-free
+        IndexModel([("user_id", ASCENDING), ("course_id", ASCENDING)], unique=True),
+        # a user's enrollments in enrollment order
+        IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+    ]
 
     @classmethod
     async def enroll_user(cls, user_id: str, course_id: str):
-        """Enroll a user in a course."""
-        # check if the user is already enrolled in this course
-        existing_enrollment = await cls.collection.find_one(
-            {"user_id": user_id, "course_id": course_id}
-        )
-        if existing_enrollment:
+        """Enroll a user in a course.
+        A single upsert both checks for and creates the enrollment; the
+        unique (user_id, course_id) index turns a concurrent duplicate
+        into a DuplicateKeyError instead of a second row."""
+        enrolled_at = datetime.now(timezone.utc).isoformat()
+        try:
+            result = await cls.collection.update_one(
+                {"user_id": user_id, "course_id": course_id},
+                {"$setOnInsert": {"enrolled_at": enrolled_at}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
             return {"message": "Already enrolled in this course"}
+        if result.upserted_id is None:
+            return {"message": "Already enrolled in this course"}
+        await CourseStatsModel.record_enrollment(course_id)
 
-        enrollment_data = {
+        return {
+            "_id": str(result.upserted_id),
             "user_id": user_id,
             "course_id": course_id,
-            "enrolled_at": datetime.now(timezone.utc).isoformat(),
+            "enrolled_at": enrolled_at,
         }
 
-        result = await cls.collection.insert_one(enrollment_data)
-        enrollment_data["_id"] = str(result.inserted_id)
-        return enrollment_data
-
     # @classmethod
     # async def enroll_user(cls, enrollment_data: dict):
     #     """Enroll a user in a course."""
@@ -62,15 +79,152 @@ class EnrollmentModel:
     #     return enrollment
 
     @classmethod
-    async def get_enrollments_by_user(cls, user_id: str):
-        """Retrieve all enrollments for a specific user."""
+    async def get_enrollments_by_user(
+        cls, user_id: str, limit: int | None = None, cursor: str | None = None
+    ):
+        """Retrieve enrollments for a specific user in enrollment order.
+        Without ``limit`` every enrollment is returned; with it, pages are
+        chained through ``cursor`` (see app.utils.pagination)."""
         enrollments = []
-        cursor = cls.collection.find({"user_id": user_id})
-        async for enrollment in cursor:
+        query = apply_cursor({"user_id": user_id}, cursor, "_id", ASCENDING)
+        results = cls.collection.find(query).sort("_id", ASCENDING)
+        if limit:
+            results = results.limit(limit)
+        async for enrollment in results:
             enrollment["_id"] = str(enrollment["_id"])
             enrollments.append(enrollment)
         return enrollments
 
+    @classmethod
+    async def get_user_courses(
+        cls,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+    ) -> dict:
+        """A user's enrollments joined with the course and the user's
+        progress in it, most recent activity (last progress update, or
+        enrollment) first. One aggregation returns the page and the total;
+        pages are addressed by ``skip`` or ``cursor`` like course listings.
+        ``last_activity`` changes with every progress update, so pages read
+        while the user is making progress can skip or repeat an enrollment."""
+        sort_by, sort_order = "last_activity", -1
+        pipeline = cls.user_courses_pipeline(
+            user_id, skip, limit, cursor_filter(cursor, sort_by, sort_order)
+        )
+        result = await cls.collection.aggregate(pipeline).to_list(length=1)
+        facet = result[0] if result else {"data": [], "total": []}
+        enrollments = []
+        for enrollment in facet["data"][:limit]:
+            course = (enrollment["course"] or [{}])[0]
+            progress = enrollment.get("progress") or {}
+            enrollments.append(
+                {
+                    "id": str(enrollment["_id"]),
+                    "course_id": enrollment["course_id"],
+                    "title": course.get("title"),
+                    "category": course.get("category"),
+                    "instructor": course.get("instructor"),
+                    "enrolled_at": enrollment.get("enrolled_at"),
+                    "progress": progress.get("progress", 0),
+                    "is_completed": progress.get("is_completed", False),
+                    "last_activity": enrollment.get("last_activity"),
+                }
+            )
+        has_more = len(facet["data"]) > limit
+        return {
+            "total": facet["total"][0]["n"] if facet["total"] else 0,
+            "data": enrollments,
+            "has_more": has_more,
+            "next_cursor": (
+                next_cursor(enrollments, limit, sort_by, sort_order)
+                if has_more
+                else None
+            ),
+        }
+
+    @staticmethod
+    def user_courses_pipeline(
+        user_id: str, skip: int, limit: int, after: dict | None
+    ) -> list[dict]:
+        """Aggregation behind get_user_courses (also explained by
+        app.query_audit); ``after`` is its keyset filter."""
+        data: list[dict] = []
+        if after is not None:
+            data.append({"$match": after})
+        elif skip:
+            data.append({"$skip": skip})
+        data += [
+            {"$limit": limit + 1},
+            {
+                "$lookup": {
+                    "from": "courses",
+                    "localField": "course_oid",
+                    "foreignField": "_id",
+                    "pipeline": [
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "title": 1,
+                                "category": 1,
+                                "instructor": 1,
+                            }
+                        }
+                    ],
+                    "as": "course",
+                }
+            },
+        ]
+        return [
+            {"$match": {"user_id": user_id}},
+            {
+                "$lookup": {
+                    "from": "progress",
+                    "localField": "course_id",
+                    "foreignField": "course_id",
+                    # served by the (user_id, course_id) progress index
+                    "pipeline": [
+                        {"$match": {"user_id": user_id}},
+                        {
+                            "$project": {
+                                "_id": 0,
+                                "progress": 1,
+                                "is_completed": 1,
+                                "updated_at": 1,
+                            }
+                        },
+                    ],
+                    "as": "progress",
+                }
+            },
+            {"$set": {"progress": {"$first": "$progress"}}},
+            {
+                "$set": {
+                    "last_activity": {"$max": ["$enrolled_at", "$progress.updated_at"]},
+                    "course_oid": {
+                        "$convert": {
+                            "input": "$course_id",
+                            "to": "objectId",
+                            "onError": None,
+                        }
+                    },
+                }
+            },
+            {"$sort": dict(sort_spec("last_activity", -1))},
+            {"$facet": {"data": data, "total": [{"$count": "n"}]}},
+        ]
+
+    @classmethod
+    async def enrolled_course_ids(cls, user_id: str, course_ids: list[str]) -> set[str]:
+        """The courses among ``course_ids`` the user is enrolled in, in one
+        query (covered by the (user_id, course_id) index)."""
+        cursor = cls.collection.find(
+            {"user_id": user_id, "course_id": {"$in": list(set(course_ids))}},
+            {"_id": 0, "course_id": 1},
+        )
+        return {enrollment["course_id"] async for enrollment in cursor}
+
     @classmethod
     async def get_enrollments(cls, user_id: str, course_id: str):
         """Retrieve enrollment for a specific user in a specific course."""
@@ -1,46 +1,223 @@
 from datetime import datetime, timezone
 
+from bson import ObjectId
+from pymongo import ASCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
 from app.core.database import db
+from app.models.course_stats import CourseStatsModel
+from app.schemas.progress import PROGRESS_RESPONSE_PROJECTION
 
 collection = db["progress"]
 
+DUPLICATE_KEY = 11000
+
+
+def _as_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
 
 class ProgressModel:
     collection = collection
+    # applied by app.init_indexes; one row per (user, course), which makes
+    # the progress upsert race-free and serves lookups by user
+    indexes = [
+        IndexModel([("user_id", ASCENDING), ("course_id", ASCENDING)], unique=True),
+    ]
+    # set once require_unique_index has seen the index in place
+    _unique_index_ready = False
 
     @classmethod
     async def update_progress(cls, user_id: str, course_id: str, progress: int):
-        """Update or create a user's progress in a course"""
+        """Update or create a user's progress in a course
+        in one atomic upsert returning the stored entry.
+        The upsert returns the previous entry, whose progress gives the
+        course stats delta."""
         if progress < 0 or progress > 100:
             raise ValueError("progress must be between 0 and 100")
-        existing_progress = await cls.collection.find_one(
-            {"user_id": user_id, "course_id": course_id}
+        now = datetime.now(timezone.utc).isoformat()
+        changes = {
+            "progress": progress,
+            "is_completed": progress == 100,
+            "updated_at": now,
+            "client_updated_at": now,
+        }
+        new_id = ObjectId()
+        update = {
+            "$set": changes,
+            "$setOnInsert": {"_id": new_id, "created_at": now},
+        }
+        try:
+            previous = await cls._upsert(user_id, course_id, update)
+        except DuplicateKeyError:
+            # a concurrent request inserted the entry first, update it instead
+            previous = await cls._upsert(user_id, course_id, update)
+        await CourseStatsModel.record_progress(
+            course_id, previous["progress"] if previous else None, progress
         )
-        if existing_progress:
-            # Update existing progress
-            updated_data = {
-                "progress": progress,
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+        progress_data = previous or {
+            "_id": new_id,
+            "user_id": user_id,
+            "course_id": course_id,
+            "created_at": now,
+        }
+        progress_data.update(changes)
+        progress_data["id"] = str(progress_data.pop("_id"))
+        return progress_data
+
+    @classmethod
+    async def _upsert(cls, user_id: str, course_id: str, update: dict) -> dict:
+        return await cls.collection.find_one_and_update(
+            {"user_id": user_id, "course_id": course_id},
+            update,
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    @staticmethod
+    def upsert_if_newer(entry: dict) -> UpdateOne:
+        """Bulk upsert of a progress entry that only applies if the stored
+        one was recorded before it (``client_updated_at``). Otherwise the
+        unique (user_id, course_id) index rejects the insert it falls back
+        to with a duplicate key error."""
+        return UpdateOne(
+            {
+                "user_id": entry["user_id"],
+                "course_id": entry["course_id"],
+                # also matches entries written before the field existed
+                "client_updated_at": {"$not": {"$gte": entry["client_updated_at"]}},
+            },
+            {
+                "$set": {
+                    "progress": entry["progress"],
+                    "is_completed": entry["progress"] == 100,
+                    "updated_at": entry["updated_at"],
+                    "client_updated_at": entry["client_updated_at"],
+                },
+                "$setOnInsert": {"created_at": entry["created_at"]},
+            },
+            upsert=True,
+        )
+
+    @classmethod
+    async def apply_batch(cls, user_id: str, entries: list[dict]) -> list[str]:
+        """Write ``course_id``/``progress``/``client_timestamp`` entries in
+        one unordered bulk_write, the latest client timestamp per course
+        winning over stored and batched entries. Returns "applied", "stale"
+        or "failed" for each entry."""
+        if not entries:
+            return []
+        now = datetime.now(timezone.utc)
+        # a client clock running ahead must not lock the entry
+        stamps = [min(_as_utc(entry["client_timestamp"]), now) for entry in entries]
+        latest: dict[str, int] = {}
+        for position, entry in enumerate(entries):
+            best = latest.get(entry["course_id"])
+            if best is None or stamps[position] >= stamps[best]:
+                latest[entry["course_id"]] = position
+        updated_at = now.isoformat()
+        writes = {
+            position: {
+                "user_id": user_id,
+                "course_id": entries[position]["course_id"],
+                "progress": entries[position]["progress"],
+                "client_updated_at": stamps[position].isoformat(),
+                "updated_at": updated_at,
+                "created_at": updated_at,
             }
-            await cls.collection.update_one(
-                {"_id": existing_progress["_id"]}, {"$set": updated_data}
+            for position in latest.values()
+        }
+        statuses = ["stale"] * len(entries)
+        pending = list(writes)
+        for attempt in range(2):
+            errors = await cls.write_latest([writes[p] for p in pending])
+            retry = []
+            for index, position in enumerate(pending):
+                code = errors.get(index)
+                if code is None:
+                    statuses[position] = "applied"
+                elif code == DUPLICATE_KEY and attempt == 0:
+                    # usually a newer stored entry, but may be a concurrent
+                    # insert of the same entry: check once more
+                    retry.append(position)
+                else:
+                    statuses[position] = "stale" if code == DUPLICATE_KEY else "failed"
+            if not retry:
+                break
+            pending = retry
+        return statuses
+
+    @classmethod
+    async def require_unique_index(cls) -> None:
+        """Make sure the unique (user_id, course_id) index exists before
+        upsert_if_newer relies on it. app.init_indexes builds it in the
+        background at startup; until it is in place a stale upsert would
+        insert a second row with the older progress instead of failing.
+        createIndexes is a no-op once the index exists and waits for a build
+        in progress. Raises OperationFailure when the index cannot be built,
+        e.g. over duplicate rows."""
+        if cls._unique_index_ready:
+            return
+        try:
+            await cls.collection.create_indexes(cls.indexes)
+        except OperationFailure as exc:
+            print(
+                "[progress] ERROR the unique (user_id, course_id) index cannot "
+                f"be built, conditional progress writes are refused: {exc}"
             )
-            existing_progress.update(updated_data)
-            existing_progress["id"] = str(existing_progress["_id"])
-            return existing_progress
-        else:
-            # Create new progress entry
-            progress_data = {
-                "user_id": user_id,
-                "course_id": course_id,
-                "progress": progress,
-                "is_completed": progress == 100,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
+            raise
+        cls._unique_index_ready = True
+
+    @classmethod
+    async def write_latest(cls, writes: list[dict]) -> dict[int, int]:
+        """Apply upsert_if_newer for every write (at most one per user and
+        course) in one unordered bulk_write, and roll the applied changes up
+        into the course stats. Returns the error code of each rejected
+        write, by position. Nothing is written unless the unique index
+        exists (require_unique_index)."""
+        await cls.require_unique_index()
+        previous = await cls._current_progress(writes)
+        errors: dict[int, int] = {}
+        try:
+            await cls.collection.bulk_write(
+                [cls.upsert_if_newer(write) for write in writes], ordered=False
+            )
+        except BulkWriteError as exc:
+            errors = {
+                error["index"]: error.get("code")
+                for error in exc.details.get("writeErrors", [])
             }
-            result = await cls.collection.insert_one(progress_data)
-            progress_data["_id"] = str(result.inserted_id)
-            return progress_data
+        await CourseStatsModel.record_progress_changes(
+            [
+                (
+                    write["course_id"],
+                    previous.get((write["user_id"], write["course_id"])),
+                    write["progress"],
+                )
+                for index, write in enumerate(writes)
+                if index not in errors
+            ]
+        )
+        return errors
+
+    @classmethod
+    async def _current_progress(cls, writes: list[dict]) -> dict[tuple, int]:
+        """Stored progress by (user_id, course_id), in one query."""
+        cursor = cls.collection.find(
+            {
+                "$or": [
+                    {"user_id": write["user_id"], "course_id": write["course_id"]}
+                    for write in writes
+                ]
+            },
+            {"_id": 0, "user_id": 1, "course_id": 1, "progress": 1},
+        )
+        return {
+            (entry["user_id"], entry["course_id"]): entry["progress"]
+            async for entry in cursor
+        }
 
     @classmethod
     async def get_progress(cls, user_id: str, course_id: str):
@@ -51,3 +228,9 @@ class ProgressModel:
         if progress:
             progress["id"] = str(progress["_id"])
         return progress
+
+    @classmethod
+    async def get_user_progress(cls, user_id: str) -> list[dict]:
+        """Retrieve every progress entry of a user (ProgressResponse fields)"""
+        cursor = cls.collection.find({"user_id": user_id}, PROGRESS_RESPONSE_PROJECTION)
+        return await cursor.to_list(length=None)
@@ -0,0 +1,71 @@
+"""Refresh token storage.
+
+Refresh tokens are opaque random strings handed to the client once; only
+their SHA-256 digest is stored. A random 256-bit token does not need a slow
+hash, so exchanging one for a new access token costs a single indexed
+find_one_and_delete and no bcrypt. Expired tokens are removed by a TTL
+index on ``expires_at``.
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, IndexModel
+
+from app.core.config import settings
+from app.core.database import db
+
+collection = db["refresh_tokens"]
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class RefreshTokenModel:
+    """Model for refresh token operations."""
+
+    collection = collection
+    # applied by app.init_indexes; expired tokens are removed by the TTL index
+    indexes = [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        IndexModel([("user_id", ASCENDING)]),
+    ]
+
+    @classmethod
+    async def issue(cls, claims: dict) -> str:
+        """Store a new refresh token for the access token ``claims``
+        (see token_claims) and return its plain value."""
+        token = secrets.token_urlsafe(32)
+        now = datetime.now(timezone.utc)
+        await cls.collection.insert_one(
+            {
+                "_id": _digest(token),
+                "user_id": claims["uid"],
+                "claims": claims,
+                "created_at": now,
+                "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            }
+        )
+        return token
+
+    @classmethod
+    async def consume(cls, token: str) -> dict | None:
+        """Delete a refresh token and return its claims.
+        Tokens are single use; None is returned for unknown or expired ones."""
+        stored = await cls.collection.find_one_and_delete(
+            {"_id": _digest(token), "expires_at": {"$gt": datetime.now(timezone.utc)}}
+        )
+        return stored["claims"] if stored else None
+
+    @classmethod
+    async def revoke(cls, token: str) -> None:
+        """Revoke a single refresh token."""
+        await cls.collection.delete_one({"_id": _digest(token)})
+
+    @classmethod
+    async def revoke_all(cls, user_id: str) -> int:
+        """Revoke every refresh token of a user, returns how many."""
+        result = await cls.collection.delete_many({"user_id": str(user_id)})
+        return result.deleted_count
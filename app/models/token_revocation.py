@@ -0,0 +1,99 @@
+"""Token-version revocation list.
+
+Access tokens carry the user's ``token_version`` as the ``ver`` claim. When a
+user's role changes or the user is deleted, the version is bumped and the new
+minimum is recorded here, so older tokens are rejected without looking the
+user up on every request.
+
+Each worker keeps the list in memory and pulls changes made by other workers
+every TOKEN_REVOCATION_SYNC_SECONDS. Entries only matter while tokens issued
+before them can still be valid, so they expire with the access token lifetime
+(TTL index on ``updated_at``).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from pymongo import ASCENDING, IndexModel
+
+from app.core.config import settings
+from app.core.database import db
+
+collection = db["token_revocations"]
+
+
+class TokenRevocationModel:
+    """Model for the token revocation list."""
+
+    collection = collection
+    # applied by app.init_indexes; entries are useless once every token
+    # issued before them has expired
+    indexes = [
+        IndexModel(
+            [("updated_at", ASCENDING)],
+            expireAfterSeconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        ),
+    ]
+
+    # user_id -> (minimum valid token version, revoked at)
+    _min_versions: dict[str, tuple[int, datetime]] = {}
+    _synced_at: datetime | None = None
+
+    @classmethod
+    async def revoke(cls, user_id: str, min_version: int):
+        """Reject every token of ``user_id`` older than ``min_version``."""
+        now = datetime.now(timezone.utc)
+        cls._remember(str(user_id), min_version, now)
+        await cls.collection.update_one(
+            {"_id": str(user_id)},
+            {"$max": {"min_version": min_version}, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+
+    @classmethod
+    def is_revoked(cls, user_id: str, token_version: int) -> bool:
+        """Check a token's version against the in-memory list."""
+        entry = cls._min_versions.get(str(user_id))
+        return entry is not None and token_version < entry[0]
+
+    @classmethod
+    async def sync(cls):
+        """Pull revocations recorded since the last sync (by any worker)."""
+        now = datetime.now(timezone.utc)
+        query: dict = {}
+        if cls._synced_at is not None:
+            # small overlap to tolerate clock skew between workers
+            query["updated_at"] = {"$gte": cls._synced_at - timedelta(seconds=5)}
+        async for entry in cls.collection.find(query):
+            updated_at = entry["updated_at"]
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            cls._remember(entry["_id"], entry["min_version"], updated_at)
+        cls._synced_at = now
+        cls._prune(now)
+
+    @classmethod
+    async def run_sync_loop(cls, interval: float):
+        """Keep the in-memory list in sync until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await cls.sync()
+            except Exception as exc:  # keep serving with the last known list
+                print(f"Token revocation sync failed: {exc}")
+
+    @classmethod
+    def _remember(cls, user_id: str, min_version: int, revoked_at: datetime):
+        current = cls._min_versions.get(user_id)
+        if current is None or min_version >= current[0]:
+            cls._min_versions[user_id] = (min_version, revoked_at)
+
+    @classmethod
+    def _prune(cls, now: datetime):
+        """Forget revocations older than any token that could still be valid."""
+        cutoff = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        cls._min_versions = {
+            user_id: entry
+            for user_id, entry in cls._min_versions.items()
+            if entry[1] >= cutoff
+        }
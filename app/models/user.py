@@ -4,62 +4,122 @@ Handles DB insert/query logic using Motor"""
 
 from bson import ObjectId
 from fastapi import HTTPException, status
-from pymongo import ASCENDING
+from pymongo import ASCENDING, TEXT, IndexModel, ReturnDocument
 
+from app.core.cache import PrincipalCache
+from app.core.config import settings
 from app.core.database import db
+from app.models.refresh_token import RefreshTokenModel
+from app.models.token_revocation import TokenRevocationModel
+from app.schemas.user import USER_OUT_PROJECTION
+from app.utils.counting import TotalMode, invalidate_counts
+from app.utils.pagination import cursor_filter, fetch_page, next_cursor, sort_spec
+from app.utils.serialization import serialize_document
 
 COLLECTION_NAME = "users"
 
+# authenticated users keyed by token subject (email), see get_principal
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
 
 class UserModel:
     """User model for managing user data in the database.
     mongo DB collection reference"""
 
     collection = db[COLLECTION_NAME]
+    # applied by app.init_indexes; list_users sorts by (created_at, _id)
+    indexes = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel(
+            [("role", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]
+        ),
+        IndexModel([("first_name", ASCENDING), ("last_name", ASCENDING)]),
+        IndexModel([("address", TEXT)]),
+    ]
 
     @classmethod
     async def create(cls, user_data: dict) -> dict:
         """Create a new user in the database.
         Adds _id (MongoDB ObjectId) to the user_data and returns it"""
         result = await cls.collection.insert_one(user_data)
+        invalidate_counts(COLLECTION_NAME)
         user_data["_id"] = str(result.inserted_id)
         return user_data
 
     @classmethod
-    async def get_by_email(cls, email: str) -> dict | None:
+    async def get_by_email(
+        cls, email: str, projection: dict | None = None
+    ) -> dict | None:
         """Retrieve a user by email.
-        Converts Mongo's _id to string so it’s JSON serializable"""
-        user = await cls.collection.find_one({"email": email})
+        Converts Mongo's _id to string so it’s JSON serializable.
+        The full document (password hash included) is read unless a
+        projection is given."""
+        user = await cls.collection.find_one({"email": email}, projection)
         if user:
             user["_id"] = str(user["_id"])
         return user
 
     @classmethod
-    async def get_by_id(cls, user_id: str) -> dict | None:
-        """Retrieve a user by ID."""
+    async def get_principal(cls, email: str) -> dict | None:
+        """Retrieve the user behind an access token, served from
+        principal_cache when possible. Returns a copy so callers
+        can mutate it freely."""
+        user = principal_cache.get(email)
+        if user is None:
+            user = await cls.get_by_email(email, USER_OUT_PROJECTION)
+            if user is None:
+                return None
+            principal_cache.set(email, user)
+        return dict(user)
+
+    @classmethod
+    async def get_by_id(
+        cls, user_id: str, projection: dict = USER_OUT_PROJECTION
+    ) -> dict | None:
+        """Retrieve a user by ID (UserOut fields unless told otherwise)."""
         if not ObjectId.is_valid(user_id):
             return None
-        user = await cls.collection.find_one({"_id": ObjectId(user_id)})
-        return cls._format_user(user)
+        user = await cls.collection.find_one({"_id": ObjectId(user_id)}, projection)
+        return serialize_document(user)
 
     @classmethod
     async def list_users(
-        cls, query: dict, limit: int = 10, page: int = 1
-    ) -> list[dict]:
-        """List users with pagination and filtering."""
-        skip = (page - 1) * limit
-        cursor = (
-            cls.collection.find(query)
-            .sort("created_at", ASCENDING)
-            .skip(skip)
-            .limit(limit)
+        cls,
+        query: dict,
+        limit: int = 10,
+        page: int = 1,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        """List users with pagination and filtering.
+        ``cursor`` (see app.utils.pagination) takes precedence over ``page``;
+        ``total_mode`` selects how the total is counted (app.utils.counting).
+        Returns the users with ``total``, ``has_more`` and ``next_cursor``."""
+        result = await fetch_page(
+            cls.collection,
+            query,
+            sort=sort_spec("created_at", ASCENDING),
+            skip=(page - 1) * limit,
+            limit=limit,
+            after=cursor_filter(cursor, "created_at", ASCENDING),
+            projection=USER_OUT_PROJECTION,
+            total_mode=total_mode,
         )
-        users: list[dict] = []
-        async for user in cursor:
-            formatted_user = cls._format_user(user)
-            if formatted_user is not None:
-                users.append(formatted_user)
-        return users
+        users = [serialize_document(user) for user in result["docs"]]
+        return {
+            "data": users,
+            "total": result["total"],
+            "has_more": result["has_more"],
+            "next_cursor": (
+                next_cursor(users, limit, "created_at", ASCENDING)
+                if result["has_more"]
+                else None
+            ),
+        }
 
     @classmethod
     async def count_users(cls, query: dict) -> int:
@@ -68,37 +128,66 @@ class UserModel:
 
     @classmethod
     async def update_user(cls, user_id: str, update_data: dict) -> dict | None:
-        """Update user data by ID."""
+        """Update user data by ID and return the updated user.
+        A role change bumps token_version so tokens carrying the old
+        role claim stop being accepted."""
         if not ObjectId.is_valid(user_id):
             return None
-        result = await cls.collection.update_one(
-            {"_id": ObjectId(user_id)}, {"$set": update_data}
+        update: dict = {"$set": update_data}
+        projection = USER_OUT_PROJECTION
+        if "role" in update_data:
+            update["$inc"] = {"token_version": 1}
+            projection = {**USER_OUT_PROJECTION, "token_version": 1}
+        # one round trip: the post-image is the response
+        user = await cls.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER,
         )
-        if result.modified_count == 0:
+        principal_cache.invalidate_user(user_id)
+        invalidate_counts(COLLECTION_NAME)
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found or no changes made",
+                detail="User not found",
             )
-            # return None
-        return await cls.get_by_id(user_id)
+        if "role" in update_data:
+            await TokenRevocationModel.revoke(user_id, user.pop("token_version"))
+            await RefreshTokenModel.revoke_all(user_id)
+        return serialize_document(user)
+
+    @classmethod
+    async def revoke_tokens(cls, user_id: str) -> None:
+        """Invalidate every access and refresh token issued so far to the user."""
+        if not ObjectId.is_valid(user_id):
+            return
+        user = await cls.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"token_version": 1}},
+            projection={"token_version": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        principal_cache.invalidate_user(user_id)
+        if user:
+            await TokenRevocationModel.revoke(user_id, user["token_version"])
+        await RefreshTokenModel.revoke_all(user_id)
 
     @classmethod
     async def delete_user(cls, user_id: str) -> bool:
         """Delete a user by ID."""
         if not ObjectId.is_valid(user_id):
             return False
-        result = await cls.collection.delete_one({"_id": ObjectId(user_id)})
-        if result.deleted_count == 0:
+        deleted = await cls.collection.find_one_and_delete(
+            {"_id": ObjectId(user_id)}, projection={"token_version": 1}
+        )
+        principal_cache.invalidate_user(user_id)
+        invalidate_counts(COLLECTION_NAME)
+        if deleted is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-        return result.deleted_count > 0
-
-    @staticmethod
-    def _format_user(user: dict | None) -> dict | None:
-        """convert Mongo user document to JSON serializable dict"""
-        if not user:
-            return None
-        user["id"] = str(user["_id"])  # Convert ObjectId to string
-        user.pop("password", None)  # Remove password if it exists
-        return user
+        # no token issued to the deleted user may be used again
+        await TokenRevocationModel.revoke(user_id, deleted.get("token_version", 0) + 1)
+        await RefreshTokenModel.revoke_all(user_id)
+        return True
@@ -0,0 +1,554 @@
+"""
+Explain-plan audit of the queries issued by the models.
+
+QUERY_SHAPES lists the single-document and unpaged finds of the user,
+course, enrollment and progress models (filter, sort and limit as the
+models build them, with sample values). Paginated listings are recorded by
+running the helpers the models call (fetch_page, the aggregation
+builders) against a stand-in collection, so the audit explains the reads
+those helpers actually issue, aggregations included. audit_queries runs
+each shape through ``explain`` and reports the plan, keys and documents
+examined, and any collection scan, in-memory (blocking) sort or, for
+cursor pages, scan not bounded by the index that the shape does not
+explicitly allow.
+
+Against a scratch database seeded with sample data:
+
+    python -m app.query_audit --database mindforge_audit --seed
+
+The command exits 1 when a query regresses to a scan. Tests use
+assert_no_scans on the result of audit_queries.
+"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.init_indexes import reconcile_indexes
+from app.models.course import CourseModel
+from app.models.enrollment import EnrollmentModel
+from app.schemas.course import COURSE_OUT_PROJECTION
+from app.schemas.progress import PROGRESS_RESPONSE_PROJECTION
+from app.schemas.user import USER_OUT_PROJECTION
+from app.utils.counting import TotalMode
+from app.utils.pagination import fetch_page, keyset_filter, sort_spec
+from app.utils.search import TEXT_SCORE, prefix_filter, relevance_sort, text_filter
+
+_SAMPLE_ID = ObjectId()
+_SAMPLE_USER = str(ObjectId())
+_SAMPLE_COURSE = str(ObjectId())
+# instructor of every tenth seeded course
+_SAMPLE_INSTRUCTOR = "audit0@example.com"
+# the seeded documents are created around this time, half before, half after
+_SAMPLE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+PAGE_LIMIT = 10
+# a cursor page reads PAGE_LIMIT + 1 documents; walking the index from the
+# cursor examines about that many keys, scanning up to it examines half the
+# sample data (seed at least 100 documents)
+CURSOR_PAGE_MAX_EXAMINED = 3 * (PAGE_LIMIT + 1)
+
+
+@dataclass
+class QueryShape:
+    """A find, or an aggregation when ``pipeline`` is set, issued by a
+    model. ``allow`` lists stages that are expected, e.g. SORT for text
+    search, which is always ranked in memory; ``max_examined`` caps the
+    keys and documents examined."""
+
+    name: str
+    collection: str
+    filter: dict = field(default_factory=dict)
+    sort: list | None = None
+    limit: int = 0
+    projection: dict | None = None
+    allow: tuple[str, ...] = field(default_factory=tuple)
+    skip: int = 0
+    pipeline: list | None = None
+    max_examined: int | None = None
+
+
+QUERY_SHAPES = [
+    # ------- UserModel -------
+    QueryShape("users.get_by_email", "users", {"email": "user@example.com"}),
+    QueryShape("users.get_by_id", "users", {"_id": _SAMPLE_ID}, limit=1),
+    # ------- CourseModel -------
+    QueryShape("courses.get_course_by_id", "courses", {"_id": _SAMPLE_ID}, limit=1),
+    QueryShape(
+        "courses.get_courses_by_instructor",
+        "courses",
+        {"instructor": _SAMPLE_INSTRUCTOR},
+        projection=COURSE_OUT_PROJECTION,
+    ),
+    QueryShape(
+        "courses.get_courses_by_category",
+        "courses",
+        {"category": "programming"},
+        projection=COURSE_OUT_PROJECTION,
+    ),
+    # ------- EnrollmentModel -------
+    QueryShape(
+        "enrollments.get_enrollments",
+        "enrollments",
+        {"user_id": _SAMPLE_USER, "course_id": _SAMPLE_COURSE},
+    ),
+    QueryShape(
+        "enrollments.get_enrollments_by_user",
+        "enrollments",
+        {"user_id": _SAMPLE_USER},
+        [("_id", 1)],
+    ),
+    QueryShape(
+        "enrollments.get_enrollments_by_user[cursor]",
+        "enrollments",
+        {"user_id": _SAMPLE_USER, "_id": {"$gt": _SAMPLE_ID}},
+        [("_id", 1)],
+        20,
+    ),
+    QueryShape(
+        "enrollments.enrolled_course_ids",
+        "enrollments",
+        {"user_id": _SAMPLE_USER, "course_id": {"$in": [_SAMPLE_COURSE]}},
+        projection={"_id": 0, "course_id": 1},
+    ),
+    # ------- ProgressModel -------
+    QueryShape(
+        "progress.get_progress",
+        "progress",
+        {"user_id": _SAMPLE_USER, "course_id": _SAMPLE_COURSE},
+        projection=PROGRESS_RESPONSE_PROJECTION,
+    ),
+    QueryShape(
+        "progress.write_latest[previous]",
+        "progress",
+        {"$or": [{"user_id": _SAMPLE_USER, "course_id": _SAMPLE_COURSE}]},
+        projection={"_id": 0, "user_id": 1, "course_id": 1, "progress": 1},
+    ),
+    QueryShape(
+        "progress.get_user_progress",
+        "progress",
+        {"user_id": _SAMPLE_USER},
+        projection=PROGRESS_RESPONSE_PROJECTION,
+    ),
+]
+
+
+class _RecordedCursor:
+    """Cursor returned by _RecordingCollection; fills in its shape."""
+
+    def __init__(self, shape: QueryShape):
+        self.shape = shape
+
+    def sort(self, sort):
+        self.shape.sort = list(sort)
+        return self
+
+    def skip(self, skip: int):
+        self.shape.skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self.shape.limit = limit
+        return self
+
+    async def to_list(self, length=None):
+        return []
+
+
+class _RecordingCollection:
+    """Stands in for a collection in the pagination helpers: records the
+    reads they issue as QueryShapes instead of running them."""
+
+    def __init__(self, shape_name: str, collection: str, **options):
+        self.name = collection
+        self.shape_name = shape_name
+        self.options = options
+        self.shapes: list[QueryShape] = []
+
+    def find(self, filter: dict, projection: dict | None = None):
+        shape = QueryShape(
+            self.shape_name, self.name, filter, projection=projection, **self.options
+        )
+        self.shapes.append(shape)
+        return _RecordedCursor(shape)
+
+    def aggregate(self, pipeline: list):
+        shape = QueryShape(
+            self.shape_name, self.name, pipeline=pipeline, **self.options
+        )
+        self.shapes.append(shape)
+        return _RecordedCursor(shape)
+
+    async def count_documents(self, filter: dict) -> int:
+        self.shapes.append(
+            QueryShape(
+                f"{self.shape_name}[count]",
+                self.name,
+                # the pipeline pymongo runs for count_documents
+                pipeline=[{"$match": filter}, {"$group": {"_id": 1, "n": {"$sum": 1}}}],
+                # counting an unfiltered listing exactly reads every
+                # document; total_mode=estimated avoids it
+                allow=() if filter else ("COLLSCAN",),
+            )
+        )
+        return 0
+
+    async def estimated_document_count(self) -> int:
+        return 0
+
+
+def _after(sort_field: str, sort_order: int) -> dict:
+    """Keyset filter of a cursor in the middle of the sample data."""
+    return keyset_filter(sort_field, sort_order, _SAMPLE_TIME.isoformat(), _SAMPLE_ID)
+
+
+async def _page_shapes(
+    name: str,
+    collection: str,
+    query: dict,
+    sort: list,
+    projection: dict,
+    after: dict | None = None,
+    allow: tuple[str, ...] = (),
+) -> list[QueryShape]:
+    """Record the reads of a fetch_page call (page, then exact count)."""
+    recorder = _RecordingCollection(
+        name,
+        collection,
+        allow=allow,
+        max_examined=CURSOR_PAGE_MAX_EXAMINED if after is not None else None,
+    )
+    await fetch_page(
+        recorder,
+        query,
+        sort,
+        limit=PAGE_LIMIT,
+        after=after,
+        projection=projection,
+        # the count ignores the cursor, it is audited with the first page
+        total_mode=TotalMode.EXACT if after is None else TotalMode.NONE,
+    )
+    return recorder.shapes
+
+
+async def paged_shapes() -> list[QueryShape]:
+    """Shapes of the paginated listings, recorded from the helpers the
+    models call."""
+    shapes = []
+    for name, query, sort_field, sort_order, after in (
+        ("users.list_users", {}, "created_at", 1, False),
+        ("users.list_users[role]", {"role": "student"}, "created_at", 1, False),
+        ("users.list_users[role,cursor]", {"role": "student"}, "created_at", 1, True),
+    ):
+        shapes += await _page_shapes(
+            name,
+            "users",
+            query,
+            sort_spec(sort_field, sort_order),
+            USER_OUT_PROJECTION,
+            _after(sort_field, sort_order) if after else None,
+        )
+    for name, query, sort_field, sort_order, after in (
+        ("courses.get_all_courses", {}, "created_at", -1, False),
+        ("courses.get_all_courses[cursor]", {}, "created_at", -1, True),
+        ("courses.get_all_courses[sort=title]", {}, "title", 1, False),
+        ("courses.get_all_courses[sort=updated_at]", {}, "updated_at", -1, False),
+        (
+            "courses.get_all_courses[category]",
+            {"category": "programming"},
+            "created_at",
+            -1,
+            False,
+        ),
+        (
+            "courses.get_all_courses[category,cursor]",
+            {"category": "programming"},
+            "created_at",
+            -1,
+            True,
+        ),
+        (
+            "courses.get_all_courses[instructor]",
+            {"instructor": _SAMPLE_INSTRUCTOR},
+            "created_at",
+            -1,
+            False,
+        ),
+    ):
+        shapes += await _page_shapes(
+            name,
+            "courses",
+            query,
+            sort_spec(sort_field, sort_order),
+            COURSE_OUT_PROJECTION,
+            _after(sort_field, sort_order) if after else None,
+        )
+    shapes += await _page_shapes(
+        "courses.get_all_courses[prefix search]",
+        "courses",
+        prefix_filter("py"),
+        sort_spec("created_at", -1),
+        COURSE_OUT_PROJECTION,
+        # the matching title_lower range is sorted (top-k), or created_at is
+        # walked; either way the prefix bounds the keys examined
+        allow=("SORT",),
+    )
+    shapes += await _page_shapes(
+        "courses.get_all_courses[text search]",
+        "courses",
+        text_filter("python basics"),
+        relevance_sort(),
+        {**COURSE_OUT_PROJECTION, "score": TEXT_SCORE},
+        allow=("SORT",),
+    )
+    for name, after in (
+        ("courses.get_instructor_dashboard", None),
+        ("courses.get_instructor_dashboard[cursor]", _after("created_at", -1)),
+    ):
+        shapes.append(
+            QueryShape(
+                name,
+                "courses",
+                pipeline=CourseModel.dashboard_pipeline(
+                    _SAMPLE_INSTRUCTOR, 0, PAGE_LIMIT, after
+                ),
+                max_examined=CURSOR_PAGE_MAX_EXAMINED if after is not None else None,
+            )
+        )
+    # the dashboard's total, counted next to its page
+    dashboard = _RecordingCollection("courses.get_instructor_dashboard", "courses")
+    await dashboard.count_documents({"instructor": _SAMPLE_INSTRUCTOR})
+    shapes += dashboard.shapes
+    shapes.append(
+        QueryShape(
+            "enrollments.get_user_courses",
+            "enrollments",
+            pipeline=EnrollmentModel.user_courses_pipeline(
+                _SAMPLE_USER, 0, PAGE_LIMIT, None
+            ),
+            # sorted on last_activity, computed from the progress join: a
+            # user's enrollments are sorted in memory
+            allow=("SORT",),
+        )
+    )
+    # listings sorted differently share their count
+    counts: set[str] = set()
+    unique = []
+    for shape in shapes:
+        if shape.name.endswith("[count]"):
+            key = f"{shape.collection}:{shape.pipeline}"
+            if key in counts:
+                continue
+            counts.add(key)
+        unique.append(shape)
+    return unique
+
+
+def plan_stages(plan: dict) -> list[str]:
+    """Stage names of a plan tree, top down (classic and SBE explain)."""
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+def _split_pipeline(explain: dict) -> tuple[dict, list[dict]]:
+    """Split an explain into the part run by the query layer and the
+    aggregation stages run after it (none for a find, or for a pipeline
+    pushed down entirely)."""
+    stages = explain.get("stages")
+    if stages and "$cursor" in stages[0]:
+        return stages[0]["$cursor"], stages[1:]
+    return explain, []
+
+
+def _stage_name(stage: dict) -> str:
+    return next(key for key in stage if key.startswith("$"))
+
+
+def analyze_explain(shape: QueryShape, explain: dict) -> dict:
+    """Summarize an explain document and list the problems found."""
+    query, later = _split_pipeline(explain)
+    # top down: the last aggregation stage first
+    stages = [_stage_name(stage) for stage in reversed(later)]
+    stages += plan_stages(query["queryPlanner"]["winningPlan"])
+    stats = query.get("executionStats", {})
+    keys = (stats.get("totalKeysExamined") or 0) + sum(
+        stage.get("totalKeysExamined", 0) for stage in later
+    )
+    docs = (stats.get("totalDocsExamined") or 0) + sum(
+        stage.get("totalDocsExamined", 0) for stage in later
+    )
+    problems = []
+    # $lookup stages report the scans of the collection they join
+    scanned = "COLLSCAN" in stages or any(
+        stage.get("collectionScans") for stage in later
+    )
+    if scanned and "COLLSCAN" not in shape.allow:
+        problems.append("COLLSCAN")
+    if ("SORT" in stages or "$sort" in stages) and "SORT" not in shape.allow:
+        problems.append("in-memory SORT")
+    if shape.max_examined is not None and max(keys, docs) > shape.max_examined:
+        problems.append(f"examined {max(keys, docs)} > {shape.max_examined}")
+    return {
+        "name": shape.name,
+        "plan": " <- ".join(stages),
+        "keys_examined": keys if stats or later else None,
+        "docs_examined": docs if stats or later else None,
+        "returned": later[-1].get("nReturned") if later else stats.get("nReturned"),
+        "problems": problems,
+    }
+
+
+async def explain_shape(database, shape: QueryShape) -> dict:
+    """Run ``shape`` through explain and analyze the plan."""
+    if shape.pipeline is not None:
+        explain = await database.command(
+            "explain",
+            {"aggregate": shape.collection, "pipeline": shape.pipeline, "cursor": {}},
+            verbosity="executionStats",
+        )
+        return analyze_explain(shape, explain)
+    cursor = database[shape.collection].find(shape.filter, shape.projection)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    if shape.skip:
+        cursor = cursor.skip(shape.skip)
+    if shape.limit:
+        cursor = cursor.limit(shape.limit)
+    return analyze_explain(shape, await cursor.explain())
+
+
+async def audit_queries(database, shapes=None) -> list[dict]:
+    """Explain every query shape (QUERY_SHAPES and the paged listings)
+    against ``database``."""
+    shapes = shapes or QUERY_SHAPES + await paged_shapes()
+    return [await explain_shape(database, shape) for shape in shapes]
+
+
+def assert_no_scans(results: list[dict]) -> None:
+    """Test helper: fail listing every query that scans or sorts in memory."""
+    failures = [
+        f"{result['name']}: {', '.join(result['problems'])} ({result['plan']})"
+        for result in results
+        if result["problems"]
+    ]
+    assert not failures, "queries not served by an index:\n" + "\n".join(failures)
+
+
+async def seed_sample_data(database, count: int = 200) -> None:
+    """Insert ``count`` sample users, courses, enrollments and progress rows
+    and create the declared indexes, so plans look like production ones.
+    Timestamps are ISO strings, like the API stores them."""
+    now = _SAMPLE_TIME.isoformat()
+    categories = ["programming", "design", "business", "music"]
+    topics = ["python", "design", "finance", "music"]
+
+    def created(i: int) -> str:
+        return (_SAMPLE_TIME + timedelta(minutes=count // 2 - i)).isoformat()
+
+    users = [
+        {
+            "_id": ObjectId(_SAMPLE_USER) if i == 0 else ObjectId(),
+            "email": f"audit{i}@example.com",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "address": f"{i} Sample Street",
+            "role": ["student", "instructor", "admin"][i % 3],
+            "created_at": created(i),
+            "updated_at": created(i),
+        }
+        for i in range(count)
+    ]
+    courses = [
+        {
+            "_id": ObjectId(_SAMPLE_COURSE) if i == 0 else ObjectId(),
+            "title": f"{topics[i % len(topics)].title()} basics {i}",
+            "title_lower": f"{topics[i % len(topics)]} basics {i}",
+            "description": "learn the basics step by step",
+            "category": categories[i % len(categories)],
+            "instructor": f"audit{i % 10}@example.com",
+            "created_at": created(i),
+            "updated_at": created(i),
+        }
+        for i in range(count)
+    ]
+    pairs = [
+        (str(users[i]["_id"]), str(courses[(i * 7) % count]["_id"]))
+        for i in range(count)
+    ]
+    enrollments = [
+        {"user_id": user_id, "course_id": course_id, "enrolled_at": now}
+        for user_id, course_id in pairs
+    ]
+    progress = [
+        {
+            "user_id": user_id,
+            "course_id": course_id,
+            "progress": 50,
+            "is_completed": False,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for user_id, course_id in pairs
+    ]
+    await reconcile_indexes(database)
+    await database["users"].insert_many(users)
+    await database["courses"].insert_many(courses)
+    await database["enrollments"].insert_many(enrollments)
+    await database["progress"].insert_many(progress)
+
+
+def print_results(results: list[dict]) -> None:
+    for result in results:
+        status = "FAIL " + ", ".join(result["problems"]) if result["problems"] else "ok"
+        print(
+            f"[{status}] {result['name']}: {result['plan']} "
+            f"(keys {result['keys_examined']}, docs {result['docs_examined']}, "
+            f"returned {result['returned']})"
+        )
+
+
+async def run(database_name: str, seed: bool, count: int) -> list[dict]:
+    client = AsyncIOMotorClient(settings.MONGO_URL)
+    try:
+        database = client[database_name]
+        if seed:
+            await client.drop_database(database_name)
+            await seed_sample_data(database, count)
+        return await audit_queries(database)
+    finally:
+        client.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.query_audit",
+        description="Explain every model query and flag scans.",
+    )
+    parser.add_argument("--database", default=settings.DB_NAME)
+    parser.add_argument(
+        "--seed",
+        action="store_true",
+        help="recreate the database with sample documents and the declared indexes",
+    )
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args(argv)
+    if args.seed and args.database == settings.DB_NAME:
+        parser.error("--seed writes sample data, use a scratch --database")
+    results = asyncio.run(run(args.database, args.seed, args.count))
+    print_results(results)
+    return 1 if any(result["problems"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Rebuild the course_stats rollup (see app.models.course_stats).
+
+Recomputes every course's counters from ``enrollments`` and ``progress``
+with two aggregations, compares them with the stored rollup and rewrites
+the courses that drifted. To only see the drift:
+
+    python -m app.rebuild_course_stats --dry-run
+
+Increments made while a course is rewritten can be lost, so run it when
+little traffic is expected, then once more with --dry-run to check.
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timezone
+
+from pymongo import ReplaceOne
+
+from app.core.database import db
+from app.models.course_stats import CourseStatsModel, counters, empty_stats
+
+
+def _differences(stored: dict, expected: dict) -> list[str]:
+    differences = [
+        f"{field} {stored[field]} != {expected[field]}"
+        for field in expected
+        if field != "histogram" and stored[field] != expected[field]
+    ]
+    differences += [
+        f"histogram.{bucket} {count} != {expected['histogram'][bucket]}"
+        for bucket, count in stored["histogram"].items()
+        if count != expected["histogram"][bucket]
+    ]
+    return differences
+
+
+async def _drift(database, expected: dict[str, dict]) -> dict[str, list[str]]:
+    stored = {
+        stats["_id"]: counters(stats)
+        async for stats in database[CourseStatsModel.collection.name].find()
+    }
+    drift = {}
+    for course_id in sorted(set(expected) | set(stored)):
+        differences = _differences(
+            stored.get(course_id, empty_stats()),
+            expected.get(course_id, empty_stats()),
+        )
+        if differences:
+            drift[course_id] = differences
+    return drift
+
+
+async def rebuild_course_stats(database=db, dry_run: bool = False) -> dict:
+    """Rewrite the courses whose stats drifted; returns the differences
+    found, by course."""
+    expected = await CourseStatsModel.compute(database)
+    drift = await _drift(database, expected)
+    if dry_run or not drift:
+        return drift
+    now = datetime.now(timezone.utc).isoformat()
+    await database[CourseStatsModel.collection.name].bulk_write(
+        [
+            ReplaceOne(
+                {"_id": course_id},
+                {**expected.get(course_id, empty_stats()), "updated_at": now},
+                upsert=True,
+            )
+            for course_id in drift
+        ],
+        ordered=False,
+    )
+    return drift
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.rebuild_course_stats",
+        description="Recompute the course stats rollup and fix drift.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only report courses whose stats drifted (exit 1 on drift)",
+    )
+    args = parser.parse_args(argv)
+    drift = asyncio.run(rebuild_course_stats(dry_run=args.dry_run))
+    action = "drifted" if args.dry_run else "rebuilt"
+    for course_id, differences in drift.items():
+        print(f"[course-stats] {course_id}: {action} ({', '.join(differences)})")
+    print(f"[course-stats] {len(drift)} course(s) {action}")
+    return 1 if args.dry_run and drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,15 +5,21 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
+from app.core.monitoring import TimedRoute
+from app.dependencies.auth import get_current_principal
+from app.models.refresh_token import RefreshTokenModel
+from app.models.token_revocation import TokenRevocationModel
 from app.models.user import UserModel
-from app.schemas.token import Token
+from app.schemas.token import RefreshRequest, Token
 from app.schemas.user import UserOut, UserSignup
-from app.utils.auth import create_access_token, hash_password, verify_password
+from app.utils.auth import create_access_token, token_claims
+from app.utils.hashing import password_hasher
 
 router = APIRouter(
     prefix="/auth",
     tags=["auth"],
     responses={404: {"description": "Not found"}},
+    route_class=TimedRoute,
 )
 
 
@@ -26,30 +32,76 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         The form data containing email and password.
     """
     user = await UserModel.get_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user["password"]):
+    if not user or not await password_hasher.verify(
+        form_data.password, user["password"]
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    claims = token_claims(user)
     access_token = create_access_token(
-        data={"sub": user["email"]},
+        data=claims,
         expires_delta=None,  # Use default expiration from settings
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await RefreshTokenModel.issue(claims)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token, status_code=status.HTTP_200_OK)
+async def refresh(body: RefreshRequest):
+    """Exchange a refresh token for a new access token.
+
+    Refresh tokens are single use: a new one is returned with every
+    access token. No password hashing is involved."""
+    claims = await RefreshTokenModel.consume(body.refresh_token)
+    if claims is None or TokenRevocationModel.is_revoked(
+        claims["uid"], claims.get("ver", 0)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    access_token = create_access_token(data=claims, expires_delta=None)
+    refresh_token = await RefreshTokenModel.issue(claims)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(body: RefreshRequest):
+    """Revoke a refresh token."""
+    await RefreshTokenModel.revoke(body.refresh_token)
+    return {"msg": "Logged out"}
+
+
+@router.post("/logout-all", status_code=status.HTTP_200_OK)
+async def logout_all(current_user: dict = Depends(get_current_principal)):
+    """Revoke every access and refresh token of the current user."""
+    await UserModel.revoke_tokens(str(current_user["_id"]))
+    return {"msg": "Logged out from all sessions"}
 
 
 @router.post("/signup", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 async def signup(user: UserSignup):
     """Register a new user."""
-    existing_user = await UserModel.get_by_email(user.email)
+    existing_user = await UserModel.get_by_email(user.email, {"_id": 1})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
     user_data = user.model_dump()
-    user_data["password"] = hash_password(user.password)
+    user_data["password"] = await password_hasher.hash(user.password)
     user_data["role"] = "student"  # Default role for new users
     user_data["created_at"] = datetime.now(timezone.utc).isoformat()
     user_data["updated_at"] = datetime.now(timezone.utc).isoformat()
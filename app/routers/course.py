@@ -5,16 +5,22 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.dependencies.auth import get_current_user
+from app.core.monitoring import TimedRoute
+from app.dependencies.auth import get_current_principal
 from app.dependencies.roles import require_role
 from app.models.course import CourseModel
+from app.models.course_stats import CourseStatsModel
 from app.schemas.course import (
     CourseCreate,
     CourseOut,
+    CourseStatsResponse,
     CourseUpdate,
     CourseUpdateOut,
+    InstructorDashboard,
     PaginatedCourses,
 )
+from app.utils.counting import TotalMode
+from app.utils.responses import fast_response
 
 # from app.dependencies.auth import get_current_user
 
@@ -23,6 +29,7 @@ router = APIRouter(
     prefix="/courses",
     tags=["courses"],
     responses={404: {"description": "Not found"}},
+    route_class=TimedRoute,
 )
 
 
@@ -49,7 +56,7 @@ async def create_course(
 
 
 @router.get("/{course_id}", response_model=CourseOut)
-async def get_course(course_id: str, current_user=Depends(get_current_user)):
+async def get_course(course_id: str, current_user=Depends(get_current_principal)):
     """Retrieve a course by its ID."""
     if not course_id:
         raise HTTPException(status_code=400, detail="Course ID is required")
@@ -61,22 +68,57 @@ async def get_course(course_id: str, current_user=Depends(get_current_user)):
     return course
 
 
+@router.get("/{course_id}/stats", response_model=CourseStatsResponse)
+async def get_course_stats(
+    course_id: str, user=Depends(require_role(["instructor", "admin"]))
+):
+    """Enrollment and progress stats of a course, read from the course_stats
+    rollup. Only the course creator or an admin can see them."""
+    course = await CourseModel.get_course_by_id(course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if user["role"] != "admin" and course["instructor"] != user["email"]:
+        raise HTTPException(
+            status_code=403,
+            detail="You do not have permission to view this course's stats",
+        )
+    return await CourseStatsModel.get_stats(course["id"])
+
+
 @router.get("/", response_model=PaginatedCourses)
 async def list_courses(
-    current_user=Depends(get_current_user),
+    current_user=Depends(get_current_principal),
     skip: int = Query(0, description="Number of courses to skip for pagination"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (replaces skip)"
+    ),
     limit: int = Query(10, description="Number of courses to return per page"),
     category: Optional[str] = Query(None, description="Filter by course category"),
     instructor: Optional[str] = Query(None, description="Filter by instructor email"),
     search: Optional[str] = Query(
-        None, description="Search courses by title or description"
+        None,
+        description=(
+            "Full-text search on title, description and category, ranked by "
+            "relevance; very short queries match title prefixes"
+        ),
     ),
     sort_by: Optional[str] = Query(
-        "created_at", description="Sort courses by created_at or updated_at"
+        "created_at",
+        description=(
+            "Sort courses by created_at or updated_at "
+            "(full-text searches are sorted by relevance)"
+        ),
     ),
     sort_order: Optional[int] = Query(
         -1, description="Sort order: 1 for ascending, -1 for descending"
     ),
+    total_mode: TotalMode = Query(
+        TotalMode.EXACT,
+        description=(
+            "How to compute total: exact, estimated, cached, "
+            "or none to skip counting (use has_more)"
+        ),
+    ),
 ):
     """Retrieve all courses with pagination, filtering, searching, and sorting."""
     if not current_user:
@@ -90,8 +132,10 @@ async def list_courses(
         search=search,
         sort_by=sort_by,
         sort_order=sort_order,
+        cursor=cursor,
+        total_mode=total_mode,
     )
-    return courses
+    return fast_response(PaginatedCourses, courses, trusted=True)
 
 
 @router.patch("/update/{course_id}", response_model=CourseUpdateOut)
@@ -100,11 +144,15 @@ async def update_course(
     course: CourseUpdate,
     user=Depends(require_role(["instructor", "admin"])),
 ):
-    """Update an existing course."""
-    existing_course = await CourseModel.get_course_by_id(course_id)
-    if not existing_course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    if existing_course["instructor"] != user["email"]:
+    """Update an existing course.
+    Only the course creator can update it."""
+    course_data = course.model_dump(exclude_unset=True)
+    course_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    try:
+        updated_course = await CourseModel.update_course(
+            course_id, course_data, owner=user["email"]
+        )
+    except PermissionError:
         raise HTTPException(
             status_code=403,
             detail=(
@@ -112,12 +160,10 @@ async def update_course(
                 "so, You do not have permission to update this course"
             ),
         )
-
-    course_data = course.model_dump(exclude_unset=True)
-    course_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    updated_course = await CourseModel.update_course(course_id, course_data)
+    if not updated_course:
+        raise HTTPException(status_code=404, detail="Course not found")
     return {
-        "id": updated_course["_id"],
+        "id": updated_course["id"],
         "title": updated_course["title"],
         "description": updated_course["description"],
         "category": updated_course.get("category"),
@@ -133,23 +179,41 @@ async def delete_course(
 ):
     """Delete a course by its ID.
     Only the course creator or an admin can delete it."""
-    existing_course = await CourseModel.get_course_by_id(course_id)
-    if not existing_course:
-        raise HTTPException(status_code=404, detail="Course not found")
     is_admin = user["role"] == "admin"
-    is_course_creator = existing_course["instructor"] == user["email"]
-
-    if not (is_admin or is_course_creator):
+    try:
+        deleted = await CourseModel.delete_course(
+            course_id, owner=None if is_admin else user["email"]
+        )
+    except PermissionError:
         raise HTTPException(
             status_code=403, detail="You do not have permission to delete this course"
         )
-    await CourseModel.delete_course(course_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Course not found")
     return {"detail": "Course deleted successfully"}
 
 
+@router.get("/instructor/me/dashboard", response_model=InstructorDashboard)
+async def get_instructor_dashboard(
+    user=Depends(require_role(["instructor", "admin"])),
+    skip: int = Query(0, ge=0, description="Number of courses to skip"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (replaces skip)"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Courses per page"),
+):
+    """The current instructor's courses, newest first, with enrollment
+    count, average progress and completion rate of each. Served from a
+    short-lived cache, so stats may lag a few seconds behind."""
+    dashboard = await CourseModel.get_instructor_dashboard(
+        user["email"], skip=skip, limit=limit, cursor=cursor
+    )
+    return fast_response(InstructorDashboard, dashboard, trusted=True)
+
+
 @router.get("/instructor/{instructor_email}", response_model=list[CourseOut])
 async def get_courses_by_instructor(
-    instructor_email: str, current_user=Depends(get_current_user)
+    instructor_email: str, current_user=Depends(get_current_principal)
 ):
     """Retrieve all courses taught by a specific instructor."""
     if not current_user:
@@ -159,12 +223,12 @@ async def get_courses_by_instructor(
         raise HTTPException(
             status_code=404, detail="No courses found for this instructor"
         )
-    return courses
+    return fast_response(list[CourseOut], courses, trusted=True)
 
 
 @router.get("/category/{category}", response_model=list[CourseOut])
 async def get_courses_by_category(
-    category: str, current_user=Depends(get_current_user)
+    category: str, current_user=Depends(get_current_principal)
 ):
     """Retrieve all courses in a specific category."""
     if not current_user:
@@ -172,4 +236,4 @@ async def get_courses_by_category(
     courses = await CourseModel.get_courses_by_category(category)
     if not courses:
         raise HTTPException(status_code=404, detail="No courses found in this category")
-    return courses
+    return fast_response(list[CourseOut], courses, trusted=True)
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pymongo import ASCENDING
+
+from app.core.config import settings
+from app.core.monitoring import TimedRoute
+from app.dependencies.auth import get_current_principal
 from app.dependencies.roles import require_role
 from app.models.course import CourseModel
 from app.models.enrollment import EnrollmentModel
-from app.schemas.enrollment import EnrollmentResponse
+from app.schemas.enrollment import EnrollmentResponse, PaginatedEnrollments
+from app.utils.pagination import next_cursor
+from app.utils.progress_buffer import progress_buffer
+from app.utils.responses import fast_response
 
 router = APIRouter(
     prefix="/enrollments",
     tags=["enrollments"],
     responses={404: {"description": "Not found"}},
+    route_class=TimedRoute,
 )
 
 
@@ -38,7 +48,61 @@ async def enroll_user_in_course(
     }
 
 
+@router.get("/me", response_model=PaginatedEnrollments)
+async def get_my_courses(
+    current_user=Depends(get_current_principal),
+    skip: int = Query(0, ge=0, description="Number of enrollments to skip"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (replaces skip)"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Enrollments per page"),
+):
+    """The current user's courses with title, category, instructor and
+    progress, most recent activity first.
+
+    Activity is ordered as stored. Progress still buffered by write-behind
+    in this worker is shown (see app.utils.progress_buffer), but the
+    enrollment keeps its stored ``last_activity`` and position until the
+    buffer is flushed. Posting progress moves an enrollment to the front,
+    so while walking the pages with ``cursor`` an enrollment updated
+    meanwhile can be skipped (or, with ``skip``, repeated)."""
+    user_id = current_user["_id"]
+    page = await EnrollmentModel.get_user_courses(
+        user_id, skip=skip, limit=limit, cursor=cursor
+    )
+    if settings.PROGRESS_WRITE_BEHIND:
+        buffered = progress_buffer.pending(user_id)
+        for enrollment in page["data"]:
+            entry = buffered.get(enrollment["course_id"])
+            if entry is not None:
+                enrollment["progress"] = entry["progress"]
+                enrollment["is_completed"] = entry["is_completed"]
+    return fast_response(PaginatedEnrollments, page, trusted=True)
+
+
 @router.get("/user/{user_id}")
-async def get_user_enrollments(user_id: str):
-    """Get all enrollments for a user."""
-    return await EnrollmentModel.get_enrollments_by_user(user_id)
+async def get_user_enrollments(
+    user_id: str,
+    response: Response,
+    current_user=Depends(get_current_principal),
+    limit: Optional[int] = Query(
+        None, ge=1, le=100, description="Page size (all enrollments if omitted)"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor header of the previous page"
+    ),
+):
+    """Get all enrollments for a user (the user themselves or an admin).
+    When paginated, the cursor of the next page is sent in X-Next-Cursor."""
+    if current_user["_id"] != user_id and current_user["role"] != "admin":
+        raise HTTPException(
+            status_code=403, detail="You can only view your own enrollments"
+        )
+    enrollments = await EnrollmentModel.get_enrollments_by_user(
+        user_id, limit=limit, cursor=cursor
+    )
+    if limit:
+        cursor_value = next_cursor(enrollments, limit, "_id", ASCENDING, id_key="_id")
+        if cursor_value:
+            response.headers["X-Next-Cursor"] = cursor_value
+    return enrollments
@@ -1,11 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException
 
+from app.core.config import settings
+from app.core.monitoring import TimedRoute
 from app.dependencies.roles import require_role
 from app.models.enrollment import EnrollmentModel
 from app.models.progress import ProgressModel
-from app.schemas.progress import ProgressResponse, ProgressUpdate
+from app.schemas.progress import (
+    ProgressBatch,
+    ProgressBatchResponse,
+    ProgressResponse,
+    ProgressUpdate,
+)
+from app.utils.progress_buffer import progress_buffer
+from app.utils.responses import fast_response
 
-router = APIRouter(prefix="/progress", tags=["progress"])
+router = APIRouter(prefix="/progress", tags=["progress"], route_class=TimedRoute)
+
+
+@router.post("/batch", response_model=ProgressBatchResponse)
+async def sync_progress_batch(
+    batch: ProgressBatch,
+    current_user=Depends(require_role(["student"])),
+):
+    """Apply progress recorded offline for many courses at once.
+    For each course the entry with the latest ``client_timestamp`` wins,
+    so replaying an older entry never moves progress back."""
+    user_id = current_user["_id"]
+    entries = [entry.model_dump() for entry in batch.entries]
+    enrolled = await EnrollmentModel.enrolled_course_ids(
+        user_id, [entry["course_id"] for entry in entries]
+    )
+    accepted = [entry for entry in entries if entry["course_id"] in enrolled]
+    statuses = iter(await ProgressModel.apply_batch(user_id, accepted))
+    results = []
+    for entry in entries:
+        enrolled_in = entry["course_id"] in enrolled
+        results.append(
+            {
+                "course_id": entry["course_id"],
+                "progress": entry["progress"],
+                "status": next(statuses) if enrolled_in else "not_enrolled",
+            }
+        )
+    return {"results": results}
 
 
 @router.post("/{course_id}", response_model=ProgressResponse)
@@ -25,9 +62,14 @@ async def update_course_progress(
         )
 
     try:
-        progress_data = await ProgressModel.update_progress(
-            user_id=user_id, course_id=course_id, progress=progress_update.progress
-        )
+        if settings.PROGRESS_WRITE_BEHIND:
+            progress_data = progress_buffer.record(
+                user_id, course_id, progress_update.progress
+            )
+        else:
+            progress_data = await ProgressModel.update_progress(
+                user_id=user_id, course_id=course_id, progress=progress_update.progress
+            )
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=str(ve))
 
@@ -45,21 +87,12 @@ async def update_course_progress(
 async def get_user_progress(
     current_user=Depends(require_role("student", "instructor", "admin"))
 ):
-    """Retrieve all progress entries for the current user"""
-    user_id = current_user["_id"]
-    progress_entries = []
-
-    cursor = ProgressModel.collection.find({"user_id": user_id})
-    async for progress_data in cursor:
-        progress_entries.append(
-            ProgressResponse(
-                user_id=progress_data["user_id"],
-                course_id=progress_data["course_id"],
-                progress=progress_data["progress"],
-                is_completed=progress_data.get("is_completed", False),
-                created_at=progress_data["created_at"],
-                updated_at=progress_data["updated_at"],
-            )
+    """Retrieve all progress entries for the current user.
+    With write-behind, updates still buffered by this worker are included;
+    those buffered by other workers appear after their next flush."""
+    progress_entries = await ProgressModel.get_user_progress(current_user["_id"])
+    if settings.PROGRESS_WRITE_BEHIND:
+        progress_entries = progress_buffer.overlay(
+            current_user["_id"], progress_entries
         )
-
-    return progress_entries
+    return fast_response(list[ProgressResponse], progress_entries, trusted=True)
@@ -9,15 +9,25 @@ from typing import Optional
 from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
-from app.dependencies.auth import admin_required, get_current_user
-from app.models.user import UserModel
+from app.core.monitoring import TimedRoute
+from app.core.slow_queries import slow_query_log
+from app.dependencies.auth import (
+    admin_required,
+    get_current_principal,
+    get_current_user,
+)
+from app.models.course import course_cache, dashboard_cache
+from app.models.user import UserModel, principal_cache
 from app.schemas.user import PaginatedUsers, ProfileUpdate, UserCreate, UserOut
-from app.utils.auth import hash_password
+from app.utils.counting import TotalMode, count_cache_stats
+from app.utils.hashing import password_hasher
+from app.utils.responses import fast_response
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
     responses={404: {"description": "Not found"}},
+    route_class=TimedRoute,
 )
 
 
@@ -25,7 +35,7 @@ router = APIRouter(
     "/admin/create-user", response_model=UserOut, status_code=status.HTTP_201_CREATED
 )
 async def create_user_as_admin(
-    user: UserCreate, current_user: dict = Depends(get_current_user)
+    user: UserCreate, current_user: dict = Depends(get_current_principal)
 ):
     """
     Admin endpoint to create any type of user (student, instructor, admin).
@@ -36,13 +46,13 @@ async def create_user_as_admin(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can create users.",
         )
-    existing_user = await UserModel.get_by_email(user.email)
+    existing_user = await UserModel.get_by_email(user.email, {"_id": 1})
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
-    user_data = new_func(user)
+    user_data = await new_func(user)
     new_user = await UserModel.create(user_data)
     return {
         "id": new_user["_id"],
@@ -59,10 +69,10 @@ async def create_user_as_admin(
     }
 
 
-def new_func(user):
+async def new_func(user):
     """Helper function to convert user schema to dictionary."""
     user_data = user.model_dump()
-    user_data["password"] = hash_password(user.password)
+    user_data["password"] = await password_hasher.hash(user.password)
     # Default to student if not specified
     user_data["role"] = user_data.get("role", "student")
     user_data["created_at"] = datetime.now(timezone.utc).isoformat()
@@ -73,12 +83,22 @@ def new_func(user):
 @router.get("/", response_model=PaginatedUsers)
 async def list_users(
     page: int = Query(1, ge=1, description="Page number (starting from 1)"),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (replaces page)"
+    ),
     limit: int = Query(10, ge=1, le=100, description="Number of users per page"),
     role: Optional[str] = Query(None, description="Filter by role"),
     gender: Optional[str] = Query(None, description="Filter by gender"),
     # email: Optional[str] = Query(None, description="Filter by exact email"),
     search: Optional[str] = Query(None, description="Search in name, email"),
-    current_user: dict = Depends(get_current_user),
+    total_mode: TotalMode = Query(
+        TotalMode.EXACT,
+        description=(
+            "How to compute total_users: exact, estimated, cached, "
+            "or none to skip counting (use has_more)"
+        ),
+    ),
+    current_user: dict = Depends(get_current_principal),
 ):
     """
     Retrieve all users in the system.
@@ -107,16 +127,26 @@ async def list_users(
             {"last_name": search_regex},
             {"email": search_regex},
         ]
-    users = await UserModel.list_users(query=query, limit=limit, page=page)
-    total_users = await UserModel.count_users(query=query)
-    total_pages = (total_users + limit - 1) // limit
-    return {
-        "page": page,
-        "limit": limit,
-        "total_users": total_users,
-        "total_pages": total_pages,
-        "users": users,
-    }
+    result = await UserModel.list_users(
+        query=query, limit=limit, page=page, cursor=cursor, total_mode=total_mode
+    )
+    total_users = result["total"]
+    total_pages = (
+        (total_users + limit - 1) // limit if total_users is not None else None
+    )
+    return fast_response(
+        PaginatedUsers,
+        {
+            "page": page,
+            "limit": limit,
+            "total_users": total_users,
+            "total_pages": total_pages,
+            "users": result["data"],
+            "has_more": result["has_more"],
+            "next_cursor": result["next_cursor"],
+        },
+        trusted=True,
+    )
 
 
 @router.get("/user/profile")
@@ -128,14 +158,37 @@ async def profile(user=Depends(get_current_user)):
     return user_data
 
 
-@router.get("/admin/dashboard")
-async def admin_dashboard(current_user: dict = Depends(admin_required)):
+@router.get("/admin/dashboard", dependencies=[Depends(admin_required)])
+async def admin_dashboard(current_user: dict = Depends(get_current_user)):
     """Admin dashboard to view all users."""
     user_copy = current_user.copy()  # Avoid mutating the original dict
     user_copy.pop("password", None)  # Remove password if it exists
     return {"msg": "Welcome to the admin dashboard", "user": user_copy}
 
 
+@router.get("/admin/cache-stats", dependencies=[Depends(admin_required)])
+async def cache_stats():
+    """Hit/miss counters of the in-process caches (admin only)."""
+    return {
+        "principals": principal_cache.stats(),
+        "courses": course_cache.stats(),
+        "dashboards": dashboard_cache.stats(),
+        "counts": count_cache_stats(),
+    }
+
+
+@router.get("/admin/hashing-stats", dependencies=[Depends(admin_required)])
+async def hashing_stats():
+    """Latency and queueing figures of the password hashing pool (admin only)."""
+    return password_hasher.stats()
+
+
+@router.get("/admin/slow-queries", dependencies=[Depends(admin_required)])
+async def slow_queries(limit: int = Query(20, ge=1, le=100)):
+    """Slowest Mongo query shapes of the rolling window (admin only)."""
+    return slow_query_log.stats(limit)
+
+
 @router.get("/users/{user_id}", dependencies=[Depends(admin_required)])
 async def get_user_by_id(user_id: str):
     """Get user details by ID (admin only)."""
@@ -149,15 +202,13 @@ async def get_user_by_id(user_id: str):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
         )
-    user["_id"] = str(user["_id"])  # Convert ObjectId to string
-    user.pop("password", None)
-    user.pop("_id", None)  # Remove _id if not needed in response
     return user
 
 
 @router.patch("/user/update-profile")
 async def update_profile(
-    profile_update: ProfileUpdate, current_user: dict = Depends(get_current_user)
+    profile_update: ProfileUpdate,
+    current_user: dict = Depends(get_current_principal),
 ):
     """
     Partially update the current user's profile with validation.
@@ -170,8 +221,7 @@ async def update_profile(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No fields provided for update",
         )
-    await UserModel.update_user(str(current_user["_id"]), update_data)
-    updated_user = await UserModel.get_by_id(str(current_user["_id"]))
+    updated_user = await UserModel.update_user(str(current_user["_id"]), update_data)
     if updated_user:
         updated_user.pop("_id", None)  # Remove _id if not needed in response
         updated_user.pop("password", None)
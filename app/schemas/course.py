@@ -4,6 +4,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from app.utils.serialization import mongo_projection
+
 
 class CourseBase(BaseModel):
     """Base model for course data."""
@@ -61,7 +63,64 @@ class CourseUpdateOut(CourseUpdate):
 class PaginatedCourses(BaseModel):
     """Model for paginated course results."""
 
-    total: int = Field(..., description="Total number of courses")
+    total: Optional[int] = Field(
+        ..., description="Total number of courses (null when total_mode=none)"
+    )
     data: list[CourseOut] = Field(
         ..., description="List of courses in the current page"
     )
+    has_more: bool = Field(False, description="Whether another page follows")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
+
+
+class CourseStatsResponse(BaseModel):
+    """Enrollment and progress stats of a course."""
+
+    course_id: str
+    enrolled: int = Field(..., description="Enrolled students")
+    started: int = Field(..., description="Students with progress above 0")
+    completed: int = Field(..., description="Students at 100% progress")
+    average_progress: float = Field(
+        ..., description="Mean progress of enrolled students (0-100)"
+    )
+    completion_rate: float = Field(
+        ..., description="Share of enrolled students who completed (0-1)"
+    )
+    histogram: dict[str, int] = Field(
+        ...,
+        description='Students per progress bucket: "0" is 0-9%, ..., "100" is 100%',
+    )
+    updated_at: Optional[str] = Field(
+        None, description="Last change of the stats, null without activity"
+    )
+
+
+class DashboardCourse(BaseModel):
+    """A course of the instructor dashboard with its stats."""
+
+    id: str
+    title: str
+    category: Optional[str] = None
+    created_at: Optional[str] = None
+    enrolled: int
+    started: int
+    completed: int
+    average_progress: float
+    completion_rate: float
+
+
+class InstructorDashboard(BaseModel):
+    """Page of the instructor dashboard."""
+
+    total: int = Field(..., description="Courses taught by the instructor")
+    data: list[DashboardCourse]
+    has_more: bool = Field(False, description="Whether another page follows")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
+
+
+# fields read from Mongo for every CourseOut response
+COURSE_OUT_PROJECTION = mongo_projection(CourseOut)
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class EnrollmentResponse(BaseModel):
@@ -8,3 +9,30 @@ class EnrollmentResponse(BaseModel):
     user_id: str
     course_id: str
     enrolled_at: datetime
+
+
+class EnrolledCourse(BaseModel):
+    """An enrollment with its course and the student's progress."""
+
+    id: str
+    course_id: str
+    title: Optional[str] = Field(None, description="Null if the course was deleted")
+    category: Optional[str] = None
+    instructor: Optional[str] = None
+    enrolled_at: Optional[str] = None
+    progress: int = 0
+    is_completed: bool = False
+    last_activity: Optional[str] = Field(
+        None, description="Last progress update, or the enrollment date"
+    )
+
+
+class PaginatedEnrollments(BaseModel):
+    """Page of a student's enrolled courses, most recent activity first."""
+
+    total: int
+    data: list[EnrolledCourse]
+    has_more: bool = Field(False, description="Whether another page follows")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, null on the last page"
+    )
@@ -1,7 +1,10 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from app.utils.serialization import mongo_projection
+
 
 class ProgressUpdate(BaseModel):
     progress: int = Field(..., ge=0, le=100)
@@ -14,3 +17,30 @@ class ProgressResponse(BaseModel):
     is_completed: bool
     created_at: datetime
     updated_at: datetime
+
+
+class ProgressBatchEntry(BaseModel):
+    course_id: str
+    progress: int = Field(..., ge=0, le=100)
+    # when the client recorded the progress; the latest one wins
+    client_timestamp: datetime
+
+
+class ProgressBatch(BaseModel):
+    entries: list[ProgressBatchEntry] = Field(..., min_length=1, max_length=500)
+
+
+class ProgressBatchResult(BaseModel):
+    course_id: str
+    progress: int
+    # applied: stored; stale: a more recent entry was already stored;
+    # not_enrolled: ignored; failed: not stored, send it again
+    status: Literal["applied", "stale", "not_enrolled", "failed"]
+
+
+class ProgressBatchResponse(BaseModel):
+    results: list[ProgressBatchResult]
+
+
+# fields read from Mongo for every ProgressResponse
+PROGRESS_RESPONSE_PROJECTION = mongo_projection(ProgressResponse)
@@ -5,6 +5,8 @@ from typing import Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
+from app.utils.serialization import mongo_projection
+
 
 class UserRole(str, Enum):
     """User roles in the system."""
@@ -50,9 +52,11 @@ class PaginatedUsers(BaseModel):
 
     page: int
     limit: int
-    total_users: int
-    total_pages: int
+    total_users: Optional[int]
+    total_pages: Optional[int]
     users: list[UserOut]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class UserSignup(BaseModel):
@@ -79,3 +83,7 @@ class ProfileUpdate(BaseModel):
     phone_number: Optional[str] = Field(None, min_length=8, max_length=15)
     address: Optional[str] = Field(None, max_length=255)
     gender: Optional[str] = Field(None, pattern="^(male|female|other)$")
+
+
+# fields read from Mongo for every UserOut response (never the password hash)
+USER_OUT_PROJECTION = mongo_projection(UserOut)
@@ -0,0 +1,80 @@
+"""
+Production server entry point.
+
+    python -m app.serve [--workers N] [--port P]
+
+Runs uvicorn with one worker process per available CPU (or WEB_WORKERS),
+uvloop and httptools when they are installed, and the keep-alive, backlog
+and graceful shutdown settings from app.core.config. On SIGTERM each worker
+stops accepting connections and finishes its in-flight requests for up to
+WEB_GRACEFUL_SHUTDOWN_SECONDS before the app shuts down.
+"""
+
+import argparse
+import math
+import os
+from importlib.util import find_spec
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring affinity and cgroup v2 quotas."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def worker_count() -> int:
+    """WEB_WORKERS if set, otherwise one worker per available CPU."""
+    return settings.WEB_WORKERS or available_cpus()
+
+
+def event_loop() -> str:
+    return "uvloop" if find_spec("uvloop") else "asyncio"
+
+
+def http_protocol() -> str:
+    return "httptools" if find_spec("httptools") else "h11"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.serve", description="Run the API in production."
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or worker_count()
+    loop, http = event_loop(), http_protocol()
+    print(f"Starting {workers} worker(s) on {args.host}:{args.port} ({loop}, {http})")
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=settings.WEB_BACKLOG,
+        timeout_keep_alive=settings.WEB_KEEPALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.WEB_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=True,
+        forwarded_allow_ips=settings.WEB_FORWARDED_ALLOW_IPS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,20 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def token_claims(user: dict) -> dict:
+    """Build the signed claims of a user's access token.
+
+    Besides the subject (email) the token carries the user id, role and
+    token_version, which lets get_current_principal authorize requests
+    without loading the user."""
+    return {
+        "sub": user["email"],
+        "uid": str(user["_id"]),
+        "role": user["role"],
+        "ver": user.get("token_version", 0),
+    }
+
+
 def create_access_token(data: dict, expires_delta: Optional[int] = None):
     """Create a JWT access token with an expiration time.
 
@@ -0,0 +1,76 @@
+"""Total-count strategies for paginated listings.
+
+Counting every match is often slower than fetching the page itself, so
+listings accept a ``total_mode``:
+
+- ``exact``: count_documents run concurrently with the page query
+- ``estimated``: collection metadata count when unfiltered, otherwise an
+  exact count run concurrently with the page query
+- ``cached``: exact count cached per normalized filter for
+  COUNT_CACHE_TTL_SECONDS and dropped on writes to the collection
+- ``none``: no count at all, only ``has_more``
+"""
+
+import json
+from enum import Enum
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class TotalMode(str, Enum):
+    """How a listing computes its total."""
+
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    CACHED = "cached"
+    NONE = "none"
+
+
+# one cache per collection name so writes only drop their own counts
+_count_caches: dict[str, TTLCache] = {}
+
+
+def _count_cache(collection_name: str) -> TTLCache:
+    cache = _count_caches.get(collection_name)
+    if cache is None:
+        cache = _count_caches[collection_name] = TTLCache(
+            maxsize=settings.COUNT_CACHE_MAX_SIZE,
+            ttl=settings.COUNT_CACHE_TTL_SECONDS,
+        )
+    return cache
+
+
+def normalize_filter(query: dict) -> str:
+    """Stable cache key for a Mongo filter (key order independent)."""
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+def invalidate_counts(collection_name: str) -> None:
+    """Drop the cached counts of a collection after a write."""
+    cache = _count_caches.get(collection_name)
+    if cache is not None:
+        cache.clear()
+
+
+async def estimated_count(collection, query: dict) -> int:
+    """Metadata count for unfiltered queries, exact count otherwise."""
+    if not query:
+        return await collection.estimated_document_count()
+    return await collection.count_documents(query)
+
+
+async def cached_count(collection, query: dict) -> int:
+    """Exact count served from the per-collection count cache."""
+    cache = _count_cache(collection.name)
+    key = normalize_filter(query)
+    total = cache.get(key)
+    if total is None:
+        total = await collection.count_documents(query)
+        cache.set(key, total)
+    return total
+
+
+def count_cache_stats() -> dict:
+    """Hit/miss counters of the count caches, by collection."""
+    return {name: cache.stats() for name, cache in _count_caches.items()}
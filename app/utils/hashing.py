@@ -0,0 +1,128 @@
+"""Async password hashing backed by a bounded worker pool.
+
+bcrypt takes 100-300 ms of CPU per call, so running it inside a request
+handler blocks the event loop for every other request on the worker.
+PasswordHasher runs it on a thread or process pool instead, limits how many
+calls may be queued or running at once and rejects callers with 503 when
+they wait too long for a slot.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.auth import hash_password, verify_password
+
+
+class PasswordHasher:
+    """Run hash_password / verify_password off the event loop."""
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        workers: int = 4,
+        max_concurrency: int = 8,
+        queue_timeout: float = 5.0,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.executor_kind = executor
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._metrics = {
+            "calls": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        metrics = self._metrics
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError as exc:
+            metrics["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            ) from exc
+        started_at = time.perf_counter()
+        waited = started_at - queued_at
+        metrics["queue_wait_seconds_total"] += waited
+        metrics["queue_wait_seconds_max"] = max(
+            metrics["queue_wait_seconds_max"], waited
+        )
+        metrics["in_flight"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._semaphore.release()
+            elapsed = time.perf_counter() - started_at
+            metrics["in_flight"] -= 1
+            metrics["calls"] += 1
+            metrics["hash_seconds_total"] += elapsed
+            metrics["hash_seconds_max"] = max(metrics["hash_seconds_max"], elapsed)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password using bcrypt without blocking the event loop."""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against its bcrypt hash without blocking."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Return call counts and latency figures of the pool."""
+        metrics = dict(self._metrics)
+        calls = metrics["calls"]
+        metrics["hash_seconds_avg"] = (
+            metrics["hash_seconds_total"] / calls if calls else 0.0
+        )
+        metrics["queue_wait_seconds_avg"] = (
+            metrics["queue_wait_seconds_total"] / calls if calls else 0.0
+        )
+        metrics.update(
+            executor=self.executor_kind,
+            workers=self.workers,
+            max_concurrency=self.max_concurrency,
+        )
+        return metrics
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for running hashes to finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
@@ -1,14 +1,18 @@
-import bcrypt
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 from app.core.config import settings
 from app.core.database import db
+from app.models.user import UserModel
+from app.utils.hashing import password_hasher
 
 
 async def create_initial_admin():
     """
     Creates the initial admin user on startup ONLY if it doesn't already exist.
-    Safe for production (idempotent).
+    Safe for production (idempotent) and when several workers start at once:
+    the admin is written with a single upsert on the unique email index, so
+    only one worker creates it.
     """
     admin_email = settings.ADMIN_EMAIL
     admin_password = settings.ADMIN_PASSWORD
@@ -19,15 +23,21 @@ async def create_initial_admin():
 
     users_collection = db["users"]
 
-    # Check if admin exists
-    existing_admin = await users_collection.find_one({"email": admin_email})
+    # Check if admin exists (cheap path for every restart after the first)
+    existing_admin = await users_collection.find_one({"email": admin_email}, {"_id": 1})
     if existing_admin:
         print(f"Admin already exists ({admin_email}). Skipping creation.")
         return
 
-    # password hashing
-    plain_password = admin_password  # you can change this
-    hashed_password = bcrypt.hashpw(plain_password.encode("utf-8"), bcrypt.gensalt())
+    # the unique index may still be building in the background; without it
+    # concurrent upserts could insert the admin twice
+    email_index = [
+        index for index in UserModel.indexes if index.document["name"] == "email_1"
+    ]
+    await users_collection.create_indexes(email_index)
+
+    # password hashing (off the event loop, startup runs inside it)
+    hashed_password = await password_hasher.hash(admin_password)
 
     # Build admin object
     admin_user = {
@@ -41,9 +51,17 @@ async def create_initial_admin():
         "gender": "other",
         "role": "admin",
         # "password": hash_password(admin_password),
-        "password": hashed_password.decode("utf-8"),  # save as string
+        "password": hashed_password,
     }
 
-    await users_collection.insert_one(admin_user)
+    try:
+        result = await users_collection.update_one(
+            {"email": admin_email}, {"$setOnInsert": admin_user}, upsert=True
+        )
+    except DuplicateKeyError:
+        result = None
+    if result is None or result.upserted_id is None:
+        print(f"Admin already exists ({admin_email}). Skipping creation.")
+        return
 
     print(f"Admin created successfully: {admin_email}")
@@ -0,0 +1,142 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor records the sort value and ``_id`` of the last document of a page.
+The next page is fetched with a range filter on (sort field, ``_id``), so
+Mongo walks the index from where the previous page ended instead of
+scanning and discarding every skipped document. Page 5000 then costs the
+same as page 1.
+
+Cursors are opaque to clients: base64 encoded JSON that also records the
+sort they were issued for, so a cursor cannot be replayed against a
+different sort.
+"""
+
+import asyncio
+import base64
+import binascii
+import json
+from typing import Any
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+from app.utils.counting import TotalMode, cached_count, estimated_count
+
+
+def encode_cursor(sort_field: str, sort_order: int, value: Any, doc_id: str) -> str:
+    """Build the opaque cursor pointing after (value, doc_id)."""
+    payload = {"s": sort_field, "o": sort_order, "v": value, "id": str(doc_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, sort_field: str, sort_order: int
+) -> tuple[Any, ObjectId]:
+    """Return the (sort value, _id) recorded in ``cursor``.
+    Raises a 400 if the cursor is malformed or was issued for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["s"] != sort_field or payload["o"] != sort_order:
+            raise ValueError("cursor was issued for a different sort")
+        return payload["v"], ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, binascii.Error) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        ) from exc
+
+
+def keyset_filter(sort_field: str, sort_order: int, value: Any, last_id: ObjectId):
+    """Filter matching the documents that sort after (value, last_id).
+
+    Missing/null sort values sort before everything else in Mongo, i.e.
+    first in ascending and last in descending order."""
+    op = "$gt" if sort_order == 1 else "$lt"
+    if sort_field == "_id":
+        return {"_id": {op: last_id}}
+    tie = {sort_field: value, "_id": {op: last_id}}
+    if sort_order == 1:
+        if value is None:
+            return {"$or": [tie, {sort_field: {"$ne": None}}]}
+        return {"$or": [{sort_field: {"$gt": value}}, tie]}
+    if value is None:
+        return tie
+    return {"$or": [{sort_field: {"$lt": value}}, tie, {sort_field: None}]}
+
+
+def cursor_filter(cursor: str | None, sort_field: str, sort_order: int):
+    """Keyset filter for the page following ``cursor``, None without one."""
+    if not cursor:
+        return None
+    value, last_id = decode_cursor(cursor, sort_field, sort_order)
+    return keyset_filter(sort_field, sort_order, value, last_id)
+
+
+def apply_cursor(query: dict, cursor: str | None, sort_field: str, sort_order: int):
+    """Restrict ``query`` to the page following ``cursor`` (if any)."""
+    after = cursor_filter(cursor, sort_field, sort_order)
+    if after is None:
+        return query
+    return {"$and": [query, after]} if query else after
+
+
+def sort_spec(sort_field: str, sort_order: int) -> list[tuple[str, int]]:
+    """Sort on the requested field with ``_id`` as tie breaker, which keeps
+    the order total so keyset pages never skip or repeat documents."""
+    if sort_field == "_id":
+        return [("_id", sort_order)]
+    return [(sort_field, sort_order), ("_id", sort_order)]
+
+
+def next_cursor(
+    docs: list[dict],
+    limit: int,
+    sort_field: str,
+    sort_order: int,
+    id_key: str = "id",
+) -> str | None:
+    """Cursor for the page after ``docs``, None when it was the last page."""
+    if not docs or len(docs) < limit:
+        return None
+    last = docs[-1]
+    value = last[id_key] if sort_field == "_id" else last.get(sort_field)
+    return encode_cursor(sort_field, sort_order, value, last[id_key])
+
+
+async def fetch_page(
+    collection,
+    query: dict,
+    sort: list,
+    skip: int = 0,
+    limit: int = 10,
+    after: dict | None = None,
+    projection: dict | None = None,
+    total_mode: TotalMode = TotalMode.EXACT,
+) -> dict:
+    """Fetch one page of ``query`` and its total according to ``total_mode``
+    (see app.utils.counting).
+
+    ``after`` is a keyset filter (see cursor_filter) used instead of
+    ``skip``; the total always counts ``query`` alone. One extra document
+    is read to tell whether another page follows. Returns a dict with the
+    raw ``docs``, ``total`` (None in "none" mode) and ``has_more``."""
+    page_query = query
+    if after is not None:
+        # part of the find, so the index bounds the scan
+        page_query = {"$and": [query, after]} if query else after
+        skip = 0
+    results = collection.find(page_query, projection).sort(sort).skip(skip)
+    page = results.limit(limit + 1).to_list(length=limit + 1)
+    if total_mode == TotalMode.NONE:
+        docs, total = await page, None
+    else:
+        if total_mode == TotalMode.EXACT:
+            count = collection.count_documents(query)
+        elif total_mode == TotalMode.CACHED:
+            count = cached_count(collection, query)
+        else:
+            count = estimated_count(collection, query)
+        docs, total = await asyncio.gather(page, count)
+    return {"docs": docs[:limit], "total": total, "has_more": len(docs) > limit}
@@ -0,0 +1,180 @@
+"""Write-behind buffer for progress updates (PROGRESS_WRITE_BEHIND).
+
+The video player posts a student's progress every few seconds, and most of
+those writes are overwritten by the next one. With write-behind on, each
+worker keeps only the latest progress per (user_id, course_id) in memory
+and writes the buffered entries every PROGRESS_FLUSH_SECONDS, or as soon as
+PROGRESS_FLUSH_MAX_ENTRIES are waiting, as one unordered bulk_write of
+upserts. The buffer is flushed on shutdown too (see app.main).
+
+Each upsert only applies if the stored entry is older
+(ProgressModel.upsert_if_newer, with the time the update was received as
+``client_updated_at``), so a worker flushing late can't overwrite a newer
+value written by another worker or a batch sync. The unique (user_id,
+course_id) index turns such a stale upsert into a duplicate key error,
+which is dropped. Entries that fail for any other reason stay buffered for
+the next flush.
+
+The buffer belongs to one worker process. Reads of a user's progress go
+through overlay(), which adds the entries buffered by the worker serving
+the read. With several workers (app.serve starts one per CPU) the read is
+usually served by another worker, so a user only sees their latest update
+right away when the same worker serves both requests (sticky routing);
+otherwise it shows up after that worker's next flush, at most
+PROGRESS_FLUSH_SECONDS later. Entries still buffered when a worker is
+killed without a shutdown are lost; they are at most one flush interval
+old.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from pymongo.errors import PyMongoError
+
+from app.core.config import settings
+from app.models.progress import DUPLICATE_KEY, ProgressModel
+
+
+class ProgressBuffer:
+    """Latest progress per (user_id, course_id), waiting to be written."""
+
+    def __init__(self, flush_seconds: float, max_entries: int):
+        self.flush_seconds = flush_seconds
+        self.max_entries = max_entries
+        # user_id -> course_id -> entry; the nesting serves overlay()
+        self._pending: dict[str, dict[str, dict]] = {}
+        self._flushing: dict[str, dict[str, dict]] = {}
+        self._size = 0
+        # created on the loop that uses them (see _sync): the app can be
+        # started again in the same process, on a new event loop
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._full: asyncio.Event | None = None
+        self._lock: asyncio.Lock | None = None
+        # writes received, and entries actually written, since startup
+        self.updates = 0
+        self.writes = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, user_id: str, course_id: str, progress: int) -> dict:
+        """Buffer a progress update and return the entry as it will be
+        stored (``created_at`` is when this worker first buffered it)."""
+        if progress < 0 or progress > 100:
+            raise ValueError("progress must be between 0 and 100")
+        now = datetime.now(timezone.utc).isoformat()
+        courses = self._pending.setdefault(user_id, {})
+        previous = courses.get(course_id) or self._flushing.get(user_id, {}).get(
+            course_id
+        )
+        if course_id not in courses:
+            self._size += 1
+        courses[course_id] = {
+            "user_id": user_id,
+            "course_id": course_id,
+            "progress": progress,
+            "is_completed": progress == 100,
+            "created_at": previous["created_at"] if previous else now,
+            "updated_at": now,
+        }
+        self.updates += 1
+        if self._size >= self.max_entries and self._full is not None:
+            self._full.set()
+        return courses[course_id]
+
+    def _sync(self) -> tuple[asyncio.Event, asyncio.Lock]:
+        """The buffer-full event and flush lock of the running loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._full = asyncio.Event()
+            self._lock = asyncio.Lock()
+            if self._size >= self.max_entries:
+                self._full.set()
+        return self._full, self._lock
+
+    def pending(self, user_id: str) -> dict[str, dict]:
+        """Entries still buffered for a user, by course id."""
+        return {**self._flushing.get(user_id, {}), **self._pending.get(user_id, {})}
+
+    def overlay(self, user_id: str, entries: list[dict]) -> list[dict]:
+        """Replace or extend a user's stored progress entries with the ones
+        still buffered for them."""
+        buffered = self.pending(user_id)
+        if not buffered:
+            return entries
+        merged = []
+        for entry in entries:
+            newer = buffered.pop(entry["course_id"], None)
+            if newer is None:
+                merged.append(entry)
+            else:
+                # keep the stored creation time
+                merged.append({**newer, "created_at": entry["created_at"]})
+        merged.extend(buffered.values())
+        return merged
+
+    async def flush(self) -> int:
+        """Write every buffered entry; returns how many were written."""
+        full, lock = self._sync()
+        async with lock:
+            if not self._size:
+                return 0
+            self._flushing, self._pending = self._pending, {}
+            self._size = 0
+            full.clear()
+            entries = [
+                entry
+                for courses in self._flushing.values()
+                for entry in courses.values()
+            ]
+            # if the write fails or is cancelled, every entry stays buffered;
+            # rewriting an entry that did get written is a no-op
+            failed = entries
+            try:
+                failed = await self._write(entries)
+            except PyMongoError as exc:
+                print(f"Progress flush failed, keeping {len(entries)} entries: {exc}")
+            finally:
+                for entry in failed:
+                    self._requeue(entry)
+                self._flushing = {}
+            written = len(entries) - len(failed)
+            self.writes += written
+            return written
+
+    async def _write(self, entries: list[dict]) -> list[dict]:
+        """Upsert the entries; returns the ones to retry."""
+        errors = await ProgressModel.write_latest(
+            [{**entry, "client_updated_at": entry["updated_at"]} for entry in entries]
+        )
+        # a duplicate key means the stored entry is newer: drop ours
+        return [
+            entries[index] for index, code in errors.items() if code != DUPLICATE_KEY
+        ]
+
+    def _requeue(self, entry: dict) -> None:
+        courses = self._pending.setdefault(entry["user_id"], {})
+        if entry["course_id"] not in courses:  # unless a newer one came in
+            courses[entry["course_id"]] = entry
+            self._size += 1
+
+    async def run_flush_loop(self):
+        """Flush every ``flush_seconds``, or when the buffer is full, until
+        cancelled."""
+        full, _ = self._sync()
+        while True:
+            try:
+                await asyncio.wait_for(full.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as exc:  # entries stay buffered for the next try
+                print(f"Progress flush failed: {exc}")
+
+
+progress_buffer = ProgressBuffer(
+    flush_seconds=settings.PROGRESS_FLUSH_SECONDS,
+    max_entries=settings.PROGRESS_FLUSH_MAX_ENTRIES,
+)
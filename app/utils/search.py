@@ -0,0 +1,43 @@
+"""Query builders for course search.
+
+Searches of a few characters are treated as prefixes of a title, which the
+text index cannot answer ("py" does not match the stemmed word "python").
+They are matched case-sensitively against ``title_lower``, a lower-cased
+copy of the title kept by CourseModel, so the anchored regular expression
+becomes a tight range on the (title_lower, _id) index; a case-insensitive
+regular expression would scan the whole index. Everything longer goes
+through the ``$text`` index on title, description and category and is
+ranked by ``textScore``. User input is escaped before it is used in a
+regular expression.
+"""
+
+import re
+
+from app.core.config import settings
+
+TEXT_SCORE = {"$meta": "textScore"}
+
+
+def is_prefix_query(search: str) -> bool:
+    """Whether ``search`` is short enough to be matched as a title prefix."""
+    return len(search) <= settings.SEARCH_PREFIX_MAX_LENGTH and " " not in search
+
+
+def title_key(title: str) -> str:
+    """Value stored in ``title_lower`` for a course title."""
+    return title.lower()
+
+
+def prefix_filter(search: str, field: str = "title_lower") -> dict:
+    """Anchored and escaped prefix match on the lower-cased ``field``."""
+    return {field: {"$regex": f"^{re.escape(title_key(search))}"}}
+
+
+def text_filter(search: str) -> dict:
+    """Full-text match served by the text index."""
+    return {"$text": {"$search": search}}
+
+
+def relevance_sort() -> list:
+    """Best matches first, ``_id`` as tie breaker for stable pages."""
+    return [("score", TEXT_SCORE), ("_id", -1)]
@@ -0,0 +1,41 @@
+"""Shared helpers to read Mongo documents in the shape of response schemas.
+
+Each response schema declares once which fields it needs (mongo_projection)
+so reads only pull those fields over the wire. serialize_document then turns
+the raw document into the response shape in place instead of building a new
+dict per document.
+"""
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+
+def mongo_projection(
+    schema: type[BaseModel], id_field: str = "id", extra: tuple[str, ...] = ()
+) -> dict:
+    """Inclusion projection for the fields of ``schema``.
+
+    ``id_field`` is served from ``_id``; schemas without it exclude ``_id``.
+    ``extra`` lists stored fields needed by the caller but not returned."""
+    projection: dict = {} if id_field in schema.model_fields else {"_id": 0}
+    for name in schema.model_fields:
+        if name != id_field:
+            projection[name] = 1
+    for name in extra:
+        projection[name] = 1
+    return projection
+
+
+def serialize_document(doc: dict | None, id_field: str = "id") -> dict | None:
+    """Convert a Mongo document to a JSON-ready dict, in place.
+
+    ``_id`` is moved to ``id_field`` as a string and any other ObjectId value
+    is converted to its string form."""
+    if doc is None:
+        return None
+    if "_id" in doc:
+        doc[id_field] = str(doc.pop("_id"))
+    for key, value in doc.items():
+        if isinstance(value, ObjectId):
+            doc[key] = str(value)
+    return doc
@@ -0,0 +1,97 @@
+"""Compare FastAPI's default response path with app.utils.responses.
+
+Encodes a page of N courses (PaginatedCourses) the way each mode would and
+prints the time per response. No database or server is involved.
+
+    python -m benchmarks.bench_serialization --courses 1000 --rounds 50
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+# settings are read at import time, the values do not matter here
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.schemas.course import PaginatedCourses  # noqa: E402
+from app.utils import responses  # noqa: E402
+
+
+def make_page(size: int) -> dict:
+    now = datetime.now(timezone.utc).isoformat()
+    return {
+        "total": size * 100,
+        "has_more": True,
+        "next_cursor": "eyJzIjoiY3JlYXRlZF9hdCJ9",
+        "data": [
+            {
+                "id": str(ObjectId()),
+                "title": f"Course {i}",
+                "description": "A reasonably long course description " * 3,
+                "category": "programming",
+                "instructor": f"instructor{i % 50}@example.com",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(size)
+        ],
+    }
+
+
+FIELD = create_model_field("response", PaginatedCourses, mode="serialization")
+
+
+async def fastapi_default(page: dict) -> bytes:
+    content = await serialize_response(field=FIELD, response_content=page)
+    return JSONResponse(content).body
+
+
+async def fast_validated(page: dict) -> bytes:
+    return responses.fast_response(PaginatedCourses, page).body
+
+
+async def fast_trusted(page: dict) -> bytes:
+    return responses.fast_response(PaginatedCourses, page, trusted=True).body
+
+
+async def bench(func, page: dict, rounds: int) -> float:
+    await func(page)  # warm up caches (TypeAdapter)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await func(page)
+    return (time.perf_counter() - started) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    settings.FAST_JSON_RESPONSES = True
+    page = make_page(args.courses)
+    encoder = "orjson" if responses.orjson is not None else "stdlib json"
+    print(f"{args.courses} courses per response, {args.rounds} rounds ({encoder})")
+    baseline = None
+    for name, func in [
+        ("fastapi default", fastapi_default),
+        ("fast, validated", fast_validated),
+        ("fast, trusted", fast_trusted),
+    ]:
+        seconds = asyncio.run(bench(func, page, args.rounds))
+        baseline = baseline or seconds
+        print(f"{name:<16} {seconds * 1000:8.2f} ms  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
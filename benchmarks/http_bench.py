@@ -0,0 +1,393 @@
+"""HTTP benchmark of the core API flows against a seeded local mongod.
+
+Seeds a scratch database (BENCH_DB_NAME, default mindforge_bench, dropped
+first) with N users and courses, starts the app in-process (lifespan
+included) and drives it through httpx.AsyncClient over ASGITransport, so
+the numbers cover the app and the database but not uvicorn or the network.
+Each scenario reports throughput and p50/p95/p99 latency. Results can be
+written as JSON and compared with a stored baseline:
+
+    python -m benchmarks.http_bench --users 2000 --courses 2000 \\
+        --requests 500 --concurrency 20 --output bench.json
+    python -m benchmarks.http_bench --baseline bench.json --threshold 0.15
+
+With --baseline the command exits 1 when a scenario's p95 is more than
+``threshold`` slower, or its throughput that much lower, than the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import count
+
+from bson import ObjectId
+
+# the benchmark never touches the configured database
+os.environ["DB_NAME"] = os.environ.get("BENCH_DB_NAME", "mindforge_bench")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["ADMIN_EMAIL"] = "bench-admin@example.com"
+os.environ["ADMIN_PASSWORD"] = "Bench-admin-1"
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.init_indexes import reconcile_indexes  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.auth import create_access_token, token_claims  # noqa: E402
+from app.utils.hashing import password_hasher  # noqa: E402
+from app.utils.pagination import encode_cursor  # noqa: E402
+
+P = "/api/v1"
+PASSWORD = "Bench-user-1"
+PAGE_SIZE = 20
+ENROLLED_COURSES = 5
+
+
+@dataclass
+class Context:
+    """Seeded ids and tokens shared by the scenarios."""
+
+    user_ids: list[str]
+    course_ids: list[str]
+    tokens: list[str]
+    admin_token: str
+    deep_page: int
+    deep_cursor: str
+
+
+async def seed(users: int, courses: int, clients: int) -> Context:
+    """Recreate the scratch database with sample users, courses and the
+    enrollments used by the progress scenario."""
+    await db.client.drop_database(settings.DB_NAME)
+    await reconcile_indexes(db)
+    now = datetime.now(timezone.utc)
+    password = await password_hasher.hash(PASSWORD)
+    user_docs = [
+        {
+            "_id": ObjectId(),
+            "email": f"bench{i}@example.com",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "date_of_birth": "1990-01-01",
+            "phone_number": "1234567890",
+            "address": f"{i} Bench Street",
+            "gender": "other",
+            "role": "student",
+            "password": password,
+            "created_at": (now - timedelta(seconds=i)).isoformat(),
+            "updated_at": (now - timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(users)
+    ]
+    # timestamps are stored as ISO strings, like the API does
+    topics = ["python", "design", "finance", "music", "cooking"]
+    course_docs = [
+        {
+            "_id": ObjectId(),
+            "title": f"{topics[i % len(topics)].title()} basics {i}",
+            "title_lower": f"{topics[i % len(topics)]} basics {i}",
+            "description": f"learn {topics[i % len(topics)]} step by step",
+            "category": topics[i % len(topics)],
+            "instructor": f"instructor{i % 50}@example.com",
+            "created_at": (now - timedelta(seconds=i)).isoformat(),
+            "updated_at": (now - timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(courses)
+    ]
+    await db["users"].insert_many(user_docs)
+    await db["courses"].insert_many(course_docs)
+    # the first ``clients`` users are enrolled in the first courses
+    await db["enrollments"].insert_many(
+        [
+            {
+                "user_id": str(user["_id"]),
+                "course_id": str(course["_id"]),
+                "enrolled_at": now.isoformat(),
+            }
+            for user in user_docs[:clients]
+            for course in course_docs[:ENROLLED_COURSES]
+        ]
+    )
+    deep_page = max(courses // PAGE_SIZE // 2, 1)
+    # the course listing sorts by created_at desc; the cursor resumes after
+    # the last course of the page before the deep one
+    last = course_docs[(deep_page - 1) * PAGE_SIZE - 1] if deep_page > 1 else None
+    deep_cursor = (
+        encode_cursor("created_at", -1, last["created_at"], str(last["_id"]))
+        if last
+        else ""
+    )
+    return Context(
+        user_ids=[str(user["_id"]) for user in user_docs],
+        course_ids=[str(course["_id"]) for course in course_docs],
+        tokens=[
+            create_access_token(token_claims(user)) for user in user_docs[:clients]
+        ],
+        admin_token="",
+        deep_page=deep_page,
+        deep_cursor=deep_cursor,
+    )
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def scenarios(ctx: Context) -> dict:
+    """Scenario name -> function(client, n) sending the n-th request."""
+    enroll_pairs = count()
+
+    def token(n):
+        return ctx.tokens[n % len(ctx.tokens)]
+
+    def course(n):
+        return ctx.course_ids[n % len(ctx.course_ids)]
+
+    async def login(client, n):
+        return await client.post(
+            P + "/auth/auth/login",
+            data={
+                "username": f"bench{n % len(ctx.tokens)}@example.com",
+                "password": PASSWORD,
+            },
+        )
+
+    async def list_courses(client, n):
+        return await client.get(
+            P + "/courses/courses/",
+            params={"limit": PAGE_SIZE},
+            headers=_auth(token(n)),
+        )
+
+    async def list_courses_search(client, n):
+        return await client.get(
+            P + "/courses/courses/",
+            params={"limit": PAGE_SIZE, "search": "python basics"},
+            headers=_auth(token(n)),
+        )
+
+    async def list_courses_prefix(client, n):
+        return await client.get(
+            P + "/courses/courses/",
+            params={"limit": PAGE_SIZE, "search": "py"},
+            headers=_auth(token(n)),
+        )
+
+    async def list_courses_deep_page(client, n):
+        return await client.get(
+            P + "/courses/courses/",
+            params={"limit": PAGE_SIZE, "page": ctx.deep_page},
+            headers=_auth(token(n)),
+        )
+
+    async def list_courses_deep_cursor(client, n):
+        params = {"limit": PAGE_SIZE, "total_mode": "none"}
+        if ctx.deep_cursor:
+            params["cursor"] = ctx.deep_cursor
+        return await client.get(
+            P + "/courses/courses/", params=params, headers=_auth(token(n))
+        )
+
+    async def get_course(client, n):
+        return await client.get(
+            P + "/courses/courses/" + course(n * 7919), headers=_auth(token(n))
+        )
+
+    async def enroll(client, n):
+        # every request enrolls a new (user, course) pair
+        pair = next(enroll_pairs)
+        user = pair % len(ctx.tokens)
+        course_id = ctx.course_ids[
+            (ENROLLED_COURSES + pair // len(ctx.tokens)) % len(ctx.course_ids)
+        ]
+        return await client.post(
+            P + "/enrollments/enrollments/" + course_id, headers=_auth(ctx.tokens[user])
+        )
+
+    async def progress_update(client, n):
+        return await client.post(
+            P + "/progress/progress/" + ctx.course_ids[n % ENROLLED_COURSES],
+            json={"progress": n % 101},
+            headers=_auth(token(n)),
+        )
+
+    async def my_courses(client, n):
+        return await client.get(
+            P + "/enrollments/enrollments/me",
+            params={"limit": PAGE_SIZE},
+            headers=_auth(token(n)),
+        )
+
+    async def list_users(client, n):
+        return await client.get(
+            P + "/users/users/",
+            params={"limit": PAGE_SIZE, "role": "student"},
+            headers=_auth(ctx.admin_token),
+        )
+
+    return {
+        "login": login,
+        "list_courses": list_courses,
+        "list_courses_search": list_courses_search,
+        "list_courses_prefix": list_courses_prefix,
+        "list_courses_deep_page": list_courses_deep_page,
+        "list_courses_deep_cursor": list_courses_deep_cursor,
+        "get_course": get_course,
+        "enroll": enroll,
+        "progress_update": progress_update,
+        "my_courses": my_courses,
+        "list_users": list_users,
+    }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(
+        len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1)
+    )
+    return sorted_values[index]
+
+
+async def run_scenario(client, send, requests: int, concurrency: int, warmup: int):
+    """Send ``requests`` requests from ``concurrency`` concurrent clients."""
+    for n in range(warmup):
+        await send(client, n)
+    # request numbers shared by the workers
+    sequence = iter(range(warmup, warmup + requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for n in sequence:
+            started = time.perf_counter()
+            response = await send(client, n)
+            elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    result = {"requests": requests, "errors": errors, "rps": round(requests / wall, 1)}
+    if latencies:
+        result.update(
+            p50_ms=round(percentile(latencies, 0.50) * 1000, 2),
+            p95_ms=round(percentile(latencies, 0.95) * 1000, 2),
+            p99_ms=round(percentile(latencies, 0.99) * 1000, 2),
+        )
+    return result
+
+
+async def run(args) -> dict:
+    ctx = await seed(args.users, args.courses, args.concurrency)
+    selected = args.scenarios or list(scenarios(ctx))
+    results = {}
+    async with app.router.lifespan_context(app):
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                admin = await db["users"].find_one({"email": settings.ADMIN_EMAIL})
+                ctx.admin_token = create_access_token(token_claims(admin))
+                table = scenarios(ctx)
+                for name in selected:
+                    results[name] = await run_scenario(
+                        client,
+                        table[name],
+                        args.requests,
+                        args.concurrency,
+                        args.warmup,
+                    )
+                    print(format_row(name, results[name]))
+        finally:
+            # before the lifespan shutdown closes the client
+            await db.client.drop_database(settings.DB_NAME)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "users": args.users,
+            "courses": args.courses,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": results,
+    }
+
+
+def format_row(name: str, result: dict) -> str:
+    if "p50_ms" not in result:
+        return f"{name:<26} all {result['errors']} requests failed"
+    return (
+        f"{name:<26} {result['rps']:>8} req/s  p50 {result['p50_ms']:>7} ms  "
+        f"p95 {result['p95_ms']:>7} ms  p99 {result['p99_ms']:>7} ms  "
+        f"errors {result['errors']}"
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Scenarios whose p95 or throughput regressed past ``threshold``."""
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline["scenarios"].get(name)
+        if not base or "p95_ms" not in base:
+            continue
+        if "p95_ms" not in result:
+            regressions.append(f"{name}: every request failed")
+            continue
+        if result["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']} ms vs {base['p95_ms']} ms baseline"
+            )
+        if result["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['rps']} req/s vs {base['rps']} req/s baseline"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--courses", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="*", help="default: all")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+    if args.users < args.concurrency:
+        parser.error("--users must be at least --concurrency")
+
+    print(
+        f"{args.users} users, {args.courses} courses, {args.requests} requests "
+        f"per scenario, {args.concurrency} concurrent (db {settings.DB_NAME})"
+    )
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
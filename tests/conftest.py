@@ -0,0 +1,57 @@
+"""Shared test setup.
+
+The suite runs against its own database (TEST_DB_NAME, default
+mindforge_test) so it never writes to the one in .env. Tests that need a
+mongod use the ``live_client`` fixture, which skips when none answers at
+MONGO_URL and drops the test database afterwards. Unit tests swap in the
+fake collections of tests/fakes.py instead.
+"""
+
+import os
+
+import pytest
+
+os.environ["DB_NAME"] = os.environ.get("TEST_DB_NAME", "mindforge_test")
+
+
+@pytest.fixture
+def live_client(monkeypatch):
+    """TestClient reporting Mongo round trips in X-DB-* response headers."""
+    from fastapi.testclient import TestClient
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    from app.core.config import settings
+    from app.main import app
+
+    probe = MongoClient(settings.MONGO_URL, serverSelectionTimeoutMS=500)
+    try:
+        probe.admin.command("ping")
+    except PyMongoError:
+        probe.close()
+        pytest.skip("no mongod reachable at MONGO_URL")
+    monkeypatch.setattr(settings, "DB_COMMAND_STATS", True)
+    try:
+        with TestClient(app) as client:
+            client.mongo = probe[settings.DB_NAME]
+            yield client
+    finally:
+        probe.drop_database(settings.DB_NAME)
+        probe.close()
+
+
+@pytest.fixture
+def round_trips():
+    """``round_trips(response, budget)`` fails when the request took more
+    Mongo round trips than ``budget``."""
+
+    def check(response, budget: int) -> int:
+        used = int(response.headers["X-DB-Round-Trips"])
+        request = response.request
+        assert used <= budget, (
+            f"{request.method} {request.url.path} made {used} Mongo round trips, "
+            f"budget is {budget}"
+        )
+        return used
+
+    return check
@@ -0,0 +1,165 @@
+"""Fake Motor collections shared by the unit tests.
+
+Models read their collection from a class attribute, so tests swap one of
+these in with ``monkeypatch.setattr(Model, "collection", fake)``.
+"""
+
+from pymongo.errors import BulkWriteError
+
+
+class PageCollection:
+    """Answers reads with ``docs`` and counts with ``total``, recording
+    every call in ``calls``. find() and aggregate() return the collection
+    itself as the cursor."""
+
+    def __init__(self, docs=(), total=0, name="courses"):
+        self.name = name
+        self.docs = list(docs)
+        self.total = total
+        self.calls = []
+        self.batches = []
+
+    def recorded(self, kind: str) -> list:
+        """Arguments of the recorded calls of one kind, e.g. "aggregate"."""
+        return [argument for call, argument in self.calls if call == kind]
+
+    def find(self, query=None, projection=None):
+        self.calls.append(("find", query))
+        return self
+
+    def aggregate(self, pipeline):
+        self.calls.append(("aggregate", pipeline))
+        return self
+
+    def sort(self, sort):
+        self.calls.append(("sort", list(sort)))
+        return self
+
+    def skip(self, skip):
+        self.calls.append(("skip", skip))
+        return self
+
+    def limit(self, limit):
+        self.calls.append(("limit", limit))
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield doc
+
+    async def count_documents(self, query):
+        self.calls.append(("count", query))
+        return self.total
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(operations)
+
+
+class FacetCollection(PageCollection):
+    """Answers aggregations with a single ``$facet`` result holding
+    ``docs`` and their ``total``."""
+
+    async def to_list(self, length=None):
+        return [{"data": self.docs, "total": [{"n": self.total}]}]
+
+
+class StatsCollection:
+    """course_stats stand-in recording the ``$inc`` of each update as
+    (course id, increments)."""
+
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update, upsert=False):
+        self.updates.append((query["_id"], update["$inc"]))
+
+    async def bulk_write(self, operations, ordered=True):
+        self.updates += [(op._filter["_id"], op._doc["$inc"]) for op in operations]
+
+
+class BulkCollection:
+    """progress stand-in: find() yields ``stored`` and each unordered
+    bulk_write is recorded, then fails with ``error`` or with the write
+    errors of the next of ``rejections`` (position -> error code).
+    create_indexes raises ``index_error`` if set."""
+
+    def __init__(self, *rejections: dict[int, int], stored=(), error=None):
+        self.rejections = list(rejections)
+        self.stored = list(stored)
+        self.error = error
+        self.index_error = None
+        self.batches = []
+        self.indexes = []
+
+    async def create_indexes(self, indexes):
+        if self.index_error is not None:
+            raise self.index_error
+        self.indexes += [index.document["name"] for index in indexes]
+
+    def find(self, query, projection=None):
+        return self._stored()
+
+    async def _stored(self):
+        for entry in self.stored:
+            yield entry
+
+    async def bulk_write(self, operations, ordered=True):
+        assert ordered is False
+        self.batches.append(operations)
+        if self.error is not None:
+            raise self.error
+        errors = self.rejections.pop(0) if self.rejections else {}
+        if errors:
+            raise BulkWriteError(
+                {
+                    "writeErrors": [
+                        {"index": index, "code": code} for index, code in errors.items()
+                    ]
+                }
+            )
+
+
+class DocumentCollection:
+    """Documents kept in memory and matched by equality filters; the
+    filters of the writes are recorded in ``writes``."""
+
+    def __init__(self, *docs, name="courses"):
+        self.name = name
+        self.docs = [dict(doc) for doc in docs]
+        self.writes = []
+
+    def _match(self, query):
+        return next(
+            (
+                doc
+                for doc in self.docs
+                if all(doc.get(key) == value for key, value in query.items())
+            ),
+            None,
+        )
+
+    async def find_one(self, query, projection=None):
+        return self._match(query)
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        self.writes.append(query)
+        doc = self._match(query)
+        if doc is None:
+            return None
+        doc.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            doc[key] = doc.get(key, 0) + amount
+        return dict(doc)
+
+    async def find_one_and_delete(self, query, projection=None):
+        self.writes.append(query)
+        doc = self._match(query)
+        if doc is not None:
+            self.docs.remove(doc)
+        return doc
@@ -0,0 +1,46 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.dependencies.auth import get_current_principal
+from app.dependencies.roles import require_role
+from app.models.token_revocation import TokenRevocationModel
+from app.utils.auth import create_access_token, token_claims
+
+USER = {"_id": "64b000000000000000000001", "email": "jane@example.com"}
+
+
+def make_token(role="student", version=0):
+    return create_access_token(
+        token_claims({**USER, "role": role, "token_version": version})
+    )
+
+
+def test_principal_is_read_from_token_claims():
+    principal = asyncio.run(get_current_principal(make_token()))
+
+    assert principal == {"_id": USER["_id"], "email": USER["email"], "role": "student"}
+
+
+def test_revoked_token_version_is_rejected(monkeypatch):
+    monkeypatch.setattr(TokenRevocationModel, "_min_versions", {})
+    now = datetime.now(timezone.utc)
+    TokenRevocationModel._remember(USER["_id"], 1, now)
+    # a recent revocation survives pruning
+    TokenRevocationModel._prune(now)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(get_current_principal(make_token(version=0)))
+    assert exc_info.value.status_code == 401
+    assert asyncio.run(get_current_principal(make_token(version=1)))
+
+
+def test_require_role_accepts_a_list_of_roles():
+    checker = require_role(["instructor", "admin"])
+
+    assert asyncio.run(checker({"role": "admin"})) == {"role": "admin"}
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(checker({"role": "student"}))
+    assert exc_info.value.status_code == 403
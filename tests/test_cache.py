@@ -0,0 +1,97 @@
+import asyncio
+
+from app.core.cache import PrincipalCache, ReadThroughCache, TTLCache
+
+
+def test_ttl_cache_hit_miss_and_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl=10)
+
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_principal_cache_invalidate_by_user_id():
+    cache = PrincipalCache(maxsize=10, ttl=60)
+    cache.set("jane@example.com", {"_id": "abc", "email": "jane@example.com"})
+
+    cache.invalidate_user("abc")
+
+    assert cache.get("jane@example.com") is None
+
+
+def test_read_through_cache_coalesces_concurrent_misses():
+    cache = ReadThroughCache(maxsize=10, ttl=60, sizeof=len)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"title": "Python"}
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_load("c1", loader) for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+
+    assert len(loads) == 1
+    assert results == [{"title": "Python"}] * 5
+    assert cache.stats()["coalesced"] == 4
+    assert cache.stats()["memory_bytes"] == 1
+
+
+def test_read_through_cache_drops_value_invalidated_during_load():
+    cache = ReadThroughCache(maxsize=10, ttl=60)
+
+    async def loader():
+        await asyncio.sleep(0)
+        cache.invalidate("c1")  # a concurrent write
+        return {"title": "stale"}
+
+    asyncio.run(cache.get_or_load("c1", loader))
+
+    assert len(cache) == 0
+
+
+def test_read_through_cache_caches_after_a_failed_invalidated_load():
+    cache = ReadThroughCache(maxsize=10, ttl=60)
+
+    async def failing_loader():
+        cache.invalidate("c1")  # a concurrent write
+        raise RuntimeError("database down")
+
+    async def loader():
+        return {"title": "fresh"}
+
+    async def run():
+        try:
+            await cache.get_or_load("c1", failing_loader)
+        except RuntimeError:
+            pass
+        await cache.get_or_load("c1", loader)
+
+    asyncio.run(run())
+
+    assert cache.get("c1") == {"title": "fresh"}
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.utils.counting import cached_count, invalidate_counts, normalize_filter
+from tests.fakes import PageCollection
+
+
+def test_normalize_filter_ignores_key_order():
+    assert normalize_filter({"a": 1, "b": 2}) == normalize_filter({"b": 2, "a": 1})
+
+
+def test_cached_count_until_invalidated():
+    collection = PageCollection(total=42, name="test_counting")
+
+    async def run():
+        await cached_count(collection, {"role": "student"})
+        await cached_count(collection, {"role": "student"})
+        invalidate_counts(collection.name)
+        return await cached_count(collection, {"role": "student"})
+
+    assert asyncio.run(run()) == 42
+    assert len(collection.recorded("count")) == 2
@@ -0,0 +1,74 @@
+import asyncio
+
+from app.models.course_stats import CourseStatsModel, progress_change, summarize
+from app.rebuild_course_stats import rebuild_course_stats
+from tests.fakes import PageCollection
+
+
+def test_progress_change_deltas():
+    assert progress_change(None, 0) == {"histogram.0": 1}
+    assert progress_change(None, 45) == {
+        "started": 1,
+        "progress_sum": 45,
+        "histogram.40": 1,
+    }
+    assert progress_change(45, 48) == {"progress_sum": 3}
+    assert progress_change(95, 100) == {
+        "completed": 1,
+        "progress_sum": 5,
+        "histogram.90": -1,
+        "histogram.100": 1,
+    }
+    assert progress_change(100, 100) == {}
+
+
+def test_summary_of_a_course_without_activity():
+    summary = summarize("c1", {})
+    assert summary["enrolled"] == 0
+    assert summary["average_progress"] == 0.0
+    assert sum(summary["histogram"].values()) == 0
+
+
+def test_summary_rates():
+    summary = summarize(
+        "c1",
+        {"enrolled": 4, "started": 2, "completed": 1, "progress_sum": 150},
+    )
+    assert summary["average_progress"] == 37.5
+    assert summary["completion_rate"] == 0.25
+
+
+def test_rebuild_reports_and_fixes_drift():
+    database = {
+        "enrollments": PageCollection([{"_id": "c1", "enrolled": 2}]),
+        "progress": PageCollection(
+            [
+                {
+                    "_id": {"course_id": "c1", "bucket": 40.0, "started": True},
+                    "entries": 1,
+                    "progress_sum": 45,
+                },
+                {
+                    "_id": {"course_id": "c1", "bucket": 100.0, "started": True},
+                    "entries": 1,
+                    "progress_sum": 100,
+                },
+            ]
+        ),
+        CourseStatsModel.collection.name: PageCollection(
+            [{"_id": "c1", "enrolled": 2, "started": 2, "completed": 0}]
+        ),
+    }
+
+    drift = asyncio.run(rebuild_course_stats(database, dry_run=True))
+    assert drift["c1"] == [
+        "completed 0 != 1",
+        "progress_sum 0 != 145",
+        "histogram.40 0 != 1",
+        "histogram.100 0 != 1",
+    ]
+
+    asyncio.run(rebuild_course_stats(database))
+    ((operation,),) = database[CourseStatsModel.collection.name].batches
+    rebuilt = operation._doc
+    assert rebuilt["completed"] == 1 and rebuilt["progress_sum"] == 145
@@ -0,0 +1,54 @@
+import asyncio
+
+from app.models.course import CourseModel, dashboard_cache
+from app.utils.pagination import next_cursor
+from tests.fakes import PageCollection
+
+
+def test_dashboard_page_with_stats_is_cached(monkeypatch):
+    courses = [
+        {
+            "course_id": f"c{i}",
+            "title": f"Course {i}",
+            "created_at": f"2024-05-0{9 - i}T00:00:00+00:00",
+            "stats": (
+                [{"enrolled": 4, "completed": 1, "progress_sum": 200}] if i else []
+            ),
+        }
+        for i in range(3)
+    ]
+    collection = PageCollection(courses, total=7)
+    monkeypatch.setattr(CourseModel, "collection", collection)
+    dashboard_cache.clear()
+
+    async def run():
+        first = await CourseModel.get_instructor_dashboard("i@example.com", limit=2)
+        second = await CourseModel.get_instructor_dashboard("i@example.com", limit=2)
+        return first, second
+
+    page, cached = asyncio.run(run())
+    assert cached == page
+    (pipeline,) = collection.recorded("aggregate")
+    assert pipeline[0] == {"$match": {"instructor": "i@example.com"}}
+    assert collection.recorded("count") == [{"instructor": "i@example.com"}]
+    assert page["total"] == 7 and page["has_more"] is True
+    assert page["next_cursor"]
+    assert [course["id"] for course in page["data"]] == ["c0", "c1"]
+    assert page["data"][0]["enrolled"] == 0
+    assert page["data"][1]["average_progress"] == 50.0
+    assert page["data"][1]["completion_rate"] == 0.25
+
+
+def test_dashboard_cursor_is_matched_before_the_sort(monkeypatch):
+    collection = PageCollection([], total=0)
+    monkeypatch.setattr(CourseModel, "collection", collection)
+    dashboard_cache.clear()
+    first = {"id": "64b000000000000000000001", "created_at": "2024-05-01T00:00:00"}
+    cursor = next_cursor([first], 1, "created_at", -1)
+
+    asyncio.run(CourseModel.get_instructor_dashboard("i@example.com", cursor=cursor))
+
+    match, sort, limit = collection.recorded("aggregate")[0][:3]
+    assert match["$match"]["$and"][0] == {"instructor": "i@example.com"}
+    assert sort == {"$sort": {"created_at": -1, "_id": -1}}
+    assert limit == {"$limit": 21}
@@ -0,0 +1,20 @@
+from app.core import database
+from app.core.config import settings
+
+
+def test_bound_collections_follow_the_client_across_restarts():
+    collection = database.db["courses"]
+    try:
+        first = database.connect()
+        assert collection.full_name == f"{settings.DB_NAME}.courses"
+        assert collection.database.client is first
+
+        # shutdown, then a second startup
+        database.close()
+        second = database.connect()
+
+        assert second is not first
+        assert collection.database.client is second
+        assert database.db.client is second
+    finally:
+        database.close()
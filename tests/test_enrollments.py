@@ -0,0 +1,74 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.enrollment import EnrollmentModel
+from app.routers.enrollment import get_my_courses
+from app.utils.pagination import next_cursor
+from app.utils.progress_buffer import progress_buffer
+from tests.fakes import FacetCollection
+
+
+def test_my_courses_page_joins_course_and_progress(monkeypatch):
+    enrollments = [
+        {
+            "_id": ObjectId(),
+            "course_id": "c1",
+            "enrolled_at": "2024-05-01T00:00:00+00:00",
+            "last_activity": "2024-05-03T00:00:00+00:00",
+            "course": [{"title": "Python", "category": "programming"}],
+            "progress": {"progress": 40, "is_completed": False},
+        },
+        {
+            "_id": ObjectId(),
+            "course_id": "c2",
+            "enrolled_at": "2024-05-02T00:00:00+00:00",
+            "last_activity": "2024-05-02T00:00:00+00:00",
+            "course": [],
+        },
+    ]
+    collection = FacetCollection(enrollments, total=2)
+    monkeypatch.setattr(EnrollmentModel, "collection", collection)
+
+    page = asyncio.run(EnrollmentModel.get_user_courses("u1", limit=5))
+
+    assert collection.recorded("aggregate")[0][0] == {"$match": {"user_id": "u1"}}
+    assert page["total"] == 2 and page["has_more"] is False
+    assert page["next_cursor"] is None
+    python, deleted = page["data"]
+    assert python["title"] == "Python" and python["progress"] == 40
+    assert python["last_activity"] == "2024-05-03T00:00:00+00:00"
+    assert deleted["title"] is None and deleted["progress"] == 0
+
+
+def test_buffered_progress_keeps_the_stored_order(monkeypatch):
+    enrollments = [
+        {
+            "_id": ObjectId(),
+            "course_id": f"c{i}",
+            "enrolled_at": "2024-05-01T00:00:00+00:00",
+            "last_activity": f"2024-05-0{3 - i}T00:00:00+00:00",
+            "course": [{"title": f"Course {i}"}],
+        }
+        for i in range(3)
+    ]
+    monkeypatch.setattr(
+        EnrollmentModel, "collection", FacetCollection(enrollments, total=3)
+    )
+    monkeypatch.setattr(settings, "PROGRESS_WRITE_BEHIND", True)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+    buffered = {
+        "progress": 80,
+        "is_completed": False,
+        "updated_at": "2024-05-09T00:00:00+00:00",
+    }
+    monkeypatch.setattr(progress_buffer, "pending", lambda user_id: {"c1": buffered})
+
+    page = asyncio.run(get_my_courses({"_id": "u1"}, skip=0, cursor=None, limit=2))
+
+    assert [course["course_id"] for course in page["data"]] == ["c0", "c1"]
+    assert page["data"][1]["progress"] == 80
+    # the stored sort key, which the next cursor continues from
+    assert page["data"][1]["last_activity"] == "2024-05-02T00:00:00+00:00"
+    assert page["next_cursor"] == next_cursor(page["data"], 2, "last_activity", -1)
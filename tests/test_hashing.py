@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.hashing import PasswordHasher
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=1, max_concurrency=1)
+
+    async def run():
+        hashed = await hasher.hash("s3cret-pass")
+        return (
+            await hasher.verify("s3cret-pass", hashed),
+            await hasher.verify("wrong-pass", hashed),
+        )
+
+    try:
+        assert asyncio.run(run()) == (True, False)
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["calls"] == 3
+
+
+def test_queue_timeout_returns_503():
+    hasher = PasswordHasher(workers=1, max_concurrency=1, queue_timeout=0.01)
+
+    async def run():
+        first = asyncio.create_task(hasher.hash("s3cret-pass"))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.hash("other-pass")
+        await first
+        return exc_info.value
+
+    try:
+        error = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert error.status_code == 503
+    assert hasher.stats()["rejected"] == 1
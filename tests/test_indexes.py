@@ -0,0 +1,69 @@
+import asyncio
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.init_indexes import (
+    failed_indexes,
+    index_drift,
+    index_registry,
+    reconcile_indexes,
+)
+
+
+class IndexCollection:
+    """No indexes yet; building one of ``broken`` fails like a unique index
+    over duplicates."""
+
+    def __init__(self, broken=()):
+        self.broken = broken
+        self.built = []
+
+    async def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}}
+
+    async def create_indexes(self, indexes):
+        (index,) = indexes
+        name = index.document["name"]
+        if name in self.broken:
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+        self.built.append(name)
+
+
+def test_registry_covers_enrollment_and_progress_lookups():
+    registry = index_registry()
+    for name in ("enrollments", "progress"):
+        names = [index.document["name"] for index in registry[name]]
+        assert "user_id_1_course_id_1" in names
+
+
+def test_index_drift_reports_missing_changed_and_extra():
+    declared = [
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ]
+    existing = {
+        "_id_": {"key": [("_id", 1)]},
+        "email_1": {"key": [("email", 1)]},
+        "expires_at_1": {"key": [("expires_at", 1)], "expireAfterSeconds": 0},
+        "address_text": {"key": [("_fts", "text"), ("_ftsx", 1)]},
+    }
+    drift = index_drift(declared, existing)
+    assert [index.document["name"] for index in drift["missing"]] == ["role_1"]
+    assert drift["changed"] == ["email_1"]
+    assert drift["extra"] == ["address_text"]
+
+
+def test_failed_index_does_not_stop_the_others():
+    registry = index_registry()
+    database = {name: IndexCollection() for name in registry}
+    database["enrollments"].broken = ("user_id_1_course_id_1",)
+
+    report = asyncio.run(reconcile_indexes(database))
+
+    assert failed_indexes(report) == ["enrollments.user_id_1_course_id_1"]
+    assert "E11000" in report["enrollments"]["failed"]["user_id_1_course_id_1"]
+    # the rest of enrollments, and the collections after it, are built
+    assert len(database["enrollments"].built) == len(registry["enrollments"]) - 1
+    assert "user_id_1_course_id_1" in database["progress"].built
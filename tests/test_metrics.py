@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+from app.core.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    mongo_command_documents,
+    mongo_pool_checked_out,
+    mongo_pool_checkout_wait,
+)
+from app.core.monitoring import CommandMetrics, PoolMetrics, server_timing
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+    )
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, "/courses")
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/courses",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/courses",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/courses",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/courses"} 3' in text
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("requests_total", "Requests.", ("route",))
+    counter.inc('/a"b')
+    assert counter.samples() == ['requests_total{route="/a\\"b"} 1']
+
+
+def test_command_metrics_label_by_collection_and_count_documents():
+    listener = CommandMetrics()
+    event = dict(connection_id=("localhost", 27017), request_id=7)
+    listener.started(
+        SimpleNamespace(command_name="find", command={"find": "audit_only"}, **event)
+    )
+    listener.succeeded(
+        SimpleNamespace(
+            command_name="find",
+            reply={"cursor": {"firstBatch": [{}, {}, {}]}},
+            duration_micros=2000,
+            **event,
+        )
+    )
+    assert mongo_command_documents.value("audit_only", "find") == 3
+
+
+def test_server_timing_header_value():
+    assert server_timing({"auth": 0.0012, "db": 0.0034}) == "auth;dur=1.20, db;dur=3.40"
+
+
+def test_pool_metrics_record_checkout_wait():
+    listener = PoolMetrics()
+    before = mongo_pool_checked_out.value()
+    listener.connection_checked_out(SimpleNamespace(duration=0.002))
+    assert mongo_pool_checked_out.value() == before + 1
+    listener.connection_checked_in(SimpleNamespace())
+    assert mongo_pool_checked_out.value() == before
+    assert (
+        "mongodb_pool_checkout_wait_seconds_count"
+        in mongo_pool_checkout_wait.samples()[-1]
+    )
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.models.course import CourseModel
+from app.models.user import UserModel
+from tests.fakes import DocumentCollection
+
+COURSE_ID = ObjectId()
+COURSE = {
+    "_id": COURSE_ID,
+    "title": "Python",
+    "description": "basics",
+    "instructor": "owner@example.com",
+}
+
+
+@pytest.fixture
+def courses(monkeypatch):
+    collection = DocumentCollection(COURSE)
+    monkeypatch.setattr(CourseModel, "collection", collection)
+    return collection
+
+
+def test_owner_is_part_of_the_write_filter(courses):
+    updated = asyncio.run(
+        CourseModel.update_course(
+            str(COURSE_ID), {"title": "Python 2"}, owner="owner@example.com"
+        )
+    )
+
+    assert courses.writes == [{"_id": COURSE_ID, "instructor": "owner@example.com"}]
+    assert updated["title"] == "Python 2"
+
+
+def test_foreign_course_raises_permission_error(courses):
+    with pytest.raises(PermissionError):
+        asyncio.run(
+            CourseModel.update_course(
+                str(COURSE_ID), {"title": "Mine"}, owner="other@example.com"
+            )
+        )
+    with pytest.raises(PermissionError):
+        asyncio.run(
+            CourseModel.delete_course(str(COURSE_ID), owner="other@example.com")
+        )
+    assert courses.docs[0]["title"] == "Python"
+
+
+def test_missing_course_returns_none(courses):
+    missing = str(ObjectId())
+
+    assert (
+        asyncio.run(
+            CourseModel.update_course(
+                missing, {"title": "x"}, owner="owner@example.com"
+            )
+        )
+        is None
+    )
+    assert (
+        asyncio.run(CourseModel.delete_course(missing, owner="owner@example.com"))
+        is None
+    )
+
+
+def test_admin_delete_is_not_filtered_by_owner(courses):
+    deleted = asyncio.run(CourseModel.delete_course(str(COURSE_ID)))
+
+    assert courses.writes == [{"_id": COURSE_ID}]
+    assert deleted == {"detail": "Course deleted successfully"}
+
+
+def test_profile_update_returns_the_post_image(monkeypatch):
+    user_id = ObjectId()
+    users = DocumentCollection(
+        {"_id": user_id, "email": "jane@example.com", "first_name": "Jane"},
+        name="users",
+    )
+    monkeypatch.setattr(UserModel, "collection", users)
+
+    # unchanged values still find the user
+    user = asyncio.run(UserModel.update_user(str(user_id), {"first_name": "Jane"}))
+    assert user["first_name"] == "Jane"
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(UserModel.update_user(str(ObjectId()), {"first_name": "Jo"}))
+    assert exc_info.value.status_code == 404
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.utils.pagination import (
+    apply_cursor,
+    cursor_filter,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+from tests.fakes import PageCollection
+
+LAST_ID = ObjectId("64b000000000000000000001")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("created_at", -1, "2024-01-01T00:00:00", LAST_ID)
+
+    assert decode_cursor(cursor, "created_at", -1) == ("2024-01-01T00:00:00", LAST_ID)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not-a-cursor", encode_cursor("title", 1, "a", LAST_ID)]
+)
+def test_invalid_or_foreign_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, "created_at", -1)
+    assert exc_info.value.status_code == 400
+
+
+def test_apply_cursor_descending_keeps_base_query():
+    cursor = encode_cursor("created_at", -1, "2024-01-01", LAST_ID)
+
+    query = apply_cursor({"category": "python"}, cursor, "created_at", -1)
+
+    assert query == {
+        "$and": [
+            {"category": "python"},
+            {
+                "$or": [
+                    {"created_at": {"$lt": "2024-01-01"}},
+                    {"created_at": "2024-01-01", "_id": {"$lt": LAST_ID}},
+                    {"created_at": None},
+                ]
+            },
+        ]
+    }
+
+
+def test_exact_cursor_page_bounds_the_find_and_counts_separately():
+    cursor = encode_cursor("created_at", -1, "2024-01-01", LAST_ID)
+    after = cursor_filter(cursor, "created_at", -1)
+    collection = PageCollection([{"_id": i} for i in range(3)], total=40)
+
+    page = asyncio.run(
+        fetch_page(
+            collection,
+            {"category": "python"},
+            [("created_at", -1), ("_id", -1)],
+            skip=5,
+            limit=2,
+            after=after,
+        )
+    )
+
+    assert collection.calls == [
+        ("find", {"$and": [{"category": "python"}, after]}),
+        ("sort", [("created_at", -1), ("_id", -1)]),
+        ("skip", 0),
+        ("limit", 3),
+        ("count", {"category": "python"}),
+    ]
+    assert page == {"docs": [{"_id": 0}, {"_id": 1}], "total": 40, "has_more": True}
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import OperationFailure
+
+from app.models.course_stats import CourseStatsModel
+from app.models.progress import ProgressModel
+from tests.fakes import BulkCollection, StatsCollection
+
+
+def apply(monkeypatch, collection, entries, stats=None):
+    monkeypatch.setattr(ProgressModel, "collection", collection)
+    monkeypatch.setattr(ProgressModel, "_unique_index_ready", False)
+    monkeypatch.setattr(CourseStatsModel, "collection", stats or StatsCollection())
+    return asyncio.run(ProgressModel.apply_batch("u1", entries))
+
+
+def test_latest_entry_per_course_is_written(monkeypatch):
+    collection = BulkCollection(
+        stored=[{"user_id": "u1", "course_id": "c1", "progress": 20}]
+    )
+    stats = StatsCollection()
+    start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    entries = [
+        {"course_id": "c1", "progress": 50, "client_timestamp": start},
+        {"course_id": "c1", "progress": 30, "client_timestamp": start.replace(day=2)},
+        {"course_id": "c2", "progress": 10, "client_timestamp": start},
+    ]
+
+    assert apply(monkeypatch, collection, entries, stats) == [
+        "stale",
+        "applied",
+        "applied",
+    ]
+    (operations,) = collection.batches
+    assert [op._doc["$set"]["progress"] for op in operations] == [30, 10]
+    guard = operations[0]._filter["client_updated_at"]
+    assert guard == {"$not": {"$gte": "2024-05-02T00:00:00+00:00"}}
+    # c1 moves from the stored 20 to 30, c2 is a new entry
+    assert dict(stats.updates) == {
+        "c1": {"progress_sum": 10, "histogram.20": -1, "histogram.30": 1},
+        "c2": {"started": 1, "progress_sum": 10, "histogram.10": 1},
+    }
+
+
+def test_newer_stored_entries_make_older_ones_stale(monkeypatch):
+    # duplicate key on both attempts: the stored entry is newer
+    collection = BulkCollection({0: 11000}, {0: 11000})
+    now = datetime.now(timezone.utc)
+    entries = [
+        {"course_id": "c1", "progress": 5, "client_timestamp": now},
+        {"course_id": "c2", "progress": 7, "client_timestamp": now},
+    ]
+
+    assert apply(monkeypatch, collection, entries) == ["stale", "applied"]
+    assert [len(batch) for batch in collection.batches] == [2, 1]
+
+
+def test_concurrent_insert_is_retried(monkeypatch):
+    collection = BulkCollection({0: 11000, 1: 2})
+    now = datetime.now(timezone.utc)
+    entries = [
+        {"course_id": "c1", "progress": 5, "client_timestamp": now},
+        {"course_id": "c2", "progress": 7, "client_timestamp": now},
+    ]
+
+    assert apply(monkeypatch, collection, entries) == ["applied", "failed"]
+
+
+def test_client_timestamps_are_capped_at_server_time(monkeypatch):
+    collection = BulkCollection()
+    future = datetime.now(timezone.utc) + timedelta(days=365)
+    entries = [{"course_id": "c1", "progress": 5, "client_timestamp": future}]
+
+    apply(monkeypatch, collection, entries)
+    (operation,) = collection.batches[0]
+    stored = datetime.fromisoformat(operation._doc["$set"]["client_updated_at"])
+    assert stored < future
+
+
+def test_unique_index_is_ensured_once_before_writing(monkeypatch):
+    collection = BulkCollection()
+    now = datetime.now(timezone.utc)
+    entries = [{"course_id": "c1", "progress": 5, "client_timestamp": now}]
+
+    apply(monkeypatch, collection, entries)
+    asyncio.run(ProgressModel.apply_batch("u1", entries))
+    assert collection.indexes == ["user_id_1_course_id_1"]
+    assert len(collection.batches) == 2
+
+
+def test_nothing_is_written_without_the_unique_index(monkeypatch):
+    # e.g. duplicate rows left by earlier read-modify-write updates
+    collection = BulkCollection()
+    collection.index_error = OperationFailure("E11000 duplicate key", code=11000)
+    now = datetime.now(timezone.utc)
+    entries = [{"course_id": "c1", "progress": 5, "client_timestamp": now}]
+
+    with pytest.raises(OperationFailure):
+        apply(monkeypatch, collection, entries)
+    assert not collection.batches
+    assert ProgressModel._unique_index_ready is False
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+from app import main
+from app.models.course_stats import CourseStatsModel
+from app.models.progress import ProgressModel
+from app.utils.progress_buffer import ProgressBuffer
+from tests.fakes import BulkCollection, StatsCollection
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = BulkCollection()
+    monkeypatch.setattr(ProgressModel, "collection", collection)
+    monkeypatch.setattr(ProgressModel, "_unique_index_ready", False)
+    monkeypatch.setattr(CourseStatsModel, "collection", StatsCollection())
+    return collection
+
+
+def test_latest_update_per_course_is_written_once(collection):
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=100)
+    for progress in (10, 20, 30):
+        buffer.record("u1", "c1", progress)
+    buffer.record("u1", "c2", 100)
+
+    assert len(buffer) == 2
+    assert asyncio.run(buffer.flush()) == 2
+    assert len(buffer) == 0
+    (operations,) = collection.batches
+    updates = {op._filter["course_id"]: op._doc["$set"] for op in operations}
+    assert updates["c1"]["progress"] == 30
+    assert updates["c2"]["is_completed"] is True
+    assert buffer.updates == 4 and buffer.writes == 2
+
+
+def test_overlay_shows_buffered_progress():
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=100)
+    stored = [
+        {"course_id": "c1", "progress": 5, "created_at": "2024-01-01"},
+        {"course_id": "c2", "progress": 50, "created_at": "2024-01-02"},
+    ]
+    buffer.record("u1", "c1", 40)
+    buffer.record("u1", "c3", 1)
+    buffer.record("u2", "c2", 99)
+
+    merged = {entry["course_id"]: entry for entry in buffer.overlay("u1", stored)}
+    assert merged["c1"]["progress"] == 40
+    assert merged["c1"]["created_at"] == "2024-01-01"
+    assert merged["c2"]["progress"] == 50
+    assert merged["c3"]["progress"] == 1
+
+
+def test_stale_entries_are_dropped_and_failed_ones_kept(collection):
+    error = BulkWriteError(
+        {"writeErrors": [{"index": 0, "code": 11000}, {"index": 1, "code": 2}]}
+    )
+    collection.error = error
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=100)
+    buffer.record("u1", "c1", 10)
+    buffer.record("u1", "c2", 20)
+
+    assert asyncio.run(buffer.flush()) == 1
+    assert [entry["course_id"] for entry in buffer.overlay("u1", [])] == ["c2"]
+
+
+def test_entries_stay_buffered_when_mongo_is_unreachable(collection):
+    collection.error = AutoReconnect("down")
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=100)
+    buffer.record("u1", "c1", 10)
+    asyncio.run(buffer.flush())
+    buffer.record("u1", "c2", 20)
+
+    assert len(buffer) == 2
+    collection.error = None
+    assert asyncio.run(buffer.flush()) == 2
+
+
+def test_entries_stay_buffered_without_the_unique_index(collection):
+    collection.index_error = OperationFailure("index build failed")
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=100)
+    buffer.record("u1", "c1", 10)
+
+    assert asyncio.run(buffer.flush()) == 0
+    assert len(buffer) == 1 and not collection.batches
+    collection.index_error = None
+    assert asyncio.run(buffer.flush()) == 1
+
+
+def test_full_buffer_wakes_the_flush_loop(collection):
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=2)
+
+    async def run():
+        loop = asyncio.create_task(buffer.run_flush_loop())
+        buffer.record("u1", "c1", 10)
+        buffer.record("u2", "c1", 10)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        loop.cancel()
+
+    asyncio.run(run())
+    assert len(collection.batches) == 1
+
+
+def test_flush_loop_survives_a_second_lifespan(collection, monkeypatch):
+    async def nothing(*args):
+        return None
+
+    monkeypatch.setattr(main.database, "warm_up", nothing)
+    monkeypatch.setattr(main, "create_initial_admin", nothing)
+    monkeypatch.setattr(main.TokenRevocationModel, "sync", nothing)
+    monkeypatch.setattr(main.settings, "ENSURE_INDEXES_ON_STARTUP", False)
+    monkeypatch.setattr(main.settings, "PROGRESS_WRITE_BEHIND", True)
+    buffer = ProgressBuffer(flush_seconds=60, max_entries=1)
+    monkeypatch.setattr(main, "progress_buffer", buffer)
+
+    async def lifespan(user_id):
+        async with main.app.router.lifespan_context(main.app):
+            buffer.record(user_id, "c1", 10)
+            # a full buffer wakes the flush loop
+            for _ in range(20):
+                if not len(buffer):
+                    break
+                await asyncio.sleep(0)
+            return len(buffer)
+
+    # each run is a new event loop, like a second TestClient block
+    assert asyncio.run(lifespan("u1")) == 0
+    assert asyncio.run(lifespan("u2")) == 0
+    assert len(collection.batches) == 2
@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import PyMongoError
+
+from app.query_audit import (
+    CURSOR_PAGE_MAX_EXAMINED,
+    QueryShape,
+    analyze_explain,
+    assert_no_scans,
+    audit_queries,
+    paged_shapes,
+    seed_sample_data,
+)
+
+
+def _explain(plan):
+    return {
+        "queryPlanner": {"winningPlan": plan},
+        "executionStats": {
+            "totalKeysExamined": 0,
+            "totalDocsExamined": 10,
+            "nReturned": 1,
+        },
+    }
+
+
+def test_analyze_explain_flags_collscan_and_sort():
+    shape = QueryShape("courses.sorted", "courses", {})
+    plan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+    result = analyze_explain(shape, _explain(plan))
+    assert result["plan"] == "SORT <- COLLSCAN"
+    assert result["problems"] == ["COLLSCAN", "in-memory SORT"]
+    with pytest.raises(AssertionError):
+        assert_no_scans([result])
+
+
+def test_analyze_explain_accepts_index_scans_and_allowed_stages():
+    shape = QueryShape("courses.search", "courses", {}, allow=("SORT",))
+    plan = {
+        "queryPlan": {
+            "stage": "SORT",
+            "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+        }
+    }
+    result = analyze_explain(shape, _explain(plan))
+    assert result["problems"] == []
+    assert_no_scans([result])
+
+
+def test_analyze_explain_checks_aggregation_stages():
+    shape = QueryShape("enrollments.joined", "enrollments", pipeline=[])
+    explain = {
+        "stages": [
+            {
+                "$cursor": _explain(
+                    {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+                )
+            },
+            {"$lookup": {}, "totalDocsExamined": 5, "collectionScans": 1},
+            {"$sort": {}, "nReturned": 3},
+        ]
+    }
+    result = analyze_explain(shape, explain)
+    assert result["plan"] == "$sort <- $lookup <- FETCH <- IXSCAN"
+    assert result["docs_examined"] == 15 and result["returned"] == 3
+    assert result["problems"] == ["COLLSCAN", "in-memory SORT"]
+
+
+def test_analyze_explain_flags_cursor_pages_not_bounded_by_the_index():
+    plan = {"stage": "LIMIT", "inputStage": {"stage": "IXSCAN"}}
+    bounded = QueryShape("courses.page", "courses", max_examined=33)
+    assert analyze_explain(bounded, _explain(plan))["problems"] == []
+    # 10 documents examined: walked from the start of the index, not the cursor
+    walked = QueryShape("courses.page", "courses", max_examined=5)
+    assert analyze_explain(walked, _explain(plan))["problems"] == ["examined 10 > 5"]
+
+
+def test_paged_shapes_are_recorded_from_fetch_page():
+    shapes = {shape.name: shape for shape in asyncio.run(paged_shapes())}
+
+    page = shapes["courses.get_all_courses[cursor]"]
+    # the cursor is part of the find, not a stage after a full sort
+    assert page.pipeline is None and "$or" in page.filter
+    assert page.limit == 11 and page.max_examined == CURSOR_PAGE_MAX_EXAMINED
+    count = shapes["courses.get_all_courses[category][count]"]
+    assert count.pipeline[0] == {"$match": {"category": "programming"}}
+    assert shapes["enrollments.get_user_courses"].pipeline
+    dashboard = shapes["courses.get_instructor_dashboard[cursor]"].pipeline
+    # matched, sorted and limited before the stats join, no $facet
+    assert "$and" in dashboard[0]["$match"]
+    assert [next(iter(stage)) for stage in dashboard[1:3]] == ["$sort", "$limit"]
+    assert not any("$facet" in stage for stage in dashboard)
+
+
+def test_model_queries_use_indexes():
+    """Needs a reachable mongod (MONGO_URL); seeds a scratch database."""
+
+    async def run():
+        client = AsyncIOMotorClient(
+            os.environ["MONGO_URL"], serverSelectionTimeoutMS=500
+        )
+        try:
+            await client.admin.command("ping")
+        except PyMongoError:
+            client.close()
+            return None
+        database = client["mindforge_test_query_audit"]
+        try:
+            await client.drop_database(database.name)
+            await seed_sample_data(database, count=100)
+            return await audit_queries(database)
+        finally:
+            await client.drop_database(database.name)
+            client.close()
+
+    results = asyncio.run(run())
+    if results is None:
+        pytest.skip("no mongod reachable at MONGO_URL")
+    assert_no_scans(results)
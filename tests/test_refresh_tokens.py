@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.dependencies.auth import get_current_principal
+from app.models.refresh_token import RefreshTokenModel
+from app.models.token_revocation import TokenRevocationModel
+from app.models.user import UserModel
+from app.routers.auth import logout, logout_all, refresh
+from app.schemas.token import RefreshRequest
+from app.utils.auth import create_access_token, token_claims
+
+USER = {"_id": "64b000000000000000000001", "email": "jane@example.com"}
+CLAIMS = token_claims({**USER, "role": "student", "token_version": 0})
+
+
+class TokenCollection:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, doc):
+        self.docs[doc["_id"]] = doc
+
+    async def find_one_and_delete(self, query):
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc["expires_at"] <= query["expires_at"]["$gt"]:
+            return None
+        return self.docs.pop(query["_id"])
+
+    async def delete_one(self, query):
+        self.docs.pop(query["_id"], None)
+
+    async def delete_many(self, query):
+        revoked = [
+            key for key, doc in self.docs.items() if doc["user_id"] == query["user_id"]
+        ]
+        for key in revoked:
+            del self.docs[key]
+        return SimpleNamespace(deleted_count=len(revoked))
+
+
+class UserCollection:
+    async def find_one_and_update(self, query, update, **kwargs):
+        return {"_id": query["_id"], "token_version": 1}
+
+
+class RevocationCollection:
+    async def update_one(self, query, update, upsert=False):
+        pass
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    tokens = TokenCollection()
+    monkeypatch.setattr(RefreshTokenModel, "collection", tokens)
+    monkeypatch.setattr(TokenRevocationModel, "_min_versions", {})
+    return tokens
+
+
+def exchange(token):
+    return asyncio.run(refresh(RefreshRequest(refresh_token=token)))
+
+
+def assert_unauthorized(call):
+    with pytest.raises(HTTPException) as exc_info:
+        call()
+    assert exc_info.value.status_code == 401
+
+
+def test_refresh_tokens_are_single_use(tokens):
+    token = asyncio.run(RefreshTokenModel.issue(CLAIMS))
+
+    renewed = exchange(token)
+    assert renewed["access_token"]
+    assert renewed["refresh_token"] != token
+    # replaying the consumed token fails, the new one works once
+    assert_unauthorized(lambda: exchange(token))
+    assert exchange(renewed["refresh_token"])["refresh_token"]
+    assert len(tokens.docs) == 1
+
+
+def test_expired_refresh_token_is_rejected(tokens):
+    token = asyncio.run(RefreshTokenModel.issue(CLAIMS))
+    (stored,) = tokens.docs.values()
+    stored["expires_at"] = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+    assert_unauthorized(lambda: exchange(token))
+
+
+def test_logout_revokes_the_refresh_token(tokens):
+    token = asyncio.run(RefreshTokenModel.issue(CLAIMS))
+
+    asyncio.run(logout(RefreshRequest(refresh_token=token)))
+    assert_unauthorized(lambda: exchange(token))
+
+
+def test_logout_all_revokes_the_token_version(tokens, monkeypatch):
+    monkeypatch.setattr(UserModel, "collection", UserCollection())
+    monkeypatch.setattr(TokenRevocationModel, "collection", RevocationCollection())
+    access_token = create_access_token(CLAIMS)
+    refresh_tokens = [asyncio.run(RefreshTokenModel.issue(CLAIMS)) for _ in range(2)]
+    principal = asyncio.run(get_current_principal(access_token))
+
+    asyncio.run(logout_all(principal))
+    assert not tokens.docs
+    assert_unauthorized(lambda: asyncio.run(get_current_principal(access_token)))
+    for token in refresh_tokens:
+        assert_unauthorized(lambda: exchange(token))
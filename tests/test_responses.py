@@ -0,0 +1,31 @@
+import json
+
+from app.core.config import settings
+from app.schemas.progress import ProgressResponse
+from app.utils.responses import fast_response
+
+ENTRY = {
+    "user_id": "u1",
+    "course_id": "c1",
+    "progress": 40,
+    "is_completed": False,
+    "created_at": "2024-01-01T00:00:00+00:00",
+    "updated_at": "2024-01-02T00:00:00+00:00",
+}
+
+
+def test_fast_response_is_opt_in(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+
+    assert fast_response(list[ProgressResponse], [ENTRY]) == [ENTRY]
+
+
+def test_fast_response_trusted_and_validated(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+
+    trusted = fast_response(list[ProgressResponse], [ENTRY], trusted=True)
+    validated = fast_response(list[ProgressResponse], [{**ENTRY, "extra": 1}])
+
+    assert json.loads(trusted.body) == [ENTRY]
+    assert json.loads(validated.body)[0]["progress"] == 40
+    assert "extra" not in json.loads(validated.body)[0]
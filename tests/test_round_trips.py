@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.core.monitoring import command_counter, track_commands
+
+P = "/api/v1"
+STUDENT = {
+    "email": "roundtrips@example.com",
+    "password": "Passw0rd!",
+    "first_name": "Round",
+    "last_name": "Trip",
+    "date_of_birth": "1990-01-01",
+    "phone_number": "1234567890",
+    "address": "1 Test Street",
+    "gender": "other",
+}
+
+
+def test_commands_are_counted_per_context_across_threads():
+    def driver_call():
+        command_counter.started(SimpleNamespace(command_name="find", command={}))
+        command_counter.succeeded(
+            SimpleNamespace(reply={"ok": 1}, duration_micros=1500)
+        )
+
+    async def run():
+        with track_commands() as stats:
+            # Motor runs driver calls on a thread with a copy of the context
+            await asyncio.gather(
+                asyncio.to_thread(driver_call), asyncio.to_thread(driver_call)
+            )
+        driver_call()  # outside any tracked request
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats.commands == 2
+    assert stats.names == ["find", "find"]
+    assert stats.bytes_sent == 10
+    assert stats.bytes_received > 0
+    assert stats.duration == 0.003
+
+
+def test_student_routes_stay_within_round_trip_budget(live_client, round_trips):
+    client = live_client
+    response = client.post(P + "/auth/auth/signup", json=STUDENT)
+    assert response.status_code == 201, response.text
+    round_trips(response, 2)
+
+    response = client.post(
+        P + "/auth/auth/login",
+        data={"username": STUDENT["email"], "password": STUDENT["password"]},
+    )
+    assert response.status_code == 200, response.text
+    round_trips(response, 2)
+    headers = {"Authorization": "Bearer " + response.json()["access_token"]}
+
+    # timestamps are stored as ISO strings, like the API does
+    now = datetime.now(timezone.utc).isoformat()
+    course_id = str(
+        client.mongo["courses"]
+        .insert_one(
+            {
+                "title": "Round trips",
+                "description": "one query per request",
+                "category": "programming",
+                "instructor": "instructor@example.com",
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        .inserted_id
+    )
+
+    # the page and its exact total are fetched concurrently
+    response = client.get(P + "/courses/courses/", headers=headers)
+    assert response.status_code == 200, response.text
+    round_trips(response, 2)
+
+    response = client.get(P + "/courses/courses/" + course_id, headers=headers)
+    assert response.status_code == 200, response.text
+    round_trips(response, 1)
+
+    # enrollments and progress updates also bump the course stats rollup
+    response = client.post(P + "/enrollments/enrollments/" + course_id, headers=headers)
+    assert response.status_code == 200, response.text
+    round_trips(response, 3)
+
+    response = client.post(
+        P + "/progress/progress/" + course_id, json={"progress": 40}, headers=headers
+    )
+    assert response.status_code == 200, response.text
+    round_trips(response, 3)
+
+    response = client.get(P + "/progress/progress/user", headers=headers)
+    assert response.status_code == 200, response.text
+    round_trips(response, 1)
+
+    response = client.get(P + "/enrollments/enrollments/me", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["data"][0]["title"] == "Round trips"
+    round_trips(response, 1)
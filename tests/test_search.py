@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.backfill_title_keys import backfill_title_keys
+from app.models.course import CourseModel
+from app.utils.counting import TotalMode
+from app.utils.search import is_prefix_query, prefix_filter
+from tests.fakes import PageCollection
+
+
+def test_short_queries_use_prefix_match():
+    assert is_prefix_query("py")
+    assert not is_prefix_query("python")
+    assert not is_prefix_query("a b")
+
+
+def test_prefix_filter_is_lower_cased_and_escaped():
+    # case-sensitive, so the anchored prefix gets tight index bounds
+    assert prefix_filter("C++") == {"title_lower": {"$regex": "^c\\+\\+"}}
+
+
+def test_short_search_matches_title_prefix(monkeypatch):
+    collection = PageCollection([{"_id": "c1", "title": "Python"}], total=1)
+    monkeypatch.setattr(CourseModel, "collection", collection)
+
+    page = asyncio.run(
+        CourseModel.get_all_courses(
+            search=" Py ", category="programming", total_mode=TotalMode.ESTIMATED
+        )
+    )
+
+    assert collection.recorded("find")[0] == {
+        "category": "programming",
+        "title_lower": {"$regex": "^py"},
+    }
+    assert collection.recorded("sort") == [[("created_at", -1), ("_id", -1)]]
+    assert page["total"] == 1 and page["data"][0]["title"] == "Python"
+
+
+def test_cursor_is_rejected_for_text_search(monkeypatch):
+    monkeypatch.setattr(CourseModel, "collection", PageCollection())
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(CourseModel.get_all_courses(search="python", cursor="abc"))
+    assert exc_info.value.status_code == 400
+
+
+def test_backfill_sets_missing_title_keys():
+    collection = PageCollection(
+        [
+            {"_id": "c1", "title": "Python", "title_lower": "python"},
+            {"_id": "c2", "title": "Design"},
+            {"_id": "c3", "title": "Music", "title_lower": "old title"},
+        ]
+    )
+    database = {CourseModel.collection.name: collection}
+
+    assert asyncio.run(backfill_title_keys(database, dry_run=True)) == 2
+    assert not collection.batches
+    assert asyncio.run(backfill_title_keys(database)) == 2
+    (operations,) = collection.batches
+    assert [(op._filter["_id"], op._doc["$set"]) for op in operations] == [
+        ("c2", {"title_lower": "design"}),
+        ("c3", {"title_lower": "music"}),
+    ]
@@ -0,0 +1,21 @@
+from bson import ObjectId
+
+from app.schemas.progress import PROGRESS_RESPONSE_PROJECTION
+from app.schemas.user import USER_OUT_PROJECTION
+from app.utils.serialization import serialize_document
+
+
+def test_projections_follow_response_schemas():
+    assert "password" not in USER_OUT_PROJECTION
+    assert "id" not in USER_OUT_PROJECTION
+    assert PROGRESS_RESPONSE_PROJECTION["_id"] == 0
+
+
+def test_serialize_document_converts_ids_in_place():
+    oid, ref = ObjectId(), ObjectId()
+    doc = {"_id": oid, "owner": ref, "title": "Python"}
+
+    result = serialize_document(doc)
+
+    assert result is doc
+    assert doc == {"id": str(oid), "owner": str(ref), "title": "Python"}
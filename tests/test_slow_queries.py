@@ -0,0 +1,62 @@
+import json
+from types import SimpleNamespace
+
+from app.core.slow_queries import SlowQueryLog, query_shape
+
+
+def test_query_shape_strips_values_but_keeps_structure():
+    first = query_shape(
+        "find",
+        {
+            "find": "courses",
+            "filter": {"title": {"$regex": "^py", "$options": "i"}},
+            "sort": {"created_at": -1, "_id": -1},
+            "limit": 11,
+        },
+    )
+    second = query_shape(
+        "find",
+        {
+            "find": "courses",
+            "filter": {"title": {"$regex": "^ja", "$options": "i"}},
+            "sort": {"created_at": -1, "_id": -1},
+            "limit": 21,
+        },
+    )
+    assert first == second
+    assert json.loads(first) == {
+        "filter": {"title": {"$regex": "?", "$options": "?"}},
+        "sort": {"created_at": -1, "_id": -1},
+    }
+    update = query_shape(
+        "update", {"update": "progress", "updates": [{"q": {"user_id": "u1"}}]}
+    )
+    assert json.loads(update) == {"q": {"user_id": "?"}}
+
+
+def test_slow_commands_are_grouped_with_percentiles():
+    log = SlowQueryLog(threshold_ms=10, window_seconds=60, max_shapes=10)
+
+    def run(request_id, role, duration_ms):
+        event = dict(connection_id=("localhost", 27017), request_id=request_id)
+        log.started(
+            SimpleNamespace(
+                command_name="count",
+                command={"count": "users", "query": {"role": role}},
+                **event,
+            )
+        )
+        log.succeeded(
+            SimpleNamespace(
+                command_name="count", duration_micros=duration_ms * 1000, **event
+            )
+        )
+
+    for request_id, duration_ms in enumerate([5, 20, 40, 30, 200]):
+        run(request_id, f"role{request_id}", duration_ms)
+
+    [row] = log.top()
+    assert row["collection"] == "users"
+    assert row["count"] == 4  # the 5 ms command is under the threshold
+    assert row["p50_ms"] == 30
+    assert row["p99_ms"] == 200
@@ -0,0 +1,114 @@
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.models.course_stats import CourseStatsModel
+from app.models.enrollment import EnrollmentModel
+from app.models.progress import ProgressModel
+from tests.fakes import StatsCollection
+
+
+class UpsertCollection:
+    """Fake collection answering each upsert with the next of ``results``;
+    exceptions are raised."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    async def _next(self, query, update):
+        self.calls.append((query, update))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def update_one(self, query, update, upsert=False):
+        return await self._next(query, update)
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        return await self._next(query, update)
+
+
+def use(monkeypatch, model, collection):
+    stats = StatsCollection()
+    monkeypatch.setattr(model, "collection", collection)
+    monkeypatch.setattr(CourseStatsModel, "collection", stats)
+    return stats
+
+
+def test_new_enrollment_is_recorded_in_course_stats(monkeypatch):
+    upserted_id = ObjectId()
+    stats = use(
+        monkeypatch,
+        EnrollmentModel,
+        UpsertCollection(SimpleNamespace(upserted_id=upserted_id)),
+    )
+
+    enrollment = asyncio.run(EnrollmentModel.enroll_user("u1", "c1"))
+
+    assert enrollment["_id"] == str(upserted_id)
+    assert stats.updates == [("c1", {"enrolled": 1})]
+
+
+def test_existing_enrollment_is_reported(monkeypatch):
+    stats = use(
+        monkeypatch,
+        EnrollmentModel,
+        UpsertCollection(SimpleNamespace(upserted_id=None)),
+    )
+
+    enrollment = asyncio.run(EnrollmentModel.enroll_user("u1", "c1"))
+
+    assert enrollment == {"message": "Already enrolled in this course"}
+    assert not stats.updates
+
+
+def test_concurrent_duplicate_enrollment_is_reported(monkeypatch):
+    # the other request's insert won the race on the unique index
+    stats = use(
+        monkeypatch, EnrollmentModel, UpsertCollection(DuplicateKeyError("dup"))
+    )
+
+    enrollment = asyncio.run(EnrollmentModel.enroll_user("u1", "c1"))
+
+    assert enrollment == {"message": "Already enrolled in this course"}
+    assert not stats.updates
+
+
+def test_progress_upsert_retries_after_a_concurrent_insert(monkeypatch):
+    stored_id = ObjectId()
+    stored = {
+        "_id": stored_id,
+        "user_id": "u1",
+        "course_id": "c1",
+        "progress": 20,
+        "created_at": "2024-05-01T00:00:00+00:00",
+    }
+    collection = UpsertCollection(DuplicateKeyError("dup"), stored)
+    stats = use(monkeypatch, ProgressModel, collection)
+
+    entry = asyncio.run(ProgressModel.update_progress("u1", "c1", 60))
+
+    assert len(collection.calls) == 2
+    assert entry["id"] == str(stored_id)
+    assert entry["created_at"] == "2024-05-01T00:00:00+00:00"
+    assert entry["progress"] == 60 and entry["is_completed"] is False
+    # the stats delta starts from the entry the other request stored
+    assert stats.updates == [
+        ("c1", {"progress_sum": 40, "histogram.20": -1, "histogram.60": 1})
+    ]
+
+
+def test_first_progress_update_creates_the_entry(monkeypatch):
+    collection = UpsertCollection(None)
+    stats = use(monkeypatch, ProgressModel, collection)
+
+    entry = asyncio.run(ProgressModel.update_progress("u1", "c1", 100))
+
+    ((_, update),) = collection.calls
+    assert entry["id"] == str(update["$setOnInsert"]["_id"])
+    assert entry["is_completed"] is True
+    assert stats.updates[0][1]["completed"] == 1